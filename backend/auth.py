@@ -1,8 +1,16 @@
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from dotenv import load_dotenv
+from sqlalchemy import event, inspect
+from .models import User
 
 load_dotenv()
 
@@ -11,13 +19,72 @@ SECRET_KEY = os.getenv("JWT_SECRET", "change-me-locally")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
 
+# In-process cache of authenticated tokens
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16")) # Queued beyond the running ones
+
 import bcrypt
 
 def verify_password(plain_password, hashed_password):
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a different cost than BCRYPT_ROUNDS."""
+    # bcrypt hashes look like $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+class HashingBusy(Exception):
+    """Raised when the password hashing pool already has a full queue."""
+
+class PasswordHasher:
+    """Dedicated pool for bcrypt work with a bounded queue.
+
+    bcrypt is deliberately slow, so it runs here instead of in the threadpool
+    that serves every other sync endpoint. Once `workers + max_pending`
+    calls are in flight, new ones fail fast with HashingBusy.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = max(1, workers)
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, max_pending))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+password_hasher = PasswordHasher()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -28,3 +95,87 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by route handlers."""
+    id: int
+    email: str
+
+class PrincipalCache:
+    """Bounded, TTL-based map of token -> Principal.
+
+    Entries expire after `ttl` seconds or when the token does, whichever is
+    first, and can be dropped per user when the account changes.
+    """
+
+    def __init__(self, ttl: int = AUTH_CACHE_TTL_SECONDS, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # token -> (principal, expires_at)
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_expires_at: Optional[float] = None):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (principal, expires_at)
+            self._entries.move_to_end(token)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str):
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+principal_cache = PrincipalCache()
+
+# Drop cached tokens when an account is deleted or its email/password changes.
+# Mapper events only see ORM flushes, not bulk query.update()/delete() calls.
+@event.listens_for(User, "before_update")
+def _revoke_tokens_on_password_change(mapper, connection, target):
+    # Tokens carry the version they were issued under ("ver" claim)
+    if inspect(target).attrs.hashed_password.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.hashed_password.history.has_changes() or state.attrs.email.history.has_changes():
+        principal_cache.invalidate_user(target.id)
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
+
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from fastapi import UploadFile
+from .database import STORAGE_CHUNK_SIZE, iter_upload_file
+
+# Accepted document types, keyed by file extension
+DOCUMENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+ZIP_TYPES = ("application/zip", "application/x-zip-compressed")
+
+# Bulk upload limits (zip members count as files)
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "100"))
+BULK_UPLOAD_MAX_ZIP_BYTES = int(os.getenv("BULK_UPLOAD_MAX_ZIP_BYTES", str(512 * 1024 * 1024))) # Uncompressed
+
+@dataclass
+class UploadSource:
+    """One document of a bulk upload: a plain file or a member of a zip archive."""
+    filename: str
+    content_type: str
+    open_chunks: Callable[..., AsyncIterator[bytes]] # open_chunks(hasher) -> chunks
+
+async def _iter_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, hasher=None) -> AsyncIterator[bytes]:
+    member = await asyncio.to_thread(archive.open, info)
+    try:
+        while chunk := await asyncio.to_thread(member.read, STORAGE_CHUNK_SIZE):
+            if hasher is not None:
+                hasher.update(chunk)
+            yield chunk
+    finally:
+        member.close()
+
+def _document_type(filename: str) -> Optional[str]:
+    return DOCUMENT_TYPES.get(filename.rsplit(".", 1)[-1].lower()) if "." in filename else None
+
+def _expand_zip(file: UploadFile) -> Tuple[List[UploadSource], List[dict]]:
+    sources, rejected = [], []
+    try:
+        archive = zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        return [], [{"filename": file.filename, "error": "Not a valid zip archive"}]
+
+    members = [info for info in archive.infolist() if not info.is_dir() and not info.filename.startswith("__MACOSX/")]
+    if sum(info.file_size for info in members) > BULK_UPLOAD_MAX_ZIP_BYTES:
+        return [], [{"filename": file.filename, "error": "Archive is too large once extracted"}]
+
+    for info in members:
+        name = os.path.basename(info.filename)
+        content_type = _document_type(name)
+        if content_type is None:
+            rejected.append({"filename": info.filename, "error": "Invalid file type. Only PDF, DOCX, and TXT allowed."})
+            continue
+        sources.append(UploadSource(
+            filename=name,
+            content_type=content_type,
+            open_chunks=lambda hasher, info=info: _iter_zip_member(archive, info, hasher)
+        ))
+    return sources, rejected
+
+def expand_uploads(files: List[UploadFile]) -> Tuple[List[UploadSource], List[dict]]:
+    """Turn uploaded files and zip archives into a flat list of documents to store.
+
+    Returns (sources, rejected); rejected entries carry a filename and an error.
+    """
+    sources, rejected = [], []
+    for file in files:
+        if file.content_type in ZIP_TYPES or file.filename.lower().endswith(".zip"):
+            found, skipped = _expand_zip(file)
+            sources.extend(found)
+            rejected.extend(skipped)
+        elif file.content_type in DOCUMENT_TYPES.values():
+            sources.append(UploadSource(
+                filename=file.filename,
+                content_type=file.content_type,
+                open_chunks=lambda hasher, file=file: iter_upload_file(file, hasher=hasher)
+            ))
+        else:
+            rejected.append({"filename": file.filename, "error": "Invalid file type. Only PDF, DOCX, and TXT allowed."})
+    return sources, rejected
+
+def summarize_batch(jobs) -> Tuple[str, int]:
+    """Overall (status, progress) of a batch from its jobs' statuses and progress."""
+    if not jobs:
+        return "done", 100
+    statuses = {job.status for job in jobs}
+    progress = sum(job.progress for job in jobs) // len(jobs)
+    if statuses & {"queued", "running"}:
+        return ("running" if statuses - {"queued"} else "queued"), progress
+    return ("failed" if "failed" in statuses else "done"), progress
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Benchmarks run against a throwaway database and local storage, with jobs run
+# inline and the result cache off so every process call does the full work.
+# This has to happen before the app is imported.
+_workdir = tempfile.mkdtemp(prefix="benchmarks-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_DIR"] = os.path.join(_workdir, "storage")
+os.environ["JOB_WORKER_MODE"] = "inline"
+os.environ["RESULT_CACHE_BACKEND"] = "none"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi.testclient import TestClient
+from ..main import app
+from .harness import LATENCY_THRESHOLD, MEMORY_THRESHOLD, environment, find_regressions, load_results, save_results
+from .suite import DEFAULT_DOCX_MAX_SIZE, DEFAULT_PDF_MAX_SIZE, DEFAULT_SIZES, run_suite
+
+RESULTS_DIR = os.getenv("BENCHMARK_RESULTS_DIR", "./.cache/benchmarks")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks", description="Document pipeline benchmarks")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="Corpus sizes, e.g. 10k,1m,50m")
+    parser.add_argument("--quick", action="store_true", help="Only the 10k and 1m corpora")
+    parser.add_argument("--pdf-max-size", default=DEFAULT_PDF_MAX_SIZE)
+    parser.add_argument("--docx-max-size", default=DEFAULT_DOCX_MAX_SIZE)
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--only", help="Only benchmarks whose name starts with this")
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--update-baseline", action="store_true", help="Save this run as the new baseline")
+    parser.add_argument("--latency-threshold", type=float, default=LATENCY_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    sizes = ["10k", "1m"] if args.quick else [s for s in args.sizes.split(",") if s]
+    with TestClient(app) as client:
+        client.post("/auth/signup", json={"email": "bench@example.com", "password": "benchmark"})
+        login_res = client.post("/auth/login", data={"username": "bench@example.com", "password": "benchmark"})
+        headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+        benchmarks = run_suite(
+            client, headers, sizes=sizes, pdf_max_size=args.pdf_max_size,
+            docx_max_size=args.docx_max_size, runs=args.runs, only=args.only
+        )
+
+    results = {"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "benchmarks": benchmarks}
+    save_results(args.output, results)
+    print(f"Results written to {args.output}")
+
+    baseline = load_results(args.baseline)
+    if args.update_baseline or baseline is None:
+        save_results(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if baseline.get("environment") != results["environment"]:
+        print("Warning: baseline was recorded on a different machine or Python version")
+    regressions = find_regressions(
+        benchmarks, baseline["benchmarks"], args.latency_threshold, args.memory_threshold
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
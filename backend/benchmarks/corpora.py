@@ -0,0 +1,114 @@
+import io
+import os
+import random
+import zipfile
+from typing import List, Optional
+from docx import Document
+from fpdf import FPDF
+from ..dictionary import build_dictionary
+from ..reports import FONT_PATH
+
+# Deterministic English/Bengali documents for the benchmark suite. The same
+# (format, size, seed) always yields the same bytes, so generated files are
+# cached on disk and reused across runs.
+CORPUS_CACHE_DIR = os.getenv("BENCHMARK_CORPUS_DIR", "./.cache/benchmarks/corpora")
+
+CONTENT_TYPES = {
+    "txt": "text/plain",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+BENGALI_WORDS = [
+    "সরকার", "উন্নয়ন", "নির্বাচন", "নীতি", "জনগণ", "দেশ", "প্রশাসন", "অর্থনীতি",
+    "শিক্ষা", "স্বাস্থ্য", "বাজেট", "সংসদ", "আইন", "নাগরিক", "প্রকল্প", "পরিকল্পনা",
+]
+ENGLISH_WORDS = [
+    "government", "policy", "election", "development", "people", "country", "system",
+    "process", "support", "budget", "parliament", "ministry", "education", "health",
+    "the", "and", "of", "to", "in", "is", "2024", "http", "www",
+]
+# Zipf-like distribution: a few very common words and a long tail
+VOCABULARY_SIZE = 20000
+PARAGRAPH_WORDS = 120
+
+def _vocabulary(rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    tail = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 11))) for _ in range(VOCABULARY_SIZE)]
+    vocab = ENGLISH_WORDS + BENGALI_WORDS + tail
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    return vocab, weights
+
+def make_text(size_bytes: int, seed: int = 42) -> str:
+    """About `size_bytes` of UTF-8 text in paragraphs of mixed English and Bengali."""
+    rng = random.Random(seed)
+    vocab, weights = _vocabulary(rng)
+    paragraphs, size = [], 0
+    while size < size_bytes:
+        paragraph = " ".join(rng.choices(vocab, weights, k=PARAGRAPH_WORDS)) + "."
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode("utf-8")) + 1
+    return "\n".join(paragraphs)
+
+def _make_docx(text: str) -> bytes:
+    doc = Document()
+    for paragraph in text.split("\n"):
+        doc.add_paragraph(paragraph)
+    saved = io.BytesIO()
+    doc.save(saved)
+    # Rewrite the archive with fixed timestamps, so the same text always gives the same bytes
+    output = io.BytesIO()
+    with zipfile.ZipFile(saved) as source, zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time=(1980, 1, 1, 0, 0, 0))
+            target.writestr(entry, source.read(info), compress_type=zipfile.ZIP_DEFLATED)
+    return output.getvalue()
+
+def _make_pdf(text: str) -> bytes:
+    pdf = FPDF()
+    pdf.add_font("Bengali", style="", fname=FONT_PATH)
+    pdf.set_font("Bengali", size=10)
+    page, size = [], 0
+    for paragraph in text.split("\n"):
+        page.append(paragraph)
+        size += len(paragraph)
+        if size >= 4000: # Roughly one dense page of text
+            pdf.add_page()
+            pdf.multi_cell(0, 5, "\n".join(page))
+            page, size = [], 0
+    if page:
+        pdf.add_page()
+        pdf.multi_cell(0, 5, "\n".join(page))
+    return bytes(pdf.output())
+
+def make_document(kind: str, size_bytes: int, seed: int = 42, cache_dir: Optional[str] = CORPUS_CACHE_DIR) -> bytes:
+    """A `kind` (txt, docx or pdf) document holding about `size_bytes` of text."""
+    path = os.path.join(cache_dir, f"{kind}-{size_bytes}-{seed}.{kind}") if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    text = make_text(size_bytes, seed)
+    if kind == "txt":
+        content = text.encode("utf-8")
+    elif kind == "docx":
+        content = _make_docx(text)
+    elif kind == "pdf":
+        content = _make_pdf(text)
+    else:
+        raise ValueError(f"Unsupported corpus format: {kind}")
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(f"{path}.part", "wb") as f:
+            f.write(content)
+        os.replace(f"{path}.part", path)
+    return content
+
+def make_dictionary(path: str, entries: int, seed: int = 3) -> List[str]:
+    """Write a dictionary of about `entries` random words to `path` and return its words."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = sorted({"".join(rng.choice(letters) for _ in range(rng.randint(3, 12))) for _ in range(entries)})
+    build_dictionary(((word, [f"bn-{word}"]) for word in words), path)
+    return words
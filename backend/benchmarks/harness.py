@@ -0,0 +1,115 @@
+import json
+import os
+import platform
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+# Default regression gates: a metric may grow this much (as a fraction) over its baseline
+LATENCY_THRESHOLD = float(os.getenv("BENCHMARK_LATENCY_THRESHOLD", "0.25"))
+MEMORY_THRESHOLD = float(os.getenv("BENCHMARK_MEMORY_THRESHOLD", "0.25"))
+# Differences below these are noise, whatever the ratio
+MIN_LATENCY_DELTA = 0.005 # seconds
+MIN_MEMORY_DELTA = 1024 * 1024 # bytes
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(
+    fn: Callable[[], object],
+    runs: int = 5,
+    size_bytes: Optional[int] = None,
+    warmup: int = 1,
+    setup: Optional[Callable[[], object]] = None
+) -> dict:
+    """Time `fn` over `runs` calls and trace its peak Python memory in one more.
+
+    Peak memory comes from tracemalloc, so it covers Python allocations in
+    this process (not worker processes or native buffers). It is measured on
+    a separate call because tracing slows the code down. `setup`, if given,
+    runs untimed before every call, e.g. to refill what `fn` deletes.
+    """
+    def call():
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        call()
+
+    timings = [call() for _ in range(runs)]
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50 = percentile(timings, 50)
+    result = {
+        "runs": runs,
+        "p50_seconds": round(p50, 6),
+        "p95_seconds": round(percentile(timings, 95), 6),
+        "max_seconds": round(max(timings), 6),
+        "peak_memory_bytes": peak,
+    }
+    if size_bytes:
+        result["size_bytes"] = size_bytes
+        result["throughput_mb_per_second"] = round(size_bytes / p50 / 1e6, 3) if p50 else None
+    return result
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+def load_results(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_results(path: str, results: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def find_regressions(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    latency_threshold: float = LATENCY_THRESHOLD,
+    memory_threshold: float = MEMORY_THRESHOLD
+) -> List[str]:
+    """Describe every benchmark whose p50 latency or memory grew past its threshold.
+
+    Memory is peak traced memory, or RSS for the startup benchmark.
+    Benchmarks and metrics missing from either side are ignored.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        checks = (
+            ("p50_seconds", latency_threshold, MIN_LATENCY_DELTA),
+            ("peak_memory_bytes", memory_threshold, MIN_MEMORY_DELTA),
+            ("rss_bytes", memory_threshold, MIN_MEMORY_DELTA),
+        )
+        for metric, threshold, min_delta in checks:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if new - old > min_delta and new > old * (1 + threshold):
+                regressions.append(f"{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%, limit {threshold * 100:.0f}%)")
+    return regressions
@@ -0,0 +1,50 @@
+import re
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+from ..utils.text_processing import BENGALI_STOP_WORDS, DATE_WORDS, ENGLISH_STOP_WORDS, WEB_NOISE
+
+# Implementations that optimizations replaced. The suite times them next to
+# the current code so each speedup stays visible, and the unit tests check
+# the current code still returns the same results.
+
+def legacy_tokenize_and_count(text: str) -> Counter:
+    # The per-word filter loop the tokenizer used before the compiled filter
+    words = re.findall(r'[a-z\u0980-\u09ff]{2,}', text.lower())
+    filtered_words = []
+    for word in words:
+        if any(char.isdigit() for char in word):
+            continue
+        if len(word) <= 2:
+            continue
+        if word in ENGLISH_STOP_WORDS or word in BENGALI_STOP_WORDS:
+            continue
+        if word in DATE_WORDS or word in WEB_NOISE:
+            continue
+        filtered_words.append(word)
+    return Counter(filtered_words)
+
+def legacy_render_report(title: str, rows: Iterable[Tuple[str, int, Optional[str]]]) -> bytes:
+    # How the export route built PDFs before the report renderer: a fresh FPDF,
+    # font parse and shaping of every cell per report
+    from fpdf import FPDF
+    from ..reports import FONT_PATH
+
+    pdf = FPDF()
+    pdf.add_font("Bengali", style="", fname=FONT_PATH)
+    pdf.set_text_shaping(True)
+    pdf.add_page()
+    pdf.set_font("Bengali", size=16)
+    pdf.cell(0, 10, f"Vocabulary Analysis: {title}", new_x="LMARGIN", new_y="NEXT", align="C")
+    pdf.ln(10)
+    pdf.set_font("Bengali", size=12)
+    pdf.cell(80, 10, "Word", border=1)
+    pdf.cell(40, 10, "Freq", border=1)
+    pdf.cell(70, 10, "Translation", border=1)
+    pdf.ln()
+    pdf.set_font("Bengali", size=10)
+    for word, freq, translation in rows:
+        pdf.cell(80, 10, word, border=1)
+        pdf.cell(40, 10, str(freq), border=1)
+        pdf.cell(70, 10, translation or "", border=1)
+        pdf.ln()
+    return bytes(pdf.output())
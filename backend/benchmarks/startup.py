@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+from typing import Optional
+from .harness import percentile
+
+# Cold start of the API: each run imports the app in a fresh interpreter, the
+# way a new worker does, and reports how long the import took and how much
+# memory the process holds afterwards.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dependencies that only specific requests need; importing the app should load none of them
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "docx", "fpdf", "openpyxl", "deep_translator", "pandas")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss if sys.platform == "darwin" else rss * 1024 # kilobytes on Linux, bytes on macOS
+except ImportError: # Windows
+    rss = None
+loaded = sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules)
+print(json.dumps({"seconds": elapsed, "rss_bytes": rss, "loaded": loaded}))
+"""
+
+def measure_startup(runs: int = 5, module: str = "backend.main", env: Optional[dict] = None) -> dict:
+    """Import `module` in `runs` fresh interpreters.
+
+    Reports import time percentiles, the median peak RSS of the process after
+    the import (interpreter included), and which HEAVY_MODULES got loaded.
+    """
+    timings, rss, loaded = [], [], set()
+    for _ in range(max(runs, 1)):
+        probe = subprocess.run(
+            [sys.executable, "-c", _PROBE, module, json.dumps(HEAVY_MODULES)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        # The app may print while importing; the probe's report is the last line
+        sample = json.loads(probe.stdout.strip().splitlines()[-1])
+        timings.append(sample["seconds"])
+        if sample["rss_bytes"] is not None:
+            rss.append(sample["rss_bytes"])
+        loaded.update(sample["loaded"])
+
+    return {
+        "runs": len(timings),
+        "p50_seconds": round(percentile(timings, 50), 6),
+        "p95_seconds": round(percentile(timings, 95), 6),
+        "max_seconds": round(max(timings), 6),
+        "rss_bytes": int(percentile(rss, 50)) if rss else None,
+        "heavy_modules": sorted(loaded),
+    }
@@ -0,0 +1,188 @@
+import os
+import random
+import tempfile
+from typing import Dict, Iterable, Optional
+from unittest.mock import patch
+from ..utils.text_processing import extract_text_from_docx, extract_text_from_pdf, tokenize_and_count
+from .corpora import CONTENT_TYPES, make_dictionary, make_document, make_text
+from .harness import measure
+from .reference import legacy_render_report, legacy_tokenize_and_count
+from .startup import measure_startup
+
+# Corpus sizes for a full run; PDF and DOCX stop earlier because generating
+# and parsing them is orders of magnitude slower than plain text
+DEFAULT_SIZES = ("10k", "1m", "10m", "50m")
+DEFAULT_PDF_MAX_SIZE = "1m"
+DEFAULT_DOCX_MAX_SIZE = "10m"
+# Corpora at or above this size are timed once instead of `runs` times
+SINGLE_RUN_SIZE = 5 * 1024 * 1024
+# Small, fast requests get more samples so their percentiles mean something
+PAGE_REQUEST_RUNS = 20
+# Fixed inputs for the component benchmarks, which do not scale with corpus size
+VOCABULARY_WORDS = 20_000
+DICTIONARY_ENTRIES = 200_000
+DICTIONARY_PROBES = 10_000 # Half present, half missing
+TRANSLATE_WORDS = [f"word{i}" for i in range(400)]
+TRANSLATE_LATENCY = 0.02 # Simulated seconds per remote call
+REPORT_ROWS = [(f"word{i}", 1000 - i, ["সরকার", "উন্নয়ন", "নির্বাচন", None][i % 4]) for i in range(100)]
+
+_UNITS = {"k": 1024, "m": 1024 * 1024}
+
+def parse_size(label: str) -> int:
+    """'10k' -> 10240, '50m' -> 52428800, '1000' -> 1000."""
+    label = label.strip().lower()
+    if label[-1:] in _UNITS:
+        return int(float(label[:-1]) * _UNITS[label[-1]])
+    return int(label)
+
+def run_suite(
+    client,
+    headers: dict,
+    sizes: Iterable[str] = DEFAULT_SIZES,
+    pdf_max_size: str = DEFAULT_PDF_MAX_SIZE,
+    docx_max_size: str = DEFAULT_DOCX_MAX_SIZE,
+    runs: int = 5,
+    only: Optional[str] = None,
+    log=print
+) -> Dict[str, dict]:
+    """Benchmark each pipeline stage and endpoint on every corpus size.
+
+    `client` is a TestClient for the app and `headers` authenticate a user
+    whose documents the suite may create. Names look like
+    "extract_pdf/1m" or "export/csv/10m"; `only` keeps names with that prefix.
+    """
+    results = {}
+    if not only or "startup/import".startswith(only):
+        results["startup/import"] = startup = measure_startup(runs=runs)
+        log(f"startup/import: p50 {startup['p50_seconds']:.4f}s, rss {(startup['rss_bytes'] or 0) / 1e6:.1f} MB")
+        if startup["heavy_modules"]:
+            log(f"startup/import loads {', '.join(startup['heavy_modules'])}; they should load on first use")
+    limits = {"pdf": parse_size(pdf_max_size), "docx": parse_size(docx_max_size), "txt": None}
+
+    def wanted(prefix: str) -> bool:
+        return not only or prefix.startswith(only) or only.startswith(prefix)
+
+    def bench(name: str, fn, size_bytes: Optional[int] = None, repeat: Optional[int] = None, setup=None):
+        if only and not name.startswith(only):
+            return
+        count = repeat or (1 if size_bytes and size_bytes >= SINGLE_RUN_SIZE else runs)
+        results[name] = measure(fn, runs=count, size_bytes=size_bytes, setup=setup)
+        log(f"{name}: p50 {results[name]['p50_seconds']:.4f}s, peak {results[name]['peak_memory_bytes'] / 1e6:.1f} MB")
+
+    for label in sizes:
+        size = parse_size(label)
+        text = make_text(size)
+        bench(f"tokenize/{label}", lambda: tokenize_and_count(text), size)
+        bench(f"tokenize_legacy/{label}", lambda: legacy_tokenize_and_count(text), size)
+
+        documents = {kind: make_document(kind, size) for kind, limit in limits.items() if limit is None or size <= limit}
+        if "pdf" in documents:
+            bench(f"extract_pdf/{label}", lambda: extract_text_from_pdf(documents["pdf"]), size)
+        if "docx" in documents:
+            bench(f"extract_docx/{label}", lambda: extract_text_from_docx(documents["docx"]), size)
+
+        # Endpoints, through the whole app: upload once, then process and export repeatedly
+        for kind, content in documents.items():
+            up_res = client.post(
+                "/documents/upload",
+                files={"file": (f"bench-{label}.{kind}", content, CONTENT_TYPES[kind])},
+                headers=headers
+            )
+            up_res.raise_for_status()
+            doc_id = up_res.json()["id"]
+
+            def process(doc_id=doc_id):
+                proc_res = client.post(f"/documents/{doc_id}/process", headers=headers)
+                proc_res.raise_for_status()
+                if proc_res.json()["status"] != "done": # Jobs run inline while benchmarking
+                    raise RuntimeError(f"Processing failed: {proc_res.json()['error']}")
+
+            bench(f"process/{kind}/{label}", process, size)
+            if kind != "txt":
+                continue
+            for export_format in ("csv", "excel", "pdf"):
+                def export(export_format=export_format):
+                    client.get(f"/documents/{doc_id}/export/{export_format}", headers=headers).raise_for_status()
+                bench(f"export/{export_format}/{label}", export, size)
+
+            def words_page():
+                client.get(f"/documents/{doc_id}/words", params={"limit": 100}, headers=headers).raise_for_status()
+            bench(f"words_page/{label}", words_page, size, repeat=PAGE_REQUEST_RUNS)
+
+    if wanted("vocabulary/"):
+        bench_vocabulary(bench)
+
+    if wanted("dictionary/"):
+        from ..dictionary import Dictionary
+        with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir:
+            path = os.path.join(workdir, "en_bn.tsv")
+            words = make_dictionary(path, DICTIONARY_ENTRIES)
+            half = DICTIONARY_PROBES // 2
+            probes = random.Random(3).sample(words, half) + [f"notaword{i}" for i in range(half)]
+            dictionary = Dictionary(path)
+            bench("dictionary/lookup_many", lambda: dictionary.lookup_many(probes))
+            dictionary.close()
+
+    if wanted("translate/"):
+        from ..translator import FakeTranslator, TokenBucket, iter_translated_chunks
+
+        def translate(concurrency: int):
+            # 20 chunks of 20 words against an offline translator with remote-like latency
+            translator = FakeTranslator(latency=TRANSLATE_LATENCY)
+            for _, _, error in iter_translated_chunks(
+                translator, TRANSLATE_WORDS, chunk_size=20, concurrency=concurrency, limiter=TokenBucket(rate=0)
+            ):
+                if error:
+                    raise RuntimeError(error)
+        bench("translate/serial", lambda: translate(1))
+        bench("translate/concurrent", lambda: translate(8))
+
+    if wanted("report/"):
+        from ..reports import render_vocabulary_report
+        bench("report/legacy", lambda: legacy_render_report("report.pdf", REPORT_ROWS))
+        bench("report/cached", lambda: render_vocabulary_report("report.pdf", REPORT_ROWS))
+
+    return results
+
+def bench_vocabulary(bench):
+    """Store, page through and delete one document's vocabulary in each storage format.
+
+    Runs on its own SQLite database, so it measures the storage format rather
+    than whatever database the app is configured with.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from .. import frequencies
+    from ..database import Base
+    from ..frequencies import delete_word_frequencies, get_word_page, replace_word_frequencies
+    from ..models import Document, User
+
+    items = [(f"word{i:05d}", VOCABULARY_WORDS - i) for i in range(VOCABULARY_WORDS)]
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'vocabulary.db')}")
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            user = User(email="vocabulary@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+            doc = Document(user_id=user.id, filename="vocabulary.txt", storage_path="vocabulary.txt")
+            db.add(doc)
+            db.commit()
+
+            def store():
+                replace_word_frequencies(db, doc.id, items)
+                db.commit()
+
+            def page():
+                get_word_page(db, doc.id, user.id, limit=100, sort="word_asc", prefix="word19")
+
+            def delete():
+                delete_word_frequencies(db, doc.id)
+                db.commit()
+
+            for storage in ("rows", "packed"):
+                with patch.object(frequencies, "VOCABULARY_STORAGE", storage):
+                    bench(f"vocabulary/{storage}/store", store) # Also what reprocessing costs
+                    bench(f"vocabulary/{storage}/page", page)
+                    bench(f"vocabulary/{storage}/delete", delete, setup=store)
+        engine.dispose()
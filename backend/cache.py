@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from .models import ResultCacheEntry
+from .utils.text_processing import FILTER_VERSION
+
+# Cache of extraction + counting results, keyed by file content and tokenizer rules
+# - "db": entries live in the result_cache table (shared by all workers)
+# - "disk": entries are files under RESULT_CACHE_DIR
+# - "none": caching disabled
+RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "db").lower()
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "./.cache/results")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+def result_cache_key(content_hash: str) -> str:
+    return f"{content_hash}:{FILTER_VERSION}"
+
+def _encode(counts: Counter) -> bytes:
+    return zlib.compress(json.dumps(counts, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def _decode(data: bytes) -> Counter:
+    return Counter(json.loads(zlib.decompress(data).decode("utf-8")))
+
+class ResultCache:
+    """Base class: hit/miss bookkeeping shared by all backends."""
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": RESULT_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def get(self, db: Session, key: str) -> Optional[Counter]:
+        self._record(False)
+        return None
+
+    def put(self, db: Session, key: str, counts: Counter):
+        pass
+
+class DBResultCache(ResultCache):
+    def get(self, db: Session, key: str) -> Optional[Counter]:
+        entry = db.get(ResultCacheEntry, key)
+        self._record(entry is not None)
+        if entry is None:
+            return None
+        entry.hits += 1
+        entry.last_used = time.time()
+        return _decode(entry.data)
+
+    def put(self, db: Session, key: str, counts: Counter):
+        data = _encode(counts)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            # In a savepoint, so a failed write only undoes itself, not the caller's pending changes
+            with db.begin_nested():
+                db.merge(ResultCacheEntry(key=key, data=data, size=len(data), hits=0, last_used=time.time()))
+                db.flush()
+                self._evict(db)
+        except Exception as e:
+            # Another worker may have cached the same content concurrently
+            print(f"Result cache write failed: {e}")
+            return
+        db.commit()
+
+    def _evict(self, db: Session):
+        total = db.query(func.coalesce(func.sum(ResultCacheEntry.size), 0)).scalar()
+        if total <= self.max_bytes:
+            return
+        # Least recently used first
+        for key, size in db.query(ResultCacheEntry.key, ResultCacheEntry.size).order_by(ResultCacheEntry.last_used).all():
+            db.query(ResultCacheEntry).filter(ResultCacheEntry.key == key).delete(synchronize_session=False)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+class DiskResultCache(ResultCache):
+    def __init__(self, directory: str = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        super().__init__(max_bytes)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # Size of the cache directory as this process last saw it plus its own
+        # writes since; other workers' writes show up at the next eviction scan
+        self._size: Optional[int] = None
+        self._size_lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace(":", "_") + ".bin")
+
+    def get(self, db: Session, key: str) -> Optional[Counter]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path) # Mark as recently used
+        except OSError:
+            self._record(False)
+            return None
+        self._record(True)
+        return _decode(data)
+
+    def put(self, db: Session, key: str, counts: Counter):
+        data = _encode(counts)
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._size_lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += len(data) - replaced
+                if self._size > self.max_bytes:
+                    self._size = self._evict()
+        except OSError as e:
+            # Full disk or lost permissions: processing goes on without caching
+            print(f"Result cache write failed: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".bin"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> int:
+        """Remove least recently used entries until the cache fits; return its new size."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        # Least recently used first
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        return total
+
+_result_cache: Optional[ResultCache] = None
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is None:
+        if RESULT_CACHE_BACKEND == "disk":
+            _result_cache = DiskResultCache()
+        elif RESULT_CACHE_BACKEND == "db":
+            _result_cache = DBResultCache()
+        else:
+            _result_cache = ResultCache()
+    return _result_cache
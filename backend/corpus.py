@@ -0,0 +1,156 @@
+import difflib
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from .database import insert_on_conflict
+from .frequencies import decode_cursor, encode_cursor, iter_packed_vocabularies, load_vocabulary
+from .models import CorpusWord, Document, WordFrequency
+
+# Per-user corpus index: total frequency and document count of every word
+# across a user's documents. Processing and deleting a document move its
+# stored frequencies in or out, so corpus queries never scan word_frequency.
+
+# Supported /corpus/search modes
+SEARCH_MODES = ("prefix", "fuzzy")
+
+# Fuzzy search compares against words of similar length with the same first letter
+FUZZY_LENGTH_SLACK = 2
+FUZZY_CUTOFF = 0.75
+
+def remove_document_from_corpus(db: Session, document_id: int, user_id: int):
+    """Subtract a document's currently stored frequencies from its owner's corpus.
+
+    Must run before the document's stored frequencies are replaced or deleted.
+    """
+    vocabulary = load_vocabulary(db, document_id)
+    if vocabulary is not None:
+        _add_to_corpus(db, user_id, list(vocabulary.items()), -1)
+    else:
+        _remove_rows_from_corpus(db, document_id, user_id)
+    db.execute(
+        delete(CorpusWord)
+        .where(CorpusWord.user_id == user_id, CorpusWord.document_count <= 0)
+        .execution_options(synchronize_session=False)
+    )
+
+def _remove_rows_from_corpus(db: Session, document_id: int, user_id: int):
+    stored = select(WordFrequency.frequency).where(
+        WordFrequency.document_id == document_id,
+        WordFrequency.word == CorpusWord.word
+    ).scalar_subquery()
+    db.execute(
+        update(CorpusWord)
+        .where(
+            CorpusWord.user_id == user_id,
+            CorpusWord.word.in_(select(WordFrequency.word).where(WordFrequency.document_id == document_id))
+        )
+        .values(total_frequency=CorpusWord.total_frequency - stored, document_count=CorpusWord.document_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def add_document_to_corpus(db: Session, user_id: int, items: List[Tuple[str, int]]):
+    """Add a document's (word, frequency) pairs to its owner's corpus."""
+    _add_to_corpus(db, user_id, items, 1)
+
+def _add_to_corpus(db: Session, user_id: int, items: List[Tuple[str, int]], sign: int):
+    # sign -1 takes a document back out; emptied words are deleted by the caller
+    if not items:
+        return
+    rows = [
+        {"user_id": user_id, "word": word, "total_frequency": sign * freq, "document_count": sign}
+        for word, freq in items
+    ]
+    stmt = insert_on_conflict(
+        db.get_bind(), CorpusWord, ["user_id", "word"], increment_columns=["total_frequency", "document_count"]
+    )
+    if stmt is not None:
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        entry = db.get(CorpusWord, (user_id, row["word"]))
+        if entry is None:
+            db.add(CorpusWord(**row))
+        else:
+            entry.total_frequency += row["total_frequency"]
+            entry.document_count += sign
+    db.flush()
+
+def _word_dict(entry) -> dict:
+    return {"word": entry.word, "total_frequency": entry.total_frequency, "document_count": entry.document_count}
+
+def get_top_words(
+    db: Session,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    prefix: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Most frequent words across the user's documents, keyset-paginated like /words."""
+    stmt = select(CorpusWord).where(CorpusWord.user_id == user_id)
+    if prefix:
+        stmt = stmt.where(CorpusWord.word.startswith(prefix.lower(), autoescape=True))
+    if cursor:
+        last_freq, last_word = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            CorpusWord.total_frequency < last_freq,
+            and_(CorpusWord.total_frequency == last_freq, CorpusWord.word > last_word)
+        ))
+    stmt = stmt.order_by(CorpusWord.total_frequency.desc(), CorpusWord.word).limit(limit + 1)
+
+    rows = db.execute(stmt).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].total_frequency, rows[-1].word)
+    return [_word_dict(r) for r in rows], next_cursor
+
+def search_words(db: Session, user_id: int, query: str, mode: str = "prefix", limit: int = 20) -> List[dict]:
+    query = query.lower()
+    if mode == "prefix":
+        # Primary key range scan on (user_id, word)
+        rows = db.execute(
+            select(CorpusWord)
+            .where(CorpusWord.user_id == user_id, CorpusWord.word.startswith(query, autoescape=True))
+            .order_by(CorpusWord.word)
+            .limit(limit)
+        ).scalars().all()
+        return [_word_dict(r) for r in rows]
+
+    if mode == "fuzzy":
+        candidates = {
+            r.word: r for r in db.execute(
+                select(CorpusWord).where(
+                    CorpusWord.user_id == user_id,
+                    CorpusWord.word.startswith(query[:1], autoescape=True),
+                    func.length(CorpusWord.word).between(len(query) - FUZZY_LENGTH_SLACK, len(query) + FUZZY_LENGTH_SLACK)
+                )
+            ).scalars()
+        }
+        matches = difflib.get_close_matches(query, list(candidates), n=limit, cutoff=FUZZY_CUTOFF)
+        return [_word_dict(candidates[word]) for word in matches]
+
+    raise ValueError(f"Unsupported search mode: {mode}")
+
+def get_word_documents(db: Session, user_id: int, word: str, limit: int = 50) -> List[dict]:
+    """The user's documents containing `word`, highest frequency first."""
+    word = word.lower()
+    rows = db.execute(
+        select(Document.id, Document.filename, WordFrequency.frequency)
+        .join(WordFrequency, WordFrequency.document_id == Document.id)
+        .where(Document.user_id == user_id, WordFrequency.word == word)
+        .order_by(WordFrequency.frequency.desc(), Document.id)
+        .limit(limit)
+    ).all()
+    # Packed documents have no per-word index: look the word up in each one
+    packed = {}
+    for document_id, vocabulary in iter_packed_vocabularies(db, user_id):
+        frequency = vocabulary.get(word)
+        if frequency is not None:
+            packed[document_id] = frequency
+    if packed:
+        filenames = {doc_id: filename for doc_id, filename in db.execute(select(Document.id, Document.filename).where(Document.id.in_(list(packed))))}
+        rows = sorted(
+            [tuple(r) for r in rows] + [(doc_id, filenames[doc_id], freq) for doc_id, freq in packed.items()],
+            key=lambda r: (-r[2], r[0])
+        )[:limit]
+    return [{"document_id": r[0], "filename": r[1], "frequency": r[2]} for r in rows]
@@ -1,11 +1,15 @@
+import asyncio
 import os
-from sqlalchemy import Column, Integer, String, DateTime
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+from urllib.parse import quote
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from datetime import datetime
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, make_url
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 load_dotenv()
 
@@ -15,21 +19,264 @@ if not DATABASE_URL or "port" in DATABASE_URL:
     # Use a dummy sqlite URL if the env is missing or has placeholders
     DATABASE_URL = "sqlite:///./temp.db"
 
-engine = create_engine(DATABASE_URL)
+# Connection pool (QueuePool) settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800")) # Seconds; -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Async sessions for async routes (asyncpg on Postgres, aiosqlite on SQLite)
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "true").lower() == "true"
+
+def _engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _create_async_engine(url: str) -> Optional[AsyncEngine]:
+    sync_url = make_url(url)
+    backend = sync_url.get_backend_name()
+    connect_args = {}
+    if backend == "postgresql":
+        query = dict(sync_url.query)
+        # asyncpg takes TLS settings as a connect argument, not libpq URL options
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode:
+            connect_args["ssl"] = sslmode
+        async_url = sync_url.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        async_url = sync_url.set(drivername="sqlite+aiosqlite")
+    else:
+        return None
+    try:
+        return create_async_engine(async_url, connect_args=connect_args, **_engine_options(url))
+    except ImportError as e:
+        print(f"Async database driver unavailable, async routes use a threadpool: {e}")
+        return None
+
+async_engine = _create_async_engine(DATABASE_URL) if DB_ASYNC_ENABLED else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine else None
+)
+
 Base = declarative_base()
 
 # Supabase Configuration (for storage and direct API access)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY or "your-" in SUPABASE_KEY:
-    # Use a mock during testing if credentials aren't set
-    from unittest.mock import MagicMock
-    supabase = MagicMock()
-else:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Document storage
+# - "supabase": Supabase Storage over its REST API
+# - "local": files under STORAGE_LOCAL_DIR (development and tests)
+# Defaults to "supabase" when credentials are configured, "local" otherwise.
+_supabase_configured = bool(SUPABASE_URL and SUPABASE_KEY and "your" not in SUPABASE_KEY)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase" if _supabase_configured else "local").lower()
+STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "documents")
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", "./.storage")
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", str(1024 * 1024)))
+STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", "20"))
+STORAGE_TIMEOUT_SECONDS = float(os.getenv("STORAGE_TIMEOUT_SECONDS", "60"))
+
+class StorageError(Exception):
+    pass
+
+class Storage(ABC):
+    """Document file storage.
+
+    Request handlers use the async methods; processing workers, which run
+    outside the event loop, use `download_sync`. Uploads and downloads move
+    data in chunks so a large file is never held in memory by the transfer.
+    """
+
+    @abstractmethod
+    async def upload(self, path: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None):
+        ...
+
+    @abstractmethod
+    def download_stream(self, path: str) -> AsyncIterator[bytes]:
+        ...
+
+    async def download(self, path: str) -> bytes:
+        return b"".join([chunk async for chunk in self.download_stream(path)])
+
+    @abstractmethod
+    def download_sync(self, path: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def remove(self, paths: List[str]):
+        ...
+
+    async def aclose(self):
+        pass
+
+class LocalStorage(Storage):
+    def __init__(self, root: str = STORAGE_LOCAL_DIR, bucket: str = STORAGE_BUCKET):
+        self.root = os.path.abspath(os.path.join(root, bucket))
+
+    def _path(self, path: str) -> str:
+        full_path = os.path.abspath(os.path.join(self.root, path))
+        if not full_path.startswith(self.root + os.sep):
+            raise StorageError(f"Invalid storage path: {path}")
+        return full_path
+
+    async def upload(self, path: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None):
+        full_path = self._path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.{os.getpid()}.part"
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+        f.close()
+        os.replace(tmp_path, full_path)
+
+    async def download_stream(self, path: str) -> AsyncIterator[bytes]:
+        try:
+            f = await asyncio.to_thread(open, self._path(path), "rb")
+        except FileNotFoundError:
+            raise StorageError(f"Object not found: {path}")
+        try:
+            while chunk := await asyncio.to_thread(f.read, STORAGE_CHUNK_SIZE):
+                yield chunk
+        finally:
+            f.close()
+
+    def download_sync(self, path: str) -> bytes:
+        try:
+            with open(self._path(path), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise StorageError(f"Object not found: {path}")
+
+    async def remove(self, paths: List[str]):
+        for path in paths:
+            try:
+                await asyncio.to_thread(os.remove, self._path(path))
+            except FileNotFoundError:
+                pass
+
+class SupabaseStorage(Storage):
+    """Supabase Storage REST API over persistent, pooled HTTP connections."""
+
+    def __init__(self, url: str, key: str, bucket: str = STORAGE_BUCKET):
+        self.base_url = f"{url.rstrip('/')}/storage/v1"
+        self.bucket = bucket
+        self.headers = {"Authorization": f"Bearer {key}", "apikey": key}
+        self.limits = httpx.Limits(
+            max_connections=STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=STORAGE_MAX_CONNECTIONS
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+
+    def _object_url(self, path: str) -> str:
+        return f"{self.base_url}/object/{self.bucket}/{quote(path)}"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(headers=self.headers, limits=self.limits, timeout=STORAGE_TIMEOUT_SECONDS)
+        return self._client
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(headers=self.headers, limits=self.limits, timeout=STORAGE_TIMEOUT_SECONDS)
+        return self._sync_client
+
+    @staticmethod
+    def _check(response: httpx.Response, path: str):
+        if response.is_error:
+            raise StorageError(f"Storage request for {path} failed ({response.status_code}): {response.text}")
+
+    async def upload(self, path: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None):
+        # An async iterator body is sent with chunked transfer encoding
+        headers = {"Content-Type": content_type or "application/octet-stream"}
+        response = await self.client.post(self._object_url(path), content=chunks, headers=headers)
+        self._check(response, path)
+
+    async def download_stream(self, path: str) -> AsyncIterator[bytes]:
+        async with self.client.stream("GET", self._object_url(path)) as response:
+            if response.is_error:
+                await response.aread()
+                self._check(response, path)
+            async for chunk in response.aiter_bytes(STORAGE_CHUNK_SIZE):
+                yield chunk
+
+    def download_sync(self, path: str) -> bytes:
+        with self.sync_client.stream("GET", self._object_url(path)) as response:
+            if response.is_error:
+                response.read()
+                self._check(response, path)
+            return b"".join(response.iter_bytes(STORAGE_CHUNK_SIZE))
+
+    async def remove(self, paths: List[str]):
+        response = await self.client.request(
+            "DELETE", f"{self.base_url}/object/{self.bucket}", json={"prefixes": list(paths)}
+        )
+        self._check(response, ", ".join(paths))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+def create_storage() -> Storage:
+    if STORAGE_BACKEND == "supabase":
+        if not _supabase_configured:
+            raise RuntimeError("STORAGE_BACKEND=supabase needs SUPABASE_URL and SUPABASE_KEY")
+        return SupabaseStorage(SUPABASE_URL, SUPABASE_KEY)
+    return LocalStorage()
+
+storage = create_storage()
+
+async def iter_upload_file(file, chunk_size: int = STORAGE_CHUNK_SIZE, hasher=None) -> AsyncIterator[bytes]:
+    """Read an UploadFile in chunks, optionally feeding each chunk to `hasher`."""
+    while chunk := await file.read(chunk_size):
+        if hasher is not None:
+            hasher.update(chunk)
+        yield chunk
+
+def insert_on_conflict(
+    bind,
+    model,
+    index_elements: List[str],
+    update_columns: Optional[List[str]] = None,
+    increment_columns: Optional[List[str]] = None
+):
+    """INSERT ... ON CONFLICT for `model` on Postgres and SQLite, None elsewhere.
+
+    Conflicting rows take the new values of `update_columns` and add the new
+    values of `increment_columns` to their own; with neither, they are left
+    untouched.
+    """
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    stmt = insert(model)
+    set_ = {column: stmt.excluded[column] for column in update_columns or ()}
+    for column in increment_columns or ():
+        set_[column] = getattr(model, column) + stmt.excluded[column]
+    if set_:
+        return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+    return stmt.on_conflict_do_nothing(index_elements=index_elements)
 
 def get_db():
     db = SessionLocal()
@@ -37,3 +284,58 @@ def get_db():
         yield db
     finally:
         db.close()
+
+class ThreadedSession:
+    """Awaitable facade over a sync Session, used when no async driver is available.
+
+    Mirrors the subset of AsyncSession used by the async routes; each database
+    call runs in the threadpool so the event loop is never blocked.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+async def get_async_db():
+    """Session for async routes: an AsyncSession, or a ThreadedSession fallback."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = ThreadedSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
@@ -0,0 +1,132 @@
+import mmap
+import os
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Local English -> Bengali dictionary, consulted before any remote translator.
+# The file holds one "word<TAB>translation|translation..." line per word,
+# sorted by the word's UTF-8 bytes. It is memory-mapped and binary searched,
+# so workers share the OS page cache instead of each loading a copy.
+DEFAULT_DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "assets", "dictionary", "en_bn.tsv")
+DICTIONARY_PATH = os.getenv("DICTIONARY_PATH", DEFAULT_DICTIONARY_PATH)
+
+class Dictionary:
+    """Read-only view of a sorted dictionary file, opened on first lookup."""
+
+    def __init__(self, path: str = DICTIONARY_PATH):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _data(self) -> Optional[mmap.mmap]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        with open(self.path, "rb") as f:
+                            if os.fstat(f.fileno()).st_size:
+                                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except FileNotFoundError:
+                        print(f"Dictionary not found at {self.path}; lookups will miss")
+                    self._loaded = True
+        return self._map
+
+    def lookup(self, word: str) -> List[str]:
+        """Translations of `word` (lowercase), best first; empty when unknown."""
+        data = self._data()
+        if data is None:
+            return []
+        key = word.encode("utf-8")
+        lo, hi = 0, len(data)
+        # lo and hi always sit on line starts
+        while lo < hi:
+            start = data.rfind(b"\n", 0, (lo + hi) // 2) + 1
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            entry, _, translations = data[start:end].partition(b"\t")
+            if entry == key:
+                return translations.decode("utf-8").split("|")
+            if entry < key:
+                lo = end + 1
+            else:
+                hi = start
+        return []
+
+    def lookup_many(self, words: Iterable[str]) -> Dict[str, List[str]]:
+        found = {}
+        for word in words:
+            translations = self.lookup(word)
+            if translations:
+                found[word] = translations
+        return found
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            self._loaded = False
+
+class DictionaryTranslator:
+    """Translator backed only by the local dictionary; unknown words come back as None."""
+
+    def __init__(self, dictionary: Optional["Dictionary"] = None):
+        self.dictionary = dictionary or get_dictionary()
+
+    def translate_batch(self, words: List[str]) -> List[Optional[str]]:
+        return [next(iter(self.dictionary.lookup(word.lower())), None) for word in words]
+
+    def translate(self, word: str) -> Optional[str]:
+        return self.translate_batch([word])[0]
+
+def build_dictionary(entries: Iterable[Tuple[str, Iterable[str]]], path: str):
+    """Write (word, translations) pairs as a sorted dictionary file.
+
+    Words are lowercased; repeated words have their translations merged in
+    order. The file is replaced atomically, so running workers keep their
+    current mapping until they reopen it.
+    """
+    merged: Dict[str, List[str]] = {}
+    for word, translations in entries:
+        word = word.strip().lower()
+        if not word or "\t" in word or "\n" in word:
+            continue
+        known = merged.setdefault(word, [])
+        for translation in translations:
+            translation = translation.strip().replace("|", "/")
+            if translation and "\t" not in translation and "\n" not in translation and translation not in known:
+                known.append(translation)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.part"
+    with open(tmp_path, "wb") as f:
+        for word in sorted((w for w, t in merged.items() if t), key=lambda w: w.encode("utf-8")):
+            f.write(f"{word}\t{'|'.join(merged[word])}\n".encode("utf-8"))
+    os.replace(tmp_path, path)
+
+def read_tsv(path: str) -> Iterable[Tuple[str, List[str]]]:
+    """Read "english<TAB>bengali[<TAB>bengali...]" lines, e.g. an exported word list."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            word, _, rest = line.rstrip("\n").partition("\t")
+            if rest:
+                yield word, rest.split("\t")
+
+_dictionary: Optional[Dictionary] = None
+
+def get_dictionary() -> Dictionary:
+    global _dictionary
+    if _dictionary is None:
+        _dictionary = Dictionary()
+    return _dictionary
+
+if __name__ == "__main__":
+    # python -m backend.dictionary words.tsv [output path]
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m backend.dictionary SOURCE.tsv [OUTPUT]")
+    output = sys.argv[2] if len(sys.argv) > 2 else DICTIONARY_PATH
+    build_dictionary(read_tsv(sys.argv[1]), output)
+    print(f"Dictionary written to {output}")
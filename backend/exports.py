@@ -0,0 +1,115 @@
+import csv
+import io
+import tempfile
+from typing import Iterator, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .frequencies import get_translations, load_vocabulary
+from .models import UserTranslation, WordFrequency
+
+EXPORT_COLUMNS = ("Word", "Frequency", "Translation")
+EXPORT_BATCH_SIZE = 1000
+PDF_ROW_LIMIT = 100 # Limit PDF to top 100
+
+ExportRow = Tuple[str, int, Optional[str]]
+
+def iter_export_rows(db: Session, document_id: int, user_id: int, limit: Optional[int] = None) -> Iterator[ExportRow]:
+    """Yield (word, frequency, translation) rows, most frequent first.
+
+    Rows are fetched in batches through a server-side cursor where the
+    driver supports one, so the full vocabulary is never held in memory.
+    Packed documents are walked in their stored frequency order instead.
+    """
+    vocabulary = load_vocabulary(db, document_id)
+    if vocabulary is not None:
+        batch = []
+        for item in vocabulary.most_common(limit):
+            batch.append(item)
+            if len(batch) == EXPORT_BATCH_SIZE:
+                yield from _translated(db, user_id, batch)
+                batch = []
+        yield from _translated(db, user_id, batch)
+        return
+
+    stmt = select(
+        WordFrequency.word,
+        WordFrequency.frequency,
+        UserTranslation.translation
+    ).outerjoin(
+        UserTranslation,
+        (UserTranslation.word == WordFrequency.word) & (UserTranslation.user_id == user_id)
+    ).where(
+        WordFrequency.document_id == document_id
+    ).order_by(
+        WordFrequency.frequency.desc(), WordFrequency.word
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    for row in db.execute(stmt):
+        yield row[0], row[1], row[2]
+
+def _translated(db: Session, user_id: int, items) -> Iterator[ExportRow]:
+    translations = get_translations(db, user_id, [word for word, _ in items])
+    for word, freq in items:
+        yield word, freq, translations.get(word)
+
+def stream_csv(rows: Iterator[ExportRow]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield flush()
+
+    batch = 0
+    for word, freq, translation in rows:
+        writer.writerow((word, freq, translation or "-"))
+        batch += 1
+        if batch == EXPORT_BATCH_SIZE:
+            yield flush()
+            batch = 0
+    if batch:
+        yield flush()
+
+def build_excel(rows: Iterator[ExportRow]) -> tempfile.SpooledTemporaryFile:
+    """Write rows to an .xlsx file using openpyxl's constant-memory mode.
+
+    Returns a file positioned at the start; it only spills to disk once it
+    grows past a few megabytes.
+    """
+    # openpyxl is only loaded once someone exports to Excel
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Vocabulary")
+
+    header = []
+    for name in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+
+    for word, freq, translation in rows:
+        ws.append((word, freq, translation or "-"))
+
+    output = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+def iter_file(f, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    try:
+        while chunk := f.read(chunk_size):
+            yield chunk
+    finally:
+        f.close()
@@ -0,0 +1,199 @@
+import base64
+import csv
+import io
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from .models import Document, DocumentVocabulary, UserTranslation, WordFrequency
+from .vocabulary import PackedVocabulary, pack_vocabulary
+
+# Storage format for newly processed documents:
+# - "rows": one word_frequency row per word, paged and joined in SQL
+# - "packed": one document_vocabularies blob per document (see vocabulary.py).
+#   Much cheaper to write, read and delete; lookups across documents (word to
+#   documents, translation counters) decode each of the user's blobs instead.
+# Readers handle both, so a document keeps its format until it is reprocessed.
+VOCABULARY_STORAGE = os.getenv("VOCABULARY_STORAGE", "rows").lower()
+
+# Supported orderings for the /words listing
+WORD_SORTS = ("frequency_desc", "frequency_asc", "word_asc", "word_desc")
+
+# Keeps IN (...) lists under SQLite's bound parameter limit
+_WORD_BATCH_SIZE = 500
+
+def _copy_rows(conn: Connection, document_id: int, items: List[Tuple[str, int]]):
+    # Postgres: stream all rows through a single COPY statement
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for word, freq in items:
+        writer.writerow((document_id, word, freq))
+    buffer.seek(0)
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {WordFrequency.__tablename__} (document_id, word, frequency) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def replace_word_frequencies(db: Session, document_id: int, items: Iterable[Tuple[str, int]]):
+    """Replace a document's stored frequencies with `items` ((word, frequency) pairs).
+
+    Clears both formats, then writes VOCABULARY_STORAGE: one blob, or one
+    bulk insert of rows (COPY on Postgres/psycopg2, an executemany
+    elsewhere). Runs inside the session's transaction; the caller commits.
+    No ORM objects are created or tracked by the session.
+    """
+    items = list(items)
+    conn = db.connection()
+    delete_word_frequencies(db, document_id)
+
+    if VOCABULARY_STORAGE == "packed":
+        conn.execute(
+            insert(DocumentVocabulary),
+            {"document_id": document_id, "word_count": len(items), "data": pack_vocabulary(items)}
+        )
+    elif items:
+        if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+            _copy_rows(conn, document_id, items)
+        else:
+            conn.execute(
+                insert(WordFrequency),
+                [{"document_id": document_id, "word": word, "frequency": freq} for word, freq in items]
+            )
+
+def delete_word_frequencies(db: Session, document_id: int):
+    """Delete a document's stored frequencies, whichever format they are in."""
+    conn = db.connection()
+    conn.execute(delete(WordFrequency).where(WordFrequency.document_id == document_id))
+    conn.execute(delete(DocumentVocabulary).where(DocumentVocabulary.document_id == document_id))
+
+def load_vocabulary(db: Session, document_id: int) -> Optional[PackedVocabulary]:
+    """The document's packed vocabulary, or None if it is stored as rows (or not at all)."""
+    data = db.execute(
+        select(DocumentVocabulary.data).where(DocumentVocabulary.document_id == document_id)
+    ).scalar()
+    return PackedVocabulary(data) if data is not None else None
+
+def iter_packed_vocabularies(db: Session, user_id: int) -> Iterator[Tuple[int, PackedVocabulary]]:
+    """(document id, vocabulary) for each of the user's documents stored packed."""
+    rows = db.execute(
+        select(DocumentVocabulary.document_id, DocumentVocabulary.data)
+        .join(Document, Document.id == DocumentVocabulary.document_id)
+        .where(Document.user_id == user_id)
+    )
+    for document_id, data in rows:
+        yield document_id, PackedVocabulary(data)
+
+def get_translations(db: Session, user_id: int, words: List[str]) -> Dict[str, str]:
+    """The user's translations of `words`, by word."""
+    translations = {}
+    for i in range(0, len(words), _WORD_BATCH_SIZE):
+        rows = db.execute(
+            select(UserTranslation.word, UserTranslation.translation).where(
+                UserTranslation.user_id == user_id, UserTranslation.word.in_(words[i:i + _WORD_BATCH_SIZE])
+            )
+        )
+        translations.update((word, translation) for word, translation in rows)
+    return translations
+
+def count_translated_words(db: Session, document_id: int, user_id: int) -> int:
+    """How many of the document's stored words the user has translated."""
+    vocabulary = load_vocabulary(db, document_id)
+    if vocabulary is not None:
+        words = db.execute(select(UserTranslation.word).where(UserTranslation.user_id == user_id)).scalars()
+        return sum(1 for word in words if vocabulary.get(word) is not None)
+    return db.execute(
+        select(func.count()).select_from(WordFrequency).join(
+            UserTranslation,
+            (UserTranslation.word == WordFrequency.word) & (UserTranslation.user_id == user_id)
+        ).where(WordFrequency.document_id == document_id)
+    ).scalar()
+
+def encode_cursor(frequency: int, word: str) -> str:
+    raw = json.dumps([frequency, word], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        frequency, word = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(frequency), str(word)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def get_word_page(
+    db: Session,
+    document_id: int,
+    user_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    min_frequency: int = 1,
+    prefix: Optional[str] = None,
+    sort: str = "frequency_desc"
+) -> Tuple[List[dict], Optional[str]]:
+    """Return one page of a document's words with the user's translations.
+
+    Uses keyset pagination: `cursor` encodes the (frequency, word) of the last
+    row of the previous page, so every page is an index range scan on
+    (document_id, frequency DESC, word) no matter how deep it is. Packed
+    documents are sliced in memory the same way and their page's
+    translations looked up by word.
+    """
+    if sort not in WORD_SORTS:
+        raise ValueError(f"Unsupported sort: {sort}")
+    vocabulary = load_vocabulary(db, document_id)
+    if vocabulary is not None:
+        last = decode_cursor(cursor) if cursor else None
+        page, has_more = vocabulary.page(limit, last, min_frequency, prefix, sort)
+        translations = get_translations(db, user_id, [word for word, _ in page])
+        next_cursor = encode_cursor(page[-1][1], page[-1][0]) if has_more else None
+        return [{"word": w, "frequency": f, "translation": translations.get(w)} for w, f in page], next_cursor
+
+    query = db.query(
+        WordFrequency.word,
+        WordFrequency.frequency,
+        UserTranslation.translation
+    ).outerjoin(
+        UserTranslation,
+        (UserTranslation.word == WordFrequency.word) & (UserTranslation.user_id == user_id)
+    ).filter(WordFrequency.document_id == document_id)
+
+    if min_frequency > 1:
+        query = query.filter(WordFrequency.frequency >= min_frequency)
+    if prefix:
+        query = query.filter(WordFrequency.word.startswith(prefix.lower(), autoescape=True))
+
+    last = decode_cursor(cursor) if cursor else None
+    freq, word = WordFrequency.frequency, WordFrequency.word
+    if sort == "frequency_desc":
+        if last:
+            query = query.filter(or_(freq < last[0], and_(freq == last[0], word > last[1])))
+        query = query.order_by(freq.desc(), word)
+    elif sort == "frequency_asc":
+        if last:
+            query = query.filter(or_(freq > last[0], and_(freq == last[0], word > last[1])))
+        query = query.order_by(freq, word)
+    elif sort == "word_asc":
+        if last:
+            query = query.filter(word > last[1])
+        query = query.order_by(word)
+    elif sort == "word_desc":
+        if last:
+            query = query.filter(word < last[1])
+        query = query.order_by(word.desc())
+    else:
+        raise ValueError(f"Unsupported sort: {sort}")
+
+    # Fetch one extra row to learn whether another page follows
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+
+    return [{"word": r[0], "frequency": r[1], "translation": r[2]} for r in rows], next_cursor
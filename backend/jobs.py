@@ -0,0 +1,187 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from .database import SessionLocal, engine
+from .models import Document, ProcessingJob
+from .processing import run_document_pipeline
+
+# Worker pool configuration
+# - "thread": jobs run in a thread pool inside the API process (default)
+# - "process": jobs run in a process pool, so extraction scales with cores
+# - "inline": jobs run synchronously in the request (used by the test suite)
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "thread").lower()
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 2)))
+AUTO_PROCESS_UPLOADS = os.getenv("AUTO_PROCESS_UPLOADS", "false").lower() == "true"
+
+# Queued and running jobs die with the process that owns them (shutdown,
+# crash, deploy). At startup those jobs are marked failed so their documents
+# can be processed again; with several API instances sharing one database,
+# turn that off and rely on JOB_STALE_AFTER_SECONDS alone.
+JOB_RECOVER_ON_STARTUP = os.getenv("JOB_RECOVER_ON_STARTUP", "true").lower() == "true"
+# An active job older than this no longer blocks reprocessing its document (0 = never)
+JOB_STALE_AFTER_SECONDS = int(os.getenv("JOB_STALE_AFTER_SECONDS", "3600"))
+
+ACTIVE_STATUSES = ("queued", "running")
+INTERRUPTED_ERROR = "Processing was interrupted; process the document again"
+
+_executor: Optional[Executor] = None
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if JOB_WORKER_MODE == "process":
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, initializer=_init_worker)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="doc-job")
+    return _executor
+
+def _init_worker():
+    # Forked workers inherit the parent's pooled connections; drop them without
+    # closing the parent's sockets so each worker opens its own
+    engine.dispose(close=False)
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def run_job(job_id: int, db: Optional[Session] = None):
+    """Execute a queued processing job and record its outcome on the job row.
+
+    Worker threads and processes open their own session; inline mode passes
+    the request session in.
+    """
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
+    try:
+        job = db.get(ProcessingJob, job_id)
+        if job is None or job.status != "queued":
+            return
+
+        job.status = "running"
+        job.started_at = func.now()
+        db.commit()
+
+        def on_progress(progress: int):
+            job.progress = progress
+            db.commit()
+
+        try:
+            doc = db.get(Document, job.document_id)
+            if doc is None:
+                raise RuntimeError("Document not found")
+            counts = run_document_pipeline(db, doc, on_progress)
+        except Exception as e:
+            db.rollback()
+            print(f"Processing job {job_id} failed: {e}")
+            if db.get(ProcessingJob, job_id) is None:
+                return # Deleted along with its document
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = func.now()
+            db.commit()
+            return
+
+        job.status = "done"
+        job.progress = 100
+        job.word_count = len(counts)
+        job.finished_at = func.now()
+        db.commit()
+    finally:
+        if owns_session:
+            db.close()
+
+def fail_interrupted_jobs(
+    db: Session,
+    document_id: Optional[int] = None,
+    older_than: Optional[datetime] = None
+) -> int:
+    """Mark queued and running jobs as failed and return how many there were.
+
+    Optionally only the jobs of one document, or only those started (or,
+    if never started, created) before `older_than`.
+    """
+    stmt = update(ProcessingJob).where(ProcessingJob.status.in_(ACTIVE_STATUSES))
+    if document_id is not None:
+        stmt = stmt.where(ProcessingJob.document_id == document_id)
+    if older_than is not None:
+        stmt = stmt.where(func.coalesce(ProcessingJob.started_at, ProcessingJob.created_at) < older_than)
+    result = db.execute(
+        stmt.values(status="failed", error=INTERRUPTED_ERROR, finished_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def recover_interrupted_jobs(db: Optional[Session] = None) -> int:
+    """Fail every job a previous run of the API left queued or running."""
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
+    try:
+        count = fail_interrupted_jobs(db)
+    finally:
+        if owns_session:
+            db.close()
+    if count:
+        print(f"Marked {count} interrupted processing job(s) as failed")
+    return count
+
+def enqueue_processing(db: Session, doc: Document) -> ProcessingJob:
+    """Create a processing job for `doc` and hand it to the worker pool.
+
+    If the document already has a queued or running job, that job is returned
+    instead of scheduling a duplicate, unless it is older than
+    JOB_STALE_AFTER_SECONDS: then it is failed and a new job is created.
+    """
+    if JOB_STALE_AFTER_SECONDS:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_AFTER_SECONDS)
+        fail_interrupted_jobs(db, doc.id, stale_before)
+    active = db.query(ProcessingJob).filter(
+        ProcessingJob.document_id == doc.id,
+        ProcessingJob.status.in_(ACTIVE_STATUSES)
+    ).first()
+    if active:
+        return active
+
+    job = ProcessingJob(document_id=doc.id, user_id=doc.user_id, status="queued", progress=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _dispatch(db, [job])
+    return job
+
+def enqueue_batch(db: Session, batch_id: int, docs: List[Document]) -> List[ProcessingJob]:
+    """Create one job per freshly uploaded document and fan them out together.
+
+    All jobs are committed at once, then submitted to the worker pool, which
+    runs up to JOB_WORKERS of them in parallel.
+    """
+    jobs = [
+        ProcessingJob(document_id=doc.id, user_id=doc.user_id, batch_id=batch_id, status="queued", progress=0)
+        for doc in docs
+    ]
+    db.add_all(jobs)
+    db.commit()
+    for job in jobs:
+        db.refresh(job)
+
+    _dispatch(db, jobs)
+    return jobs
+
+def _dispatch(db: Session, jobs: List[ProcessingJob]):
+    if JOB_WORKER_MODE == "inline":
+        for job in jobs:
+            run_job(job.id, db)
+            db.refresh(job)
+    else:
+        executor = get_executor()
+        for job in jobs:
+            executor.submit(run_job, job.id)
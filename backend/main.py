@@ -1,12 +1,56 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routes import auth, documents, translations
+from fastapi.responses import PlainTextResponse
+from .auth import password_hasher
+from .cache import get_result_cache
+from .database import async_engine, engine, storage
+from .jobs import JOB_RECOVER_ON_STARTUP, recover_interrupted_jobs, shutdown_executor
+from .metrics import Gauge, MetricsMiddleware, instrument_engine, register, render_metrics
+from .migrations import DB_MIGRATE_ON_STARTUP, upgrade_database
+from .response_cache import response_cache
+from .translator import get_translation_cache
+from .routes import auth, corpus, documents, stats, translations
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Count SQL statements per request on both engines
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
 
-app = FastAPI(title="Word Frequency Dashboard API")
+def _cache_requests():
+    values = {}
+    caches = (
+        ("result", get_result_cache().stats()),
+        ("translation", get_translation_cache().stats()),
+        ("response", response_cache.stats()),
+    )
+    for name, cache_stats in caches:
+        values[(name, "hit")] = cache_stats["hits"]
+        values[(name, "miss")] = cache_stats["misses"]
+    return values
+
+register(Gauge("cache_requests_total", "Lookups in the result, translation and response caches.", _cache_requests, ("cache", "outcome"), "counter"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables and bring older databases up to date
+    if DB_MIGRATE_ON_STARTUP:
+        upgrade_database(engine)
+    # Jobs queued or running when the previous process stopped will never finish
+    if JOB_RECOVER_ON_STARTUP:
+        recover_interrupted_jobs()
+    yield
+    # Stop handing out queued processing jobs on shutdown
+    shutdown_executor()
+    password_hasher.shutdown()
+    await storage.aclose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+app = FastAPI(title="Word Frequency Dashboard API", lifespan=lifespan)
+
+# Request latency and DB statement counts per route, served at /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Allow CORS for frontend development
 app.add_middleware(
@@ -21,6 +65,8 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(documents.router)
 app.include_router(translations.router)
+app.include_router(stats.router)
+app.include_router(corpus.router)
 
 @app.get("/")
 async def root():
@@ -28,7 +74,17 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "result_cache": get_result_cache().stats(),
+        "translation_cache": get_translation_cache().stats(),
+        "response_cache": response_cache.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
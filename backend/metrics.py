@@ -0,0 +1,287 @@
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import event
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+# In-process metrics in the Prometheus text format, served at /metrics.
+# Jobs run in a process pool (JOB_WORKER_MODE=process) record their stage
+# timings in the worker's own registry, which /metrics does not see.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Sampling profiler for single requests (X-Profile: 1); off unless enabled here
+METRICS_PROFILING_ENABLED = os.getenv("METRICS_PROFILING_ENABLED", "false").lower() == "true"
+METRICS_PROFILE_DIR = os.getenv("METRICS_PROFILE_DIR", "./.cache/profiles")
+METRICS_PROFILE_INTERVAL_MS = float(os.getenv("METRICS_PROFILE_INTERVAL_MS", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+def _escape_label_value(value) -> str:
+    # Exposition format escapes: backslash, double quote and line feed
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], list] = {} # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for label_values, values in series:
+            for bound, bucket_count in zip(self.buckets, values):
+                labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {values[-1]}")
+        return lines
+
+class Gauge:
+    """Value read from `fn` at scrape time; `fn` returns {label values: value}."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Dict[Tuple[str, ...], float]], labels: Tuple[str, ...] = (), type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labels = labels
+        self.type = type
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for label_values, value in sorted(self.fn().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.", ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent in each stage: download, extract, tokenize, persist, translate, export.",
+    ("stage",)
+)
+_registry: List = [REQUEST_SECONDS, REQUEST_DB_QUERIES, STAGE_SECONDS]
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+def _process_resources() -> Dict[Tuple[str, ...], float]:
+    if resource is None:
+        return {}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {("cpu_seconds",): round(usage.ru_utime + usage.ru_stime, 3), ("max_rss_bytes",): max_rss}
+
+register(Gauge("process_resource", "CPU time and peak resident memory of the API process.", _process_resources, ("resource",)))
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def observe_stage(stage: str, seconds: float):
+    _note_thread()
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, stage)
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block as one run of `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+class StageTimer:
+    """Times only the work of producing items from a lazy iterable.
+
+    Used where stages are interleaved, e.g. text extraction feeding the
+    tokenizer page by page; the total is recorded once the iterable ends.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.elapsed = 0.0
+
+    def wrap(self, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            observe_stage(self.stage, self.elapsed)
+
+# Per-request state; thread pool calls run in a copy of the context and share this object
+class RequestStats:
+    def __init__(self):
+        self.db_queries = 0
+        # Threads seen doing this request's work; the profiler samples only these
+        self.thread_ids: Set[int] = {threading.get_ident()}
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+def _note_thread():
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.thread_ids.add(threading.get_ident())
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.thread_ids.add(threading.get_ident())
+
+def instrument_engine(engine):
+    """Count statements run on `engine` (sync, or an AsyncEngine's sync_engine) towards the current request."""
+    if not event.contains(engine, "before_cursor_execute", _count_query):
+        event.listen(engine, "before_cursor_execute", _count_query)
+
+class SamplingProfiler:
+    """Samples the stacks of the threads in `thread_ids` every `interval` seconds.
+
+    `thread_ids` is read live, so threads added while sampling are picked
+    up. Writes the stacks in the folded format ("frame;frame;frame count")
+    that flamegraph tools read.
+    """
+
+    def __init__(self, thread_ids: Set[int], interval: float = METRICS_PROFILE_INTERVAL_MS / 1000):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self.thread_ids:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, name: str) -> str:
+        """Stop sampling and write the profile as `name`.folded; returns the file path."""
+        self._stop.set()
+        self._thread.join()
+        os.makedirs(METRICS_PROFILE_DIR, exist_ok=True)
+        path = os.path.join(METRICS_PROFILE_DIR, f"{name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and DB statement counts per route.
+
+    Timing stops at the last body chunk, so streamed responses are measured
+    in full. Routes are labelled by their path template (/documents/{doc_id})
+    to keep the number of series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        profiler = None
+        if METRICS_PROFILING_ENABLED and (b"x-profile", b"1") in scope.get("headers", []):
+            # The profile is written to METRICS_PROFILE_DIR/<X-Profile-Id>.folded
+            profile_id = uuid.uuid4().hex
+            profiler = SamplingProfiler(stats.thread_ids)
+            profiler.start()
+        start = time.perf_counter()
+        status_code = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route_path, str(status_code))
+            REQUEST_DB_QUERIES.observe(stats.db_queries, scope["method"], route_path)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profiler is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
+            _request_stats.reset(token)
+            if profiler is not None:
+                await asyncio.to_thread(profiler.stop, profile_id)
@@ -0,0 +1,121 @@
+import os
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+# Ordered schema changes for databases created before a model changed.
+# `Base.metadata.create_all` creates missing tables but never alters existing
+# ones, so every change to an existing table gets a step here. Steps must be
+# idempotent: fresh databases already have the new schema from create_all.
+
+# The API upgrades the schema when it starts. Deployments that run
+# `python -m backend.migrations` as a release step can turn that off so
+# workers start without touching the schema.
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+def _add_column(table: str, column: str, ddl_type: str):
+    def step(conn: Connection):
+        columns = {c["name"] for c in inspect(conn).get_columns(table)}
+        if column not in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+    return step
+
+def _create_index(name: str, table: str, columns: str, unique: bool = False):
+    def step(conn: Connection):
+        unique_sql = "UNIQUE " if unique else ""
+        conn.execute(text(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+    return step
+
+def _sql(statement: str):
+    def step(conn: Connection):
+        conn.execute(text(statement))
+    return step
+
+def _dedupe_user_translations(conn: Connection):
+    # Keep the most recent row per (user_id, word) before the unique index goes on
+    conn.execute(text(
+        "DELETE FROM user_translations WHERE id NOT IN "
+        "(SELECT MAX(id) FROM user_translations GROUP BY user_id, word)"
+    ))
+
+MIGRATIONS = [
+    ("0001_document_content_hash", [
+        _add_column("documents", "content_hash", "VARCHAR(64)"),
+        _create_index("ix_documents_content_hash", "documents", "content_hash"),
+    ]),
+    ("0002_word_frequency_doc_freq_word", [
+        _create_index("ix_word_frequency_doc_freq_word", "word_frequency", "document_id, frequency DESC, word"),
+    ]),
+    ("0003_user_token_version", [
+        _add_column("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ]),
+    ("0004_hot_path_indexes", [
+        _create_index("ix_documents_user_id", "documents", "user_id"),
+        _create_index("ix_word_frequency_doc_word", "word_frequency", "document_id, word"),
+        _dedupe_user_translations,
+        _create_index("uq_user_translations_user_word", "user_translations", "user_id, word", unique=True),
+    ]),
+    # Tables come from create_all; fill the counters for existing data once
+    ("0005_backfill_dashboard_stats", [
+        _sql(
+            "INSERT INTO user_stats (user_id, document_count, total_words, translation_count) "
+            "SELECT u.id, "
+            "(SELECT COUNT(*) FROM documents d WHERE d.user_id = u.id), "
+            "(SELECT COALESCE(SUM(wf.frequency), 0) FROM word_frequency wf "
+            " JOIN documents d ON d.id = wf.document_id WHERE d.user_id = u.id), "
+            "(SELECT COUNT(*) FROM user_translations ut WHERE ut.user_id = u.id) "
+            "FROM users u WHERE NOT EXISTS (SELECT 1 FROM user_stats s WHERE s.user_id = u.id)"
+        ),
+        _sql(
+            "INSERT INTO document_stats (document_id, unique_words, total_words, translated_words) "
+            "SELECT d.id, "
+            "(SELECT COUNT(*) FROM word_frequency wf WHERE wf.document_id = d.id), "
+            "(SELECT COALESCE(SUM(wf.frequency), 0) FROM word_frequency wf WHERE wf.document_id = d.id), "
+            "(SELECT COUNT(*) FROM word_frequency wf JOIN user_translations ut "
+            " ON ut.word = wf.word AND ut.user_id = d.user_id WHERE wf.document_id = d.id) "
+            "FROM documents d WHERE NOT EXISTS (SELECT 1 FROM document_stats s WHERE s.document_id = d.id)"
+        ),
+    ]),
+    ("0006_backfill_corpus_words", [
+        _sql(
+            "INSERT INTO corpus_words (user_id, word, total_frequency, document_count) "
+            "SELECT d.user_id, wf.word, SUM(wf.frequency), COUNT(*) "
+            "FROM word_frequency wf JOIN documents d ON d.id = wf.document_id "
+            "WHERE NOT EXISTS (SELECT 1 FROM corpus_words c WHERE c.user_id = d.user_id) "
+            "GROUP BY d.user_id, wf.word"
+        ),
+    ]),
+    ("0007_processing_job_batch", [
+        _add_column("processing_jobs", "batch_id", "INTEGER REFERENCES upload_batches(id)"),
+        _create_index("ix_processing_jobs_batch_id", "processing_jobs", "batch_id"),
+    ]),
+    ("0008_user_data_versions", [
+        _add_column("user_stats", "documents_version", "INTEGER NOT NULL DEFAULT 0"),
+        _add_column("user_stats", "translations_version", "INTEGER NOT NULL DEFAULT 0"),
+    ]),
+]
+
+def run_migrations(engine: Engine):
+    """Apply every migration step that has not been recorded yet."""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_migrations (name VARCHAR PRIMARY KEY)"))
+        applied = {row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    for name, steps in MIGRATIONS:
+        if name in applied:
+            continue
+        with engine.begin() as conn:
+            for step in steps:
+                step(conn)
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+
+def upgrade_database(engine: Engine):
+    """Create missing tables, then apply pending migrations."""
+    from . import models # Registers every table on Base.metadata
+    from .database import Base
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+if __name__ == "__main__":
+    from .database import engine
+    upgrade_database(engine)
+    print("Database schema is up to date")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary, Float, Index
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -8,16 +8,18 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0") # Bumped on password change
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     filename = Column(String, nullable=False)
     file_type = Column(String)
-    storage_path = Column(String, nullable=False) # Path in Supabase storage
+    storage_path = Column(String, nullable=False) # Path in document storage
+    content_hash = Column(String(64), index=True, nullable=True) # SHA-256 of the uploaded file
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
 
 class WordFrequency(Base):
@@ -29,6 +31,24 @@ class WordFrequency(Base):
     frequency = Column(Integer)
     translation = Column(String, nullable=True) # For Phase 2
 
+# Serves the paginated /words listing: one document, highest frequency first
+Index(
+    "ix_word_frequency_doc_freq_word",
+    WordFrequency.document_id,
+    WordFrequency.frequency.desc(),
+    WordFrequency.word
+)
+# Word-ordered listing and prefix search within one document
+Index("ix_word_frequency_doc_word", WordFrequency.document_id, WordFrequency.word)
+
+class DocumentVocabulary(Base):
+    """A document's whole frequency table as one blob (VOCABULARY_STORAGE=packed, see vocabulary.py)."""
+    __tablename__ = "document_vocabularies"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    word_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
 class UserTranslation(Base):
     __tablename__ = "user_translations"
 
@@ -37,3 +57,87 @@ class UserTranslation(Base):
     word = Column(String, index=True)
     translation = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# One translation per user and word; also serves the (user_id, word) joins and lookups
+Index("uq_user_translations_user_word", UserTranslation.user_id, UserTranslation.word, unique=True)
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    batch_id = Column(Integer, ForeignKey("upload_batches.id"), nullable=True, index=True) # Set for bulk uploads
+    status = Column(String, nullable=False, default="queued") # queued, running, done, failed
+    progress = Column(Integer, nullable=False, default=0) # Percent complete (0-100)
+    error = Column(String, nullable=True)
+    word_count = Column(Integer, nullable=True) # Unique words found once done
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class UploadBatch(Base):
+    __tablename__ = "upload_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ResultCacheEntry(Base):
+    __tablename__ = "result_cache"
+
+    key = Column(String, primary_key=True) # "<content sha256>:<filter version>"
+    data = Column(LargeBinary, nullable=False) # zlib-compressed JSON word counts
+    size = Column(Integer, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used = Column(Float, nullable=False, index=True) # Epoch seconds, drives LRU eviction
+
+class MachineTranslation(Base):
+    __tablename__ = "machine_translations"
+
+    # Shared by all users: a machine translation does not depend on who asked for it
+    source = Column(String(8), primary_key=True)
+    target = Column(String(8), primary_key=True)
+    word = Column(String, primary_key=True)
+    translation = Column(String, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(Float, nullable=False) # Epoch seconds, drives TTL expiry
+    last_used = Column(Float, nullable=False, index=True) # Epoch seconds, drives LRU eviction
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    # Dashboard counters, maintained incrementally by backend/stats.py
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    document_count = Column(Integer, nullable=False, default=0)
+    total_words = Column(Integer, nullable=False, default=0) # Word hits across all documents
+    translation_count = Column(Integer, nullable=False, default=0)
+    # Bumped on every change to the user's documents / translations; read endpoints derive ETags from them
+    documents_version = Column(Integer, nullable=False, default=0, server_default="0")
+    translations_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+class DocumentStats(Base):
+    __tablename__ = "document_stats"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    unique_words = Column(Integer, nullable=False, default=0)
+    total_words = Column(Integer, nullable=False, default=0)
+    translated_words = Column(Integer, nullable=False, default=0) # Stored words the owner has translated
+
+class CorpusWord(Base):
+    __tablename__ = "corpus_words"
+
+    # One row per word a user has across all their documents, maintained by backend/corpus.py
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    word = Column(String, primary_key=True)
+    total_frequency = Column(Integer, nullable=False)
+    document_count = Column(Integer, nullable=False) # Documents containing the word
+
+# Corpus-wide top-N: one user, most frequent first
+Index(
+    "ix_corpus_words_user_total_word",
+    CorpusWord.user_id,
+    CorpusWord.total_frequency.desc(),
+    CorpusWord.word
+)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import time
+from collections import Counter
+from typing import Callable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .cache import get_result_cache, result_cache_key
+from .corpus import add_document_to_corpus, remove_document_from_corpus
+from .database import storage
+from .frequencies import replace_word_frequencies
+from .metrics import StageTimer, observe_stage, span
+from .models import Document
+from .stats import record_document_processed
+from .utils.text_processing import count_words, iter_document_text
+
+# Number of most frequent words stored per document (0 keeps the full vocabulary)
+VOCAB_TOP_N = int(os.getenv("VOCAB_TOP_N", "0"))
+
+def run_document_pipeline(
+    db: Session,
+    doc: Document,
+    on_progress: Optional[Callable[[int], None]] = None
+) -> Counter:
+    """Download, extract, count and store the word frequencies of a document.
+
+    Counts come from the result cache when the same file content was already
+    processed under the current tokenizer rules, skipping the download and
+    extraction. `on_progress` is called with a percentage after each stage.
+    It may commit the session, so the old frequencies are only replaced at
+    the very end.
+    """
+    def report(progress: int):
+        if on_progress:
+            on_progress(progress)
+
+    # 1. Reuse counts from an earlier run over the same content and tokenizer rules
+    cache = get_result_cache()
+    counts = cache.get(db, result_cache_key(doc.content_hash)) if doc.content_hash else None
+
+    if counts is None:
+        # 2. Download from storage (workers run outside the event loop)
+        try:
+            with span("download"):
+                content = storage.download_sync(doc.storage_path)
+        except Exception as e:
+            raise RuntimeError(f"Failed to download file: {str(e)}")
+        if not doc.content_hash:
+            # Documents uploaded before hashing was added get one on first processing
+            doc.content_hash = hashlib.sha256(content).hexdigest()
+        report(20)
+
+        # 3. Extract text and count frequencies chunk by chunk (timed apart, though interleaved)
+        extract = StageTimer("extract")
+        start = time.perf_counter()
+        try:
+            counts = count_words(extract.wrap(iter_document_text(content, doc.file_type)))
+        except Exception as e:
+            raise RuntimeError(f"Text extraction failed: {str(e)}")
+        observe_stage("tokenize", time.perf_counter() - start - extract.elapsed)
+        report(60)
+        cache.put(db, result_cache_key(doc.content_hash), counts)
+    report(80)
+
+    # 4. Replace existing frequencies for this doc (and its counters) in a single transaction
+    items = counts.most_common(VOCAB_TOP_N or None)
+    with span("persist"):
+        # Lock the document: a concurrent delete either finishes first (and the
+        # job fails here) or waits for this transaction and removes what it wrote
+        locked = db.execute(select(Document.id).where(Document.id == doc.id).with_for_update()).first()
+        if locked is None:
+            raise RuntimeError("Document was deleted during processing")
+        remove_document_from_corpus(db, doc.id, doc.user_id)
+        replace_word_frequencies(db, doc.id, items)
+        add_document_to_corpus(db, doc.user_id, items)
+        record_document_processed(db, doc.id, doc.user_id, items)
+        db.commit()
+
+    return counts
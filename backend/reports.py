@@ -0,0 +1,164 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from fpdf import FPDF, XPos, YPos
+from fontTools import ttLib
+from fpdf.fonts import SubsetMap, TTFFont
+
+# Font path for Unicode support
+FONT_PATH = os.path.join(os.path.dirname(__file__), "assets", "fonts", "HindSiliguri-Regular.ttf")
+
+PDF_SHAPING_CACHE_SIZE = int(os.getenv("PDF_SHAPING_CACHE_SIZE", "4096"))
+
+# Table layout: (header, column width in mm)
+REPORT_COLUMNS = (("Word", 80), ("Freq", 40), ("Translation", 70))
+ROW_HEIGHT = 10
+
+class _ShapingCache:
+    """Thread-safe LRU of HarfBuzz output, shared by every report in the process."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+_shaping_cache = _ShapingCache(PDF_SHAPING_CACHE_SIZE)
+
+class _ReportFont(TTFFont):
+    """The Bengali font for one report, built from metrics parsed once per process.
+
+    fpdf2 subsets a document's font tables in place when it writes the PDF,
+    so each report gets its own lazily loaded font file handle and subset;
+    the glyph maps and widths, which nothing mutates, are shared. Glyph runs
+    for words already shaped come from the process-wide shaping cache.
+    """
+    __slots__ = ()
+
+    # TTFFont attributes that are the same for every document, and those each
+    # document sets up itself. Written against fpdf2 2.8 (pinned in
+    # requirements.txt); check_layout() refuses any other attribute set.
+    SHARED = (
+        "type", "ttffile", "fontkey", "collection_font_number", "is_compressed", "is_cff",
+        "is_cid_keyed", "is_symbol", "cff_ros", "scale", "desc", "cw", "cmap", "glyph_ids",
+        "name", "up", "ut", "sp", "ss", "emphasis", "palette_index",
+    )
+    PER_DOCUMENT = ("i", "ttfont", "_hbfont", "biggest_size_pt", "missing_glyphs", "subset", "color_font")
+
+    @classmethod
+    def check_layout(cls, parsed: TTFFont):
+        """Raise if fpdf2's TTFFont sets attributes other than the ones this class copies or rebuilds."""
+        present = {name for name in TTFFont.__slots__ if hasattr(parsed, name)}
+        expected = set(cls.SHARED) | set(cls.PER_DOCUMENT)
+        if present != expected:
+            raise RuntimeError(
+                f"Unsupported fpdf2 font layout (unexpected: {sorted(present - expected)}, "
+                f"missing: {sorted(expected - present)}); update _ReportFont for this fpdf2 version"
+            )
+
+    def __init__(self, pdf: FPDF, parsed: TTFFont):
+        # Mirrors what TTFFont.__init__ sets up, minus the parsing
+        for name in self.SHARED:
+            setattr(self, name, getattr(parsed, name))
+        self.i = len(pdf.fonts) + 1
+        self.ttfont = ttLib.TTFont(
+            parsed.ttffile, recalcTimestamp=False, fontNumber=parsed.collection_font_number, lazy=True
+        )
+        self._hbfont = None
+        self.biggest_size_pt = 0
+        self.missing_glyphs = []
+        self.subset = SubsetMap(self)
+        self.color_font = None # HindSiliguri has no colour glyphs
+
+    def perform_harfbuzz_shaping(self, text, font_size_pt, text_shaping_params):
+        key = (str(self.ttffile), text, font_size_pt, repr(text_shaping_params))
+        shaped = _shaping_cache.get(key)
+        if shaped is None:
+            shaped = super().perform_harfbuzz_shaping(text, font_size_pt, text_shaping_params)
+            _shaping_cache.put(key, shaped)
+        return shaped
+
+@lru_cache(maxsize=1)
+def _bengali_font() -> Tuple[Optional[TTFFont], bool]:
+    """Parse the Bengali font once per process and check whether text shaping works.
+
+    Returns (font, shaping_available); font is None if it cannot be loaded.
+    """
+    if not os.path.exists(FONT_PATH):
+        return None, False
+    pdf = FPDF()
+    try:
+        pdf.add_font("Bengali", style="", fname=FONT_PATH)
+    except Exception as e:
+        print(f"Font Load Error: {e}")
+        return None, False
+    font = pdf.fonts["bengali"]
+    _ReportFont.check_layout(font)
+    try:
+        pdf.set_text_shaping(True) # Needs uharfbuzz for ligatures
+    except Exception as e:
+        print(f"Text Shaping Error: {e}")
+        return font, False
+    return font, True
+
+class VocabularyReport(FPDF):
+    """Page template: title on the first page, the table header on every page."""
+
+    def __init__(self, title: str):
+        super().__init__()
+        self.report_title = title
+        parsed_font, self.shaping_available = _bengali_font()
+        if parsed_font is not None:
+            # Registered the way add_font() does, without parsing the file again
+            self.fonts["bengali"] = _ReportFont(self, parsed_font)
+            self.font_family_name = "Bengali"
+        else:
+            self.font_family_name = "Helvetica"
+
+    def header(self):
+        if self.page_no() == 1:
+            self.set_font(self.font_family_name, size=16)
+            self.write_cell(0, 10, f"Vocabulary Analysis: {self.report_title}", align="C",
+                            new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self.ln(10)
+
+        # Table Header
+        self.set_font(self.font_family_name, size=12)
+        for name, width in REPORT_COLUMNS:
+            self.write_cell(width, ROW_HEIGHT, name, border=1)
+        self.ln()
+        self.set_font(self.font_family_name, size=10)
+
+    def write_cell(self, width: float, height: float, text: str, **kwargs):
+        # Only non-ASCII text (Bengali) needs HarfBuzz shaping and bidi analysis
+        if self.shaping_available:
+            self.set_text_shaping(not text.isascii())
+        self.cell(width, height, text, **kwargs)
+
+def render_vocabulary_report(title: str, rows: Iterable[Tuple[str, int, Optional[str]]]) -> bytes:
+    pdf = VocabularyReport(title)
+    pdf.add_page()
+
+    # Table Content
+    for word, freq, translation in rows:
+        pdf.write_cell(REPORT_COLUMNS[0][1], ROW_HEIGHT, word, border=1)
+        pdf.write_cell(REPORT_COLUMNS[1][1], ROW_HEIGHT, str(freq), border=1)
+        pdf.write_cell(REPORT_COLUMNS[2][1], ROW_HEIGHT, translation or "", border=1)
+        pdf.ln()
+
+    return bytes(pdf.output())
@@ -0,0 +1,101 @@
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+# Serialized JSON bodies of read endpoints, keyed by (user, resource, data
+# version). Versions live in user_stats and are bumped by every write
+# (backend/stats.py), so a new version simply misses and old entries age out.
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+class ResponseCache:
+    """Thread-safe LRU of response bodies, bounded by their total size."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Hashable, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+response_cache = ResponseCache()
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in tags or "*" in tags
+
+def cached_json_response(
+    request: Request,
+    user_id: int,
+    resource: Tuple,
+    version: Tuple[int, ...],
+    adapter: TypeAdapter,
+    build: Callable[[], object]
+) -> Response:
+    """Serve `resource` at `version` with an ETag.
+
+    A matching If-None-Match gets 304; otherwise the body comes from the
+    cache, or from `build()` validated and serialized through `adapter` and
+    then cached. Exceptions from `build()` are never cached. Checks every
+    request needs, such as ownership or existence, must run before this call:
+    a 304 or a cached body skips `build()`.
+    """
+    # The user is part of the tag so a shared browser cache never mixes accounts
+    resource_tag = format(zlib.crc32(repr(resource).encode("utf-8")), "08x")
+    etag = '"' + ".".join(str(part) for part in (user_id, *version, resource_tag)) + '"'
+    # no-cache: clients may keep the body but must revalidate it every time
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (user_id, resource, version)
+    body = response_cache.get(key)
+    if body is None:
+        body = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        response_cache.put(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
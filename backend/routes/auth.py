@@ -1,40 +1,67 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from ..database import get_db
+from ..database import get_async_db
 from ..models import User
 from ..schemas import UserCreate, UserResponse, Token
-from ..auth import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..auth import (
+    get_password_hash, verify_password, needs_rehash, create_access_token,
+    password_hasher, principal_cache, HashingBusy, Principal, ACCESS_TOKEN_EXPIRE_MINUTES
+)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+async def hash_in_pool(fn, *args):
+    """Run a bcrypt call on the dedicated hashing pool, shedding load when it is full."""
+    try:
+        return await password_hasher.run(fn, *args)
+    except HashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
 @router.post("/signup", response_model=UserResponse)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(User).where(User.email == user.email))).scalar_one_or_none()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_pwd = get_password_hash(user.password)
+    hashed_pwd = await hash_in_pool(get_password_hash, user.password)
     new_user = User(email=user.email, hashed_password=hashed_pwd)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == form_data.username))).scalar_one_or_none()
+    if not user or not await hash_in_pool(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if needs_rehash(user.hashed_password):
+        # BCRYPT_ROUNDS changed: upgrade the stored hash while we have the password.
+        # A Core UPDATE skips the mapper hooks, so existing tokens stay valid.
+        try:
+            new_hash = await password_hasher.run(get_password_hash, form_data.password)
+        except HashingBusy:
+            new_hash = None # Try again on a later login
+        if new_hash:
+            await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+            await db.commit()
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id, "ver": user.token_version},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -44,7 +71,12 @@ from ..auth import SECRET_KEY, ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    # Fast path: a token seen recently needs neither signature checks nor a DB lookup
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,8 +89,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+
+    # Tokens issued before the uid claim was added are looked up by email
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = await db.get(User, user_id)
+    else:
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    if user is None or user.email != email:
         raise credentials_exception
-    return user
+    if "ver" in payload and payload["ver"] != user.token_version:
+        # Password changed since the token was issued
+        raise credentials_exception
+
+    principal = Principal(id=user.id, email=user.email)
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_db
+from ..auth import Principal
+from ..schemas import CorpusWordPage, CorpusWordResponse, WordDocumentResponse
+from ..corpus import SEARCH_MODES, get_top_words, get_word_documents, search_words
+from .auth import get_current_user
+
+router = APIRouter(prefix="/corpus", tags=["Corpus"])
+
+@router.get("/words", response_model=CorpusWordPage)
+def get_corpus_words(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    prefix: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    # Most frequent words across all of the user's documents
+    try:
+        items, next_cursor = get_top_words(db, current_user.id, limit=limit, cursor=cursor, prefix=prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/search", response_model=List[CorpusWordResponse])
+def search_corpus(
+    q: str = Query(..., min_length=1, max_length=100),
+    mode: str = Query("prefix", pattern=f"^({'|'.join(SEARCH_MODES)})$"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    return search_words(db, current_user.id, q, mode=mode, limit=limit)
+
+@router.get("/words/{word}/documents", response_model=List[WordDocumentResponse])
+def get_documents_for_word(
+    word: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    return get_word_documents(db, current_user.id, word, limit=limit)
@@ -1,51 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import List, Optional
+import asyncio
 import uuid
-import io
-import pandas as pd
-from fpdf import FPDF
-from ..database import get_db, supabase
-from ..models import Document, User, WordFrequency, UserTranslation
-from ..schemas import DocumentResponse, WordFrequencyResponse
-from .auth import get_current_user
-import os
-
-# Font path for Unicode support
-FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "fonts", "HindSiliguri-Regular.ttf")
-
-from ..utils.text_processing import (
-    extract_text_from_pdf,
-    extract_text_from_docx,
-    extract_text_from_txt,
-    tokenize_and_count
+import hashlib
+from ..database import STORAGE_MAX_CONNECTIONS, get_async_db, get_db, iter_upload_file, storage
+from ..models import Document, ProcessingJob, UploadBatch
+from ..auth import Principal
+from ..schemas import (
+    DocumentResponse, DocumentUploadResponse, WordFrequencyPage, ProcessingJobResponse, UploadBatchResponse
 )
+from ..frequencies import WORD_SORTS, delete_word_frequencies, get_word_page
+from ..jobs import enqueue_batch, enqueue_processing, AUTO_PROCESS_UPLOADS
+from ..batches import BULK_UPLOAD_MAX_FILES, DOCUMENT_TYPES, UploadSource, expand_uploads, summarize_batch
+from ..exports import PDF_ROW_LIMIT, build_excel, iter_export_rows, iter_file, stream_csv
+from ..metrics import StageTimer, span
+from ..response_cache import cached_json_response
+from ..stats import get_data_versions, record_document_added, record_documents_added, record_document_deleted
+from ..corpus import remove_document_from_corpus
+from .auth import get_current_user
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
-@router.post("/upload", response_model=DocumentResponse)
+DOCUMENT_LIST = TypeAdapter(List[DocumentResponse])
+WORD_PAGE = TypeAdapter(WordFrequencyPage)
+
+@router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    process: bool = AUTO_PROCESS_UPLOADS,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     # 1. Validate file type
-    allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "text/plain"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in DOCUMENT_TYPES.values():
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, DOCX, and TXT allowed.")
 
-    # 2. Upload to Supabase Storage
+    # 2. Stream to storage, hashing the content on the way
     file_ext = file.filename.split(".")[-1]
     unique_filename = f"{uuid.uuid4()}.{file_ext}"
     storage_path = f"user_{current_user.id}/{unique_filename}"
+    content_hash = hashlib.sha256()
     
     try:
-        content = await file.read()
-        res = supabase.storage.from_("documents").upload(storage_path, content)
-        if hasattr(res, 'error') and res.error:
-            raise Exception(res.error)
+        await storage.upload(storage_path, iter_upload_file(file, hasher=content_hash), file.content_type)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload to storage failed: {str(e)}")
 
@@ -54,202 +56,251 @@ async def upload_document(
         user_id=current_user.id,
         filename=file.filename,
         file_type=file.content_type,
-        storage_path=storage_path
+        storage_path=storage_path,
+        content_hash=content_hash.hexdigest()
     )
     db.add(new_doc)
-    db.commit()
-    db.refresh(new_doc)
-    
-    return new_doc
+    await db.flush()
+    await db.run_sync(record_document_added, new_doc.id, current_user.id)
+    await db.commit()
+    await db.refresh(new_doc)
+
+    # 4. Optionally queue processing right away
+    response = DocumentUploadResponse.model_validate(new_doc)
+    if process:
+        response.job = ProcessingJobResponse.model_validate(await db.run_sync(enqueue_processing, new_doc))
+
+    return response
+
+def _batch_response(batch_id: int, rows, rejected: Optional[List[dict]] = None) -> UploadBatchResponse:
+    jobs = [{**ProcessingJobResponse.model_validate(job).model_dump(), "filename": filename} for job, filename in rows]
+    batch_status, progress = summarize_batch([job for job, _ in rows])
+    return UploadBatchResponse(id=batch_id, status=batch_status, progress=progress, jobs=jobs, rejected=rejected or [])
+
+@router.post("/bulk", response_model=UploadBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_upload_documents(
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    # 1. Unpack zip archives and validate file types
+    sources, rejected = expand_uploads(files)
+    if not sources:
+        raise HTTPException(status_code=400, detail="No PDF, DOCX, or TXT files in upload.")
+    if len(sources) > BULK_UPLOAD_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files. At most {BULK_UPLOAD_MAX_FILES} per upload.")
+
+    # 2. Stream all files to storage concurrently, hashing each on the way
+    connections = asyncio.Semaphore(STORAGE_MAX_CONNECTIONS)
+
+    async def store(source: UploadSource):
+        storage_path = f"user_{current_user.id}/{uuid.uuid4()}.{source.filename.split('.')[-1]}"
+        content_hash = hashlib.sha256()
+        async with connections:
+            await storage.upload(storage_path, source.open_chunks(content_hash), source.content_type)
+        return storage_path, content_hash.hexdigest()
+
+    results = await asyncio.gather(*(store(source) for source in sources), return_exceptions=True)
+
+    # 3. Save the batch and its documents in one transaction
+    docs = []
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            rejected.append({"filename": source.filename, "error": f"Upload to storage failed: {str(result)}"})
+            continue
+        storage_path, content_hash = result
+        docs.append(Document(
+            user_id=current_user.id,
+            filename=source.filename,
+            file_type=source.content_type,
+            storage_path=storage_path,
+            content_hash=content_hash
+        ))
+    if not docs:
+        raise HTTPException(status_code=500, detail="Upload to storage failed for every file.")
+
+    batch = UploadBatch(user_id=current_user.id)
+    db.add(batch)
+    for doc in docs:
+        db.add(doc)
+    await db.flush()
+    await db.run_sync(record_documents_added, [doc.id for doc in docs], current_user.id)
+    await db.commit()
+
+    # 4. Fan processing out across the worker pool
+    jobs = await db.run_sync(enqueue_batch, batch.id, docs)
+    return _batch_response(batch.id, [(job, doc.filename) for job, doc in zip(jobs, docs)], rejected)
+
+@router.get("/batches/{batch_id}", response_model=UploadBatchResponse)
+def get_upload_batch(
+    batch_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    batch = db.query(UploadBatch.id).filter(UploadBatch.id == batch_id, UploadBatch.user_id == current_user.id).first()
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    rows = db.execute(
+        select(ProcessingJob, Document.filename)
+        .join(Document, Document.id == ProcessingJob.document_id)
+        .where(ProcessingJob.batch_id == batch_id)
+        .order_by(ProcessingJob.id)
+    ).all()
+    return _batch_response(batch_id, rows)
 
 @router.get("/", response_model=List[DocumentResponse])
-def list_documents(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(Document).filter(Document.user_id == current_user.id).all()
+def list_documents(request: Request, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    documents_version, _ = get_data_versions(db, current_user.id)
+    return cached_json_response(
+        request, current_user.id, ("documents",), (documents_version,), DOCUMENT_LIST,
+        lambda: db.query(Document).filter(Document.user_id == current_user.id).all()
+    )
 
-@router.post("/{doc_id}/process", response_model=List[WordFrequencyResponse])
+@router.post("/{doc_id}/process", response_model=ProcessingJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def process_document(
     doc_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     # 1. Fetch document metadata
-    doc = db.query(Document).filter(Document.id == doc_id, Document.user_id == current_user.id).first()
+    doc = (await db.execute(
+        select(Document).where(Document.id == doc_id, Document.user_id == current_user.id)
+    )).scalar_one_or_none()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # 2. Download from Supabase
-    try:
-        res = supabase.storage.from_("documents").download(doc.storage_path)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to download file: {str(e)}")
-
-    # 3. Extract Text
-    text = ""
-    try:
-        if "pdf" in doc.file_type:
-            text = extract_text_from_pdf(res)
-        elif "word" in doc.file_type:
-            text = extract_text_from_docx(res)
-        else:
-            text = extract_text_from_txt(res)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Text extraction failed: {str(e)}")
+    # 2. Queue extraction and counting on the worker pool
+    job = await db.run_sync(enqueue_processing, doc)
+    return ProcessingJobResponse.model_validate(job)
 
-    # 4. Count Frequencies
-    counts = tokenize_and_count(text)
-
-    # 5. Clear existing frequencies for this doc
-    db.query(WordFrequency).filter(WordFrequency.document_id == doc_id).delete()
-
-    # 6. Save to DB
-    word_freqs = []
-    for word, freq in counts.most_common(500): # Limit to top 500 for MVP
-        wf = WordFrequency(document_id=doc_id, word=word, frequency=freq)
-        db.add(wf)
-        word_freqs.append(wf)
-    
-    db.commit()
-    return word_freqs
+@router.get("/{doc_id}/jobs/{job_id}", response_model=ProcessingJobResponse)
+def get_processing_job(
+    doc_id: int,
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    job = db.query(ProcessingJob).filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.document_id == doc_id,
+        ProcessingJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-@router.get("/{doc_id}/words", response_model=List[WordFrequencyResponse])
+@router.get("/{doc_id}/words", response_model=WordFrequencyPage)
 def get_document_words(
+    request: Request,
     doc_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    min_frequency: int = Query(1, ge=1),
+    prefix: Optional[str] = None,
+    sort: str = Query("frequency_desc", pattern=f"^({'|'.join(WORD_SORTS)})$"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    # Verify ownership
-    # Join with UserTranslation to get global translations
-    results = db.query(
-        WordFrequency.word,
-        WordFrequency.frequency,
-        UserTranslation.translation
-    ).outerjoin(
-        UserTranslation,
-        (UserTranslation.word == WordFrequency.word) & (UserTranslation.user_id == current_user.id)
-    ).filter(WordFrequency.document_id == doc_id).order_by(WordFrequency.frequency.desc()).all()
-    
-    # Map to dictionary to ensure Pydantic compatibility
-    return [{"word": r[0], "frequency": r[1], "translation": r[2]} for r in results]
+    # Verify ownership on every request: a 304 or a cached page skips build()
+    doc = db.query(Document.id).filter(Document.id == doc_id, Document.user_id == current_user.id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    def build():
+        # Join with UserTranslation to get global translations, one page at a time
+        try:
+            items, next_cursor = get_word_page(
+                db, doc_id, current_user.id,
+                limit=limit, cursor=cursor, min_frequency=min_frequency, prefix=prefix, sort=sort
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": items, "next_cursor": next_cursor}
+
+    # Pages change when any of the user's documents is processed or a translation changes
+    resource = ("words", doc_id, limit, cursor, min_frequency, prefix, sort)
+    return cached_json_response(
+        request, current_user.id, resource, get_data_versions(db, current_user.id), WORD_PAGE, build
+    )
 
 @router.get("/{doc_id}/export/{format}")
 def export_document_data(
     doc_id: int,
     format: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    # 1. Verify ownership and get data
+    # 1. Verify ownership
     doc = db.query(Document).filter(Document.id == doc_id, Document.user_id == current_user.id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    
-    # Get word frequencies and join with translations if they exist
-    results = db.query(
-        WordFrequency.word,
-        WordFrequency.frequency,
-        UserTranslation.translation
-    ).outerjoin(
-        UserTranslation, 
-        (UserTranslation.word == WordFrequency.word) & (UserTranslation.user_id == current_user.id)
-    ).filter(WordFrequency.document_id == doc_id).order_by(WordFrequency.frequency.desc()).all()
-
-    df = pd.DataFrame(results, columns=["Word", "Frequency", "Translation"])
-    df["Translation"] = df["Translation"].fillna("-")
 
+    # 2. Stream word frequencies (joined with translations) straight into the file
     if format == "csv":
-        stream = io.StringIO()
-        df.to_csv(stream, index=False)
-        return Response(
-            content=stream.getvalue(),
+        return StreamingResponse(
+            StageTimer("export").wrap(stream_csv(iter_export_rows(db, doc_id, current_user.id))),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={doc.filename}_analysis.csv"}
         )
     
     elif format == "excel":
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Vocabulary")
-        return Response(
-            content=output.getvalue(),
+        with span("export"):
+            output = build_excel(iter_export_rows(db, doc_id, current_user.id))
+        return StreamingResponse(
+            iter_file(output),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f"attachment; filename={doc.filename}_analysis.xlsx"}
         )
 
     elif format == "pdf":
-        pdf = FPDF()
-        
-        # Register Bengali font if it exists
-        bengali_font_path = FONT_PATH
-        if os.path.exists(bengali_font_path):
-            try:
-                # In fpdf2, we just pass the path and a name
-                pdf.add_font("Bengali", style="", fname=bengali_font_path)
-                pdf.set_text_shaping(True) # Enable shaping for ligatures
-                font_family = "Bengali"
-            except Exception as e:
-                print(f"Font Load Error: {e}")
-                font_family = "Arial"
-        else:
-            font_family = "Arial"
-
-        pdf.add_page()
-        # Set font for title
-        pdf.set_font(font_family, size=16)
-        pdf.cell(0, 10, f"Vocabulary Analysis: {doc.filename}", ln=True, align="C")
-        pdf.ln(10)
-        
-        # Table Header
-        pdf.set_font(font_family, size=12)
-        pdf.cell(80, 10, "Word", border=1)
-        pdf.cell(40, 10, "Freq", border=1)
-        pdf.cell(70, 10, "Translation", border=1)
-        pdf.ln()
-        
-        # Table Content
-        pdf.set_font(font_family, size=10)
-        for _, row in df.head(100).iterrows(): # Limit PDF to top 100
-            pdf.cell(80, 10, str(row["Word"]), border=1)
-            pdf.cell(40, 10, str(row["Frequency"]), border=1)
-            
-            translation = str(row["Translation"])
-            pdf.cell(70, 10, translation if translation != "-" else "", border=1)
-            pdf.ln()
+        # fpdf2 and the font shaping stack load on the first PDF export
+        from ..reports import render_vocabulary_report
+        rows = iter_export_rows(db, doc_id, current_user.id, limit=PDF_ROW_LIMIT)
+        with span("export"):
+            content = render_vocabulary_report(doc.filename, rows)
         return Response(
-            content=bytes(pdf.output()),
+            content=content,
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename={doc.filename}_analysis.pdf"}
         )
 
     else:
         raise HTTPException(status_code=400, detail="Unsupported export format")
+
 @router.delete("/{doc_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_document(
+async def delete_document(
     doc_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    # 1. Verify ownership and get document
-    doc = db.query(Document).filter(Document.id == doc_id, Document.user_id == current_user.id).first()
+    # 1. Verify ownership and lock the document until it is gone, so a running
+    #    processing job cannot write frequencies for it in between
+    doc = (await db.execute(
+        select(Document).where(Document.id == doc_id, Document.user_id == current_user.id).with_for_update()
+    )).scalar_one_or_none()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # 2. Remove from Supabase Storage
+    # 2. Remove from storage
     try:
-        # Supabase storage.remove expects a list of paths
-        supabase.storage.from_("documents").remove([doc.storage_path])
+        await storage.remove([doc.storage_path])
     except Exception as e:
         print(f"Non-critical Storage Error: {str(e)}")
         # We continue so the user can at least remove the entry from the UI
 
     try:
         # 3. Delete word frequencies (Explicit delete for safety)
-        db.query(WordFrequency).filter(WordFrequency.document_id == doc_id).delete(synchronize_session=False)
+        await db.run_sync(remove_document_from_corpus, doc_id, current_user.id)
+        await db.run_sync(delete_word_frequencies, doc_id)
+        await db.execute(delete(ProcessingJob).where(ProcessingJob.document_id == doc_id))
+        await db.run_sync(record_document_deleted, doc_id, current_user.id)
         
         # 4. Delete document record
-        db.delete(doc)
-        db.commit()
+        await db.delete(doc)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database deletion failed: {str(e)}")
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
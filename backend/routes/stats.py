@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..database import get_db
+from ..auth import Principal
+from ..schemas import StatsResponse
+from ..stats import get_stats
+from .auth import get_current_user
+
+router = APIRouter(tags=["Stats"])
+
+@router.get("/stats", response_model=StatsResponse)
+def get_dashboard_stats(
+    document_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    # Counters are kept up to date on every write, so this is two key lookups
+    return get_stats(db, current_user.id, document_id)
@@ -1,82 +1,180 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import UserTranslation, User
+from typing import Dict, Iterator, List
+from ..database import get_db, insert_on_conflict
+from ..models import UserTranslation
+from ..auth import Principal
+from ..dictionary import Dictionary, get_dictionary
+from ..response_cache import cached_json_response
+from ..stats import get_data_versions, record_translations_added, record_translations_changed, record_translations_removed
 from ..schemas import UserTranslationCreate, UserTranslationResponse, SuggestionResponse, BatchTranslationRequest
+from ..translator import (
+    SOURCE_LANGUAGE, TARGET_LANGUAGE, get_machine_translator, get_translation_cache, iter_translated_chunks
+)
 from .auth import get_current_user
-from deep_translator import GoogleTranslator
 
 router = APIRouter(prefix="/translations", tags=["Translations"])
 
-# Basic dictionary for common suggestions (free/local approach)
-COMMON_DICTIONARY = {
-    "government": ["সরকার", "প্রশাসন"],
-    "election": ["নির্বাচন"],
-    "people": ["জনগণ", "মানুষ"],
-    "development": ["উন্নয়ন"],
-    "country": ["দেশ"],
-    "policy": ["নীতি", "নীতিমালা"],
-    "system": ["পদ্ধতি", "ব্যবস্থা"],
-    "process": ["প্রক্রিয়া"],
-    "provide": ["প্রদান করা"],
-    "support": ["সমর্থন", "সাহায্য"],
-}
+TRANSLATION_LIST = TypeAdapter(List[UserTranslationResponse])
+
+# Columns of UserTranslationResponse, returned straight from INSERT ... RETURNING
+RESPONSE_COLUMNS = (
+    UserTranslation.id, UserTranslation.user_id, UserTranslation.word,
+    UserTranslation.translation, UserTranslation.created_at
+)
 
 @router.post("/", response_model=UserTranslationResponse)
 def save_translation(
     translation: UserTranslationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    # Check if a translation already exists for this word
+    word = translation.word.lower()
+
+    # 1. Insert or overwrite in one statement where the database supports ON CONFLICT.
+    # The conflict update leaves created_at alone, so only a freshly inserted
+    # row comes back with the timestamp set here.
+    stmt = insert_on_conflict(db.get_bind(), UserTranslation, ["user_id", "word"], ["translation"])
+    if stmt is not None:
+        created_at = datetime.now(timezone.utc)
+        saved = db.execute(
+            stmt.values(user_id=current_user.id, word=word, translation=translation.translation, created_at=created_at)
+            .returning(*RESPONSE_COLUMNS)
+        ).one()
+        returned_at = saved.created_at
+        if returned_at.tzinfo is None: # SQLite keeps naive UTC timestamps
+            returned_at = returned_at.replace(tzinfo=timezone.utc)
+        if returned_at == created_at:
+            record_translations_added(db, current_user.id, [word])
+        else:
+            # Already translated and overwritten: dashboard counters are unchanged
+            record_translations_changed(db, current_user.id)
+        db.commit()
+        return saved._asdict()
+
+    # 2. Otherwise check if a translation already exists for this word
     existing = db.query(UserTranslation).filter(
         UserTranslation.user_id == current_user.id,
-        UserTranslation.word == translation.word.lower()
+        UserTranslation.word == word
     ).first()
 
     if existing:
         existing.translation = translation.translation
+        record_translations_changed(db, current_user.id)
         db.commit()
         db.refresh(existing)
         return existing
 
     new_trans = UserTranslation(
         user_id=current_user.id,
-        word=translation.word.lower(),
+        word=word,
         translation=translation.translation
     )
     db.add(new_trans)
+    record_translations_added(db, current_user.id, [word])
     db.commit()
     db.refresh(new_trans)
     return new_trans
 
 @router.get("/user", response_model=List[UserTranslationResponse])
 def get_user_translations(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    return db.query(UserTranslation).filter(UserTranslation.user_id == current_user.id).all()
+    _, translations_version = get_data_versions(db, current_user.id)
+    return cached_json_response(
+        request, current_user.id, ("translations",), (translations_version,), TRANSLATION_LIST,
+        lambda: db.query(UserTranslation).filter(UserTranslation.user_id == current_user.id).all()
+    )
 
 @router.get("/suggestions/{word}", response_model=SuggestionResponse)
-def get_suggestions(word: str):
+def get_suggestions(word: str, dictionary: Dictionary = Depends(get_dictionary)):
     word_lower = word.lower()
-    suggestions = COMMON_DICTIONARY.get(word_lower, [])
+    suggestions = dictionary.lookup(word_lower)
     return {
         "word": word,
         "suggestions": suggestions,
         "is_common": len(suggestions) > 0
     }
 
+def _save_machine_translations(db: Session, user_id: int, translations: Dict[str, str]) -> List[dict]:
+    """Store machine translations as the user's own and commit; returns the rows created."""
+    rows = [{"user_id": user_id, "word": word, "translation": translated} for word, translated in translations.items()]
+    if not rows:
+        return []
+    stmt = insert_on_conflict(db.get_bind(), UserTranslation, ["user_id", "word"])
+    if stmt is not None:
+        # Rows a concurrent request inserted first are skipped, not duplicated
+        saved = [r._asdict() for r in db.execute(stmt.returning(*RESPONSE_COLUMNS, sort_by_parameter_order=True), rows)]
+        record_translations_added(db, user_id, [t["word"] for t in saved])
+        db.commit()
+        return saved
+
+    new_translations = [UserTranslation(**row) for row in rows]
+    db.add_all(new_translations)
+    record_translations_added(db, user_id, [row["word"] for row in rows])
+    db.commit()
+    for t in new_translations:
+        db.refresh(t)
+    return [UserTranslationResponse.model_validate(t).model_dump() for t in new_translations]
+
+def _batch_translation_events(
+    db: Session, user_id: int, words: List[str], translator, dictionary: Dictionary
+) -> Iterator[dict]:
+    """Translate and save `words`, yielding a progress event after every committed step."""
+    progress = {"total": len(words), "done": 0, "failed": 0}
+
+    # 1. Words in the local dictionary take its best translation
+    known = {word: translations[0] for word, translations in dictionary.lookup_many(words).items()}
+    items = _save_machine_translations(db, user_id, known)
+    progress["done"] += len(known)
+    yield {"event": "progress", **progress, "items": items}
+
+    # 2. Reuse machine translations other users already received
+    cache = get_translation_cache()
+    cached = cache.get_many(db, SOURCE_LANGUAGE, TARGET_LANGUAGE, [w for w in words if w not in known])
+    items = _save_machine_translations(db, user_id, cached)
+    progress["done"] += len(cached)
+    yield {"event": "progress", **progress, "items": items}
+
+    # 3. Only true misses go to the remote translator, chunk by chunk
+    misses = [w for w in words if w not in known and w not in cached]
+    for chunk, fetched, error in iter_translated_chunks(translator, misses):
+        cache.put_many(db, SOURCE_LANGUAGE, TARGET_LANGUAGE, fetched)
+        items = _save_machine_translations(db, user_id, fetched)
+        progress["done"] += len(fetched)
+        progress["failed"] += len(chunk) - len(fetched)
+        yield {"event": "progress", **progress, "items": items, "error": error}
+
+    yield {"event": "done", **progress}
+
+def _sse(events: Iterator[dict]) -> Iterator[str]:
+    def encode(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+    try:
+        for event in events:
+            name = event.pop("event")
+            yield encode(name, event)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        yield encode("error", {"detail": f"Translation service failed: {str(e)}"})
+
 @router.post("/batch", response_model=List[UserTranslationResponse])
 def batch_translate(
     request: BatchTranslationRequest,
+    stream: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    translator = Depends(get_machine_translator),
+    dictionary: Dictionary = Depends(get_dictionary)
 ):
-    translator = GoogleTranslator(source='en', target='bn')
-    new_translations = []
-
     # Filter out words already translated by this user
     existing_words = db.query(UserTranslation.word).filter(
         UserTranslation.user_id == current_user.id,
@@ -84,43 +182,25 @@ def batch_translate(
     ).all()
     existing_word_set = {w[0] for w in existing_words}
 
-    words_to_translate = [w.lower() for w in request.words if w.lower() not in existing_word_set]
+    words_to_translate = list(dict.fromkeys(w.lower() for w in request.words if w.lower() not in existing_word_set))
 
-    if not words_to_translate:
-        return []
+    events = _batch_translation_events(db, current_user.id, words_to_translate, translator, dictionary)
+    if stream:
+        # Server-sent events: one "progress" event per committed step, then "done"
+        return StreamingResponse(_sse(events), media_type="text/event-stream")
 
+    new_translations, errors = [], []
     try:
-        # Use translate_batch if the list is small enough, or chunk it
-        # deep-translator's GoogleTranslator supports translate_batch
-        try:
-            translations = translator.translate_batch(words_to_translate)
-        except Exception as e:
-            print(f"Batch translation error: {e}")
-            # Fallback to individual translation if batch fails
-            translations = []
-            for word in words_to_translate:
-                try:
-                    translations.append(translator.translate(word))
-                except:
-                    translations.append(None)
-
-        for word, translated in zip(words_to_translate, translations):
-            if translated:
-                new_trans = UserTranslation(
-                    user_id=current_user.id,
-                    word=word,
-                    translation=translated
-                )
-                db.add(new_trans)
-                new_translations.append(new_trans)
-        
-        db.commit()
-        for t in new_translations:
-            db.refresh(t)
-            
-        return new_translations
+        for event in events:
+            new_translations.extend(event.get("items", []))
+            if event.get("error"):
+                errors.append(event["error"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Translation service failed: {str(e)}")
+    if errors and not new_translations:
+        raise HTTPException(status_code=500, detail=f"Translation service failed: {errors[0]}")
+    # Chunks that succeeded stay saved even if others failed
+    return new_translations
 
 @router.get("/ping")
 def ping_translations():
@@ -130,7 +210,7 @@ def ping_translations():
 def delete_translation(
     translation_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     print(f"Attempting to delete translation {translation_id} for user {current_user.id}")
     translation = db.query(UserTranslation).filter(
@@ -143,5 +223,6 @@ def delete_translation(
         raise HTTPException(status_code=404, detail="Translation not found")
         
     db.delete(translation)
+    record_translations_removed(db, current_user.id, [translation.word])
     db.commit()
     return {"message": "Translation deleted successfully"}
@@ -34,6 +34,37 @@ class DocumentResponse(DocumentBase):
     class Config:
         from_attributes = True
 
+class ProcessingJobResponse(BaseModel):
+    id: int
+    document_id: int
+    status: str
+    progress: int
+    error: Optional[str] = None
+    word_count: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class DocumentUploadResponse(DocumentResponse):
+    job: Optional[ProcessingJobResponse] = None
+
+class BatchJobResponse(ProcessingJobResponse):
+    filename: str
+
+class RejectedUpload(BaseModel):
+    filename: str
+    error: str
+
+class UploadBatchResponse(BaseModel):
+    id: int
+    status: str # queued, running, done, failed (at least one job failed)
+    progress: int # Average over the batch's jobs
+    jobs: List[BatchJobResponse]
+    rejected: List[RejectedUpload] = []
+
 class WordFrequencyResponse(BaseModel):
     word: str
     frequency: int
@@ -42,6 +73,10 @@ class WordFrequencyResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class WordFrequencyPage(BaseModel):
+    items: List[WordFrequencyResponse]
+    next_cursor: Optional[str] = None
+
 class UserTranslationBase(BaseModel):
     word: str
     translation: str
@@ -64,3 +99,33 @@ class SuggestionResponse(BaseModel):
 
 class BatchTranslationRequest(BaseModel):
     words: List[str]
+
+class DocumentStatsResponse(BaseModel):
+    document_id: int
+    unique_words: int
+    total_words: int
+    translated_words: int
+
+    class Config:
+        from_attributes = True
+
+class StatsResponse(BaseModel):
+    document_count: int
+    total_words: int
+    translation_count: int
+    document: Optional[DocumentStatsResponse] = None
+
+
+class CorpusWordResponse(BaseModel):
+    word: str
+    total_frequency: int
+    document_count: int
+
+class CorpusWordPage(BaseModel):
+    items: List[CorpusWordResponse]
+    next_cursor: Optional[str] = None
+
+class WordDocumentResponse(BaseModel):
+    document_id: int
+    filename: str
+    frequency: int
@@ -0,0 +1,143 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from .database import insert_on_conflict
+from .frequencies import count_translated_words, iter_packed_vocabularies
+from .models import Document, DocumentStats, UserStats, WordFrequency
+
+# Dashboard counters. Every change to documents, stored frequencies or
+# translations adjusts them in the same transaction, so /stats is two
+# primary key lookups instead of a scan over the user's word rows. The same
+# changes bump the user's data versions that read endpoints build ETags from.
+
+# Keeps IN (...) lists under SQLite's bound parameter limit
+_WORD_BATCH_SIZE = 500
+
+def _bump_user_stats(db: Session, user_id: int, **deltas):
+    values = {name: getattr(UserStats, name) + delta for name, delta in deltas.items()}
+    stmt = update(UserStats).where(UserStats.user_id == user_id).values(**values)
+    if db.execute(stmt).rowcount:
+        return
+    # First change for this user: create the row, then apply the deltas
+    insert = insert_on_conflict(db.get_bind(), UserStats, ["user_id"])
+    if insert is not None:
+        db.execute(insert.values(user_id=user_id))
+        db.execute(stmt)
+    else:
+        counters = {"document_count": 0, "total_words": 0, "translation_count": 0}
+        db.add(UserStats(user_id=user_id, **{**counters, **deltas}))
+        db.flush()
+
+def record_document_added(db: Session, document_id: int, user_id: int):
+    record_documents_added(db, [document_id], user_id)
+
+def record_documents_added(db: Session, document_ids: List[int], user_id: int):
+    db.add_all(
+        DocumentStats(document_id=document_id, unique_words=0, total_words=0, translated_words=0)
+        for document_id in document_ids
+    )
+    _bump_user_stats(db, user_id, document_count=len(document_ids), documents_version=1)
+
+def record_document_processed(db: Session, document_id: int, user_id: int, items: List[Tuple[str, int]]):
+    """Reset a document's counters after its frequencies were replaced by `items`."""
+    previous_total = db.execute(
+        select(DocumentStats.total_words).where(DocumentStats.document_id == document_id)
+    ).scalar() or 0
+    total_words = sum(freq for _, freq in items)
+    translated_words = count_translated_words(db, document_id, user_id)
+
+    values = {
+        "document_id": document_id,
+        "unique_words": len(items),
+        "total_words": total_words,
+        "translated_words": translated_words,
+    }
+    upsert = insert_on_conflict(
+        db.get_bind(), DocumentStats, ["document_id"], ["unique_words", "total_words", "translated_words"]
+    )
+    if upsert is not None:
+        db.execute(upsert.values(**values))
+    else:
+        db.merge(DocumentStats(**values))
+    _bump_user_stats(db, user_id, total_words=total_words - previous_total, documents_version=1)
+
+def record_document_deleted(db: Session, document_id: int, user_id: int):
+    total_words = db.execute(
+        delete(DocumentStats).where(DocumentStats.document_id == document_id).returning(DocumentStats.total_words)
+    ).scalar() or 0
+    _bump_user_stats(db, user_id, document_count=-1, total_words=-total_words, documents_version=1)
+
+def _adjust_translated_words(db: Session, user_id: int, words: List[str], sign: int):
+    for i in range(0, len(words), _WORD_BATCH_SIZE):
+        batch = words[i:i + _WORD_BATCH_SIZE]
+        # How many of the batch's words each of the user's documents contains
+        matches = select(func.count()).select_from(WordFrequency).where(
+            WordFrequency.document_id == DocumentStats.document_id,
+            WordFrequency.word.in_(batch)
+        ).scalar_subquery()
+        documents = select(WordFrequency.document_id).join(
+            Document, Document.id == WordFrequency.document_id
+        ).where(Document.user_id == user_id, WordFrequency.word.in_(batch))
+        db.execute(
+            update(DocumentStats)
+            .where(DocumentStats.document_id.in_(documents))
+            .values(translated_words=DocumentStats.translated_words + sign * matches)
+            .execution_options(synchronize_session=False)
+        )
+    # Documents stored packed: count the matches blob by blob
+    for document_id, vocabulary in iter_packed_vocabularies(db, user_id):
+        matches = sum(1 for word in words if vocabulary.get(word) is not None)
+        if matches:
+            db.execute(
+                update(DocumentStats)
+                .where(DocumentStats.document_id == document_id)
+                .values(translated_words=DocumentStats.translated_words + sign * matches)
+                .execution_options(synchronize_session=False)
+            )
+
+def record_translations_added(db: Session, user_id: int, words: Iterable[str]):
+    """Count newly created translations; overwriting an existing one is not a change."""
+    words = list(words)
+    if not words:
+        return
+    _bump_user_stats(db, user_id, translation_count=len(words), translations_version=1)
+    _adjust_translated_words(db, user_id, words, 1)
+
+def record_translations_changed(db: Session, user_id: int):
+    """An existing translation was overwritten: no counter changes, but cached reads are stale."""
+    _bump_user_stats(db, user_id, translations_version=1)
+
+def record_translations_removed(db: Session, user_id: int, words: Iterable[str]):
+    words = list(words)
+    if not words:
+        return
+    _bump_user_stats(db, user_id, translation_count=-len(words), translations_version=1)
+    _adjust_translated_words(db, user_id, words, -1)
+
+def get_data_versions(db: Session, user_id: int) -> Tuple[int, int]:
+    """The user's (documents_version, translations_version)."""
+    row = db.execute(
+        select(UserStats.documents_version, UserStats.translations_version).where(UserStats.user_id == user_id)
+    ).one_or_none()
+    return (row[0], row[1]) if row else (0, 0)
+
+def get_stats(db: Session, user_id: int, document_id: Optional[int] = None) -> dict:
+    # populate_existing: counters change through bulk UPDATEs the identity map may not see
+    user_stats = db.execute(
+        select(UserStats).where(UserStats.user_id == user_id).execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    stats = {
+        "document_count": user_stats.document_count if user_stats else 0,
+        "total_words": user_stats.total_words if user_stats else 0,
+        "translation_count": user_stats.translation_count if user_stats else 0,
+        "document": None,
+    }
+    if document_id is not None:
+        doc_stats = db.execute(
+            select(DocumentStats).join(Document, Document.id == DocumentStats.document_id).where(
+                DocumentStats.document_id == document_id, Document.user_id == user_id
+            ).execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        if doc_stats is not None:
+            stats["document"] = doc_stats
+    return stats
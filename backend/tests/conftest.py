@@ -1,9 +1,22 @@
+import os
+import tempfile
 import pytest
-from sqlalchemy import create_engine
+
+# Run processing jobs synchronously inside the request so tests share its session
+os.environ.setdefault("JOB_WORKER_MODE", "inline")
+# Cheapest bcrypt cost; hashing speed is not what these tests measure
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Uploaded files go to a throwaway local storage directory
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_DIR"] = tempfile.mkdtemp(prefix="test-storage-")
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from backend.main import app
-from backend.database import Base, get_db
+from backend.database import Base, ThreadedSession, get_async_db, get_db
+from backend.auth import principal_cache
+from backend.response_cache import response_cache
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -11,6 +24,17 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+
+# Let SQLAlchemy emit BEGIN itself so SAVEPOINTs nest inside the per-test transaction
+# (pysqlite's own transaction handling would commit on RELEASE SAVEPOINT)
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 @pytest.fixture(scope="session")
@@ -23,7 +47,7 @@ def db_engine():
 def db(db_engine):
     connection = db_engine.connect()
     transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     
     yield session
     
@@ -39,6 +63,16 @@ def client(db):
         finally:
             pass
     
+    async def override_get_async_db():
+        # Async routes share the per-test session through the threadpool facade
+        yield ThreadedSession(db)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Tokens cached by earlier tests may point at rolled-back users
+    principal_cache.clear()
+    # Rolled-back users' ids and data versions are reused by the next test
+    response_cache.clear()
     yield TestClient(app)
     del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_async_db]
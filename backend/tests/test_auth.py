@@ -1,5 +1,11 @@
 import pytest
 import uuid
+from jose import jwt
+from sqlalchemy import event
+import backend.auth
+import backend.routes.auth
+from backend.auth import ALGORITHM, SECRET_KEY, PasswordHasher, create_access_token, get_password_hash
+from backend.models import User
 
 def test_signup(client):
     email = f"test_{uuid.uuid4()}@example.com"
@@ -34,3 +40,77 @@ def test_invalid_login(client):
     )
     assert response.status_code == 401
     assert response.json()["detail"] == "Incorrect email or password"
+
+def _signup_and_login(client, password="testpassword123"):
+    email = f"test_{uuid.uuid4()}@example.com"
+    client.post("/auth/signup", json={"email": email, "password": password})
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    return email, response.json()["access_token"]
+
+def test_token_carries_user_id_and_is_cached(client, db):
+    email, token = _signup_and_login(client)
+    user = db.query(User).filter(User.email == email).first()
+    assert jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["uid"] == user.id
+
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/documents/", headers=headers).status_code == 200
+
+    # A cached token is resolved without touching the users table
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert client.get("/documents/", headers=headers).status_code == 200
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert not any("FROM users" in s for s in statements)
+
+def test_password_change_revokes_cached_token(client, db):
+    email, token = _signup_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/documents/", headers=headers).status_code == 200
+
+    user = db.query(User).filter(User.email == email).first()
+    user.hashed_password = get_password_hash("newpassword456")
+    db.commit()
+    assert client.get("/documents/", headers=headers).status_code == 401
+
+def test_token_without_uid_claim_still_accepted(client, db):
+    email, _ = _signup_and_login(client)
+    legacy_token = create_access_token(data={"sub": email})
+    response = client.get("/documents/", headers={"Authorization": f"Bearer {legacy_token}"})
+    assert response.status_code == 200
+
+def test_login_rehashes_when_cost_changes(client, db, monkeypatch):
+    email, token = _signup_and_login(client)
+    user = db.query(User).filter(User.email == email).first()
+    assert user.hashed_password.startswith("$2b$04$")
+
+    monkeypatch.setattr(backend.auth, "BCRYPT_ROUNDS", 5)
+    response = client.post("/auth/login", data={"username": email, "password": "testpassword123"})
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.hashed_password.startswith("$2b$05$")
+
+    # A rehash keeps the same password, so earlier tokens stay valid
+    backend.auth.principal_cache.clear()
+    assert client.get("/documents/", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+def test_saturated_hashing_pool_sheds_load(client, monkeypatch):
+    email, _ = _signup_and_login(client)
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    monkeypatch.setattr(backend.routes.auth, "password_hasher", hasher)
+
+    # Occupy the only slot, as a long-running bcrypt call would
+    hasher._slots.acquire()
+    response = client.post("/auth/login", data={"username": email, "password": "testpassword123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    # Other endpoints keep working while hashing is saturated
+    assert client.get("/health").status_code == 200
+
+    hasher._slots.release()
+    response = client.post("/auth/login", data={"username": email, "password": "testpassword123"})
+    assert response.status_code == 200
+    hasher.shutdown()
+
@@ -0,0 +1,61 @@
+from backend.benchmarks.corpora import make_document, make_text
+from backend.benchmarks.harness import find_regressions, measure
+from backend.benchmarks.startup import measure_startup
+from backend.benchmarks.suite import parse_size, run_suite
+
+def test_corpora_are_deterministic_and_mixed():
+    text = make_text(20_000)
+    assert text == make_text(20_000) and text != make_text(20_000, seed=1)
+    assert 20_000 <= len(text.encode("utf-8")) < 22_000
+    assert "সরকার" in text and "government" in text
+    assert make_document("docx", 5_000, cache_dir=None) == make_document("docx", 5_000, cache_dir=None)
+
+def test_suite_runs_every_stage_on_the_smallest_corpus(client):
+    client.post("/auth/signup", json={"email": "bench_test@example.com", "password": "password"})
+    login_res = client.post("/auth/login", data={"username": "bench_test@example.com", "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    results = run_suite(client, headers, sizes=["10k"], runs=1, log=lambda line: None)
+    assert sorted(results) == [
+        "dictionary/lookup_many",
+        "export/csv/10k", "export/excel/10k", "export/pdf/10k",
+        "extract_docx/10k", "extract_pdf/10k",
+        "process/docx/10k", "process/pdf/10k", "process/txt/10k",
+        "report/cached", "report/legacy",
+        "startup/import", "tokenize/10k", "tokenize_legacy/10k",
+        "translate/concurrent", "translate/serial",
+        "vocabulary/packed/delete", "vocabulary/packed/page", "vocabulary/packed/store",
+        "vocabulary/rows/delete", "vocabulary/rows/page", "vocabulary/rows/store",
+        "words_page/10k",
+    ]
+    tokenize = results["tokenize/10k"]
+    assert tokenize["size_bytes"] == parse_size("10k") and tokenize["throughput_mb_per_second"] > 0
+    assert tokenize["p50_seconds"] <= tokenize["p95_seconds"] <= tokenize["max_seconds"]
+
+def test_regressions_respect_thresholds_and_noise_floor():
+    baseline = {
+        "slow": {"p50_seconds": 1.0, "peak_memory_bytes": 100_000_000},
+        "tiny": {"p50_seconds": 0.001, "peak_memory_bytes": 1000},
+        "gone": {"p50_seconds": 1.0, "peak_memory_bytes": 1},
+    }
+    current = {
+        "slow": {"p50_seconds": 1.2, "peak_memory_bytes": 150_000_000},
+        "tiny": {"p50_seconds": 0.003, "peak_memory_bytes": 5000}, # 3x, but below the noise floor
+        "new": {"p50_seconds": 9.0, "peak_memory_bytes": 1},
+    }
+    regressions = find_regressions(current, baseline, latency_threshold=0.25, memory_threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("slow: peak_memory_bytes")
+    assert len(find_regressions(current, baseline, latency_threshold=0.1)) == 2
+
+def test_measure_reports_percentiles_and_peak_memory():
+    result = measure(lambda: bytearray(2_000_000), runs=3, size_bytes=1000, warmup=0)
+    assert result["runs"] == 3 and result["peak_memory_bytes"] >= 2_000_000
+
+    calls = []
+    measure(lambda: calls.append("fn"), runs=2, setup=lambda: calls.append("setup"))
+    assert calls == ["setup", "fn"] * 4 # Warmup, two timed runs and the traced run
+
+def test_importing_the_app_leaves_heavy_dependencies_unloaded():
+    result = measure_startup(runs=1)
+    assert result["heavy_modules"] == []
+    assert result["p50_seconds"] > 0 and result["rss_bytes"] > 0
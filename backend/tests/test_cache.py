@@ -0,0 +1,89 @@
+import os
+import time
+from collections import Counter
+from unittest.mock import patch
+from backend.cache import DBResultCache, DiskResultCache, result_cache_key
+from backend.models import Document, ResultCacheEntry
+from backend.processing import run_document_pipeline
+from backend.utils.text_processing import FILTER_VERSION
+
+def test_cache_key_includes_filter_version():
+    assert result_cache_key("abc") == f"abc:{FILTER_VERSION}"
+
+def test_db_cache_round_trip_and_lru_eviction(db):
+    cache = DBResultCache(max_bytes=10_000)
+    cache.put(db, "a", Counter({"policy": 3, "সরকার": 1}))
+    assert cache.get(db, "a") == Counter({"policy": 3, "সরকার": 1})
+    assert cache.get(db, "missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Make the cache hold roughly one entry, then add a second one
+    entry_size = db.get(ResultCacheEntry, "a").size
+    cache.max_bytes = entry_size + 5
+    cache.put(db, "b", Counter({"development": 2, "election": 1}))
+    assert db.get(ResultCacheEntry, "a") is None
+    assert db.get(ResultCacheEntry, "b") is not None
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskResultCache(directory=str(tmp_path), max_bytes=10_000)
+    cache.put(None, "old", Counter({"alpha": 1}))
+    cache.put(None, "new", Counter({"beta": 1}))
+    past = time.time() - 60
+    os.utime(tmp_path / "old.bin", (past, past))
+
+    cache.max_bytes = os.path.getsize(tmp_path / "new.bin") + 5
+    cache.put(None, "newest", Counter({"gamma": 1}))
+    assert cache.get(None, "old") is None
+    assert cache.get(None, "newest") == Counter({"gamma": 1})
+    assert cache.stats()["hits"] == 1
+
+def _legacy_document(client, db, email):
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    up_res = client.post(
+        "/documents/upload",
+        files={"file": ("cache_fail.txt", b"budget budget ministry", "text/plain")},
+        headers=headers
+    )
+    doc = db.get(Document, up_res.json()["id"])
+    # A document from before hashing: the pipeline sets its hash, still uncommitted, before the cache write
+    doc.content_hash = None
+    db.commit()
+    return headers, doc
+
+def test_failed_cache_write_leaves_processing_intact(client, db):
+    headers, doc = _legacy_document(client, db, "cache_fail@example.com")
+
+    with patch.object(DBResultCache, "_evict", side_effect=RuntimeError("disk full")):
+        counts = run_document_pipeline(db, doc)
+    assert counts == Counter({"budget": 2, "ministry": 1})
+    db.expire_all()
+    assert doc.content_hash is not None
+    assert db.get(ResultCacheEntry, result_cache_key(doc.content_hash)) is None
+    words = client.get(f"/documents/{doc.id}/words", headers=headers).json()["items"]
+    assert [(w["word"], w["frequency"]) for w in words] == [("budget", 2), ("ministry", 1)]
+
+def test_failed_disk_cache_write_leaves_processing_intact(client, db, tmp_path):
+    headers, doc = _legacy_document(client, db, "disk_cache_fail@example.com")
+    cache = DiskResultCache(directory=str(tmp_path))
+
+    with patch("backend.processing.get_result_cache", return_value=cache), \
+            patch("backend.cache.os.replace", side_effect=OSError(28, "No space left on device")):
+        counts = run_document_pipeline(db, doc)
+    assert counts == Counter({"budget": 2, "ministry": 1})
+    assert list(tmp_path.iterdir()) == [] # No cache entry and no leftover temporary file
+    words = client.get(f"/documents/{doc.id}/words", headers=headers).json()["items"]
+    assert [(w["word"], w["frequency"]) for w in words] == [("budget", 2), ("ministry", 1)]
+
+def test_disk_cache_scans_only_when_over_its_limit(tmp_path):
+    cache = DiskResultCache(directory=str(tmp_path), max_bytes=10_000)
+    with patch("backend.cache.os.scandir", wraps=os.scandir) as scandir:
+        for i in range(5):
+            cache.put(None, f"entry{i}", Counter({f"word{i}": i}))
+        assert scandir.call_count == 1 # Sizing the directory on the first write
+
+        cache.max_bytes = os.path.getsize(tmp_path / "entry4.bin") + 5
+        cache.put(None, "entry5", Counter({"word5": 5}))
+        assert scandir.call_count == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["entry5.bin"]
@@ -0,0 +1,90 @@
+from sqlalchemy import create_engine, text
+from backend.database import Base
+from backend.migrations import run_migrations
+
+def _login(client, email):
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+def _upload(client, headers, name, content):
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": (name, content, "text/plain")},
+        headers=headers
+    )
+    return up_res.json()["id"]
+
+def test_corpus_tracks_processing_and_deletes(client):
+    headers = _login(client, "corpus_test@example.com")
+    first = _upload(client, headers, "a.txt", b"policy policy policy government election")
+    second = _upload(client, headers, "b.txt", b"policy government government")
+
+    words = client.get("/corpus/words", headers=headers).json()
+    assert words["items"] == [
+        {"word": "policy", "total_frequency": 4, "document_count": 2},
+        {"word": "government", "total_frequency": 3, "document_count": 2},
+        {"word": "election", "total_frequency": 1, "document_count": 1},
+    ]
+
+    # Keyset pagination walks the same order
+    page = client.get("/corpus/words", params={"limit": 2}, headers=headers).json()
+    assert [i["word"] for i in page["items"]] == ["policy", "government"]
+    rest = client.get("/corpus/words", params={"limit": 2, "cursor": page["next_cursor"]}, headers=headers).json()
+    assert [i["word"] for i in rest["items"]] == ["election"] and rest["next_cursor"] is None
+
+    # Re-processing replaces the document's contribution instead of adding it twice
+    client.post(f"/documents/{first}/process", headers=headers)
+    assert client.get("/corpus/words", headers=headers).json()["items"][0]["total_frequency"] == 4
+
+    documents = client.get("/corpus/words/government/documents", headers=headers).json()
+    assert documents == [
+        {"document_id": second, "filename": "b.txt", "frequency": 2},
+        {"document_id": first, "filename": "a.txt", "frequency": 1},
+    ]
+
+    client.delete(f"/documents/{first}", headers=headers)
+    words = client.get("/corpus/words", headers=headers).json()["items"]
+    assert words == [
+        {"word": "government", "total_frequency": 2, "document_count": 1},
+        {"word": "policy", "total_frequency": 1, "document_count": 1},
+    ]
+
+    # Other users see nothing
+    other = _login(client, "corpus_other@example.com")
+    assert client.get("/corpus/words", headers=other).json()["items"] == []
+    assert client.get("/corpus/words/government/documents", headers=other).json() == []
+
+def test_corpus_search_modes(client):
+    headers = _login(client, "corpus_search@example.com")
+    _upload(client, headers, "a.txt", b"government governor govern election elections policy")
+
+    prefix = client.get("/corpus/search", params={"q": "Gov"}, headers=headers).json()
+    assert [i["word"] for i in prefix] == ["govern", "government", "governor"]
+
+    fuzzy = client.get("/corpus/search", params={"q": "goverment", "mode": "fuzzy"}, headers=headers).json()
+    assert fuzzy[0]["word"] == "government"
+    assert "election" not in [i["word"] for i in fuzzy]
+
+    bad = client.get("/corpus/search", params={"q": "gov", "mode": "regex"}, headers=headers)
+    assert bad.status_code == 422
+
+def test_backfill_migration_builds_corpus(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'corpus.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@example.com', 'x')"))
+        conn.execute(text(
+            "INSERT INTO documents (id, user_id, filename, storage_path) VALUES (1, 1, 'a.txt', 'a'), (2, 1, 'b.txt', 'b')"
+        ))
+        conn.execute(text(
+            "INSERT INTO word_frequency (document_id, word, frequency) "
+            "VALUES (1, 'policy', 3), (1, 'election', 2), (2, 'policy', 1)"
+        ))
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT word, total_frequency, document_count FROM corpus_words WHERE user_id = 1 ORDER BY word"
+        )).all()
+        assert [tuple(r) for r in rows] == [("election", 2, 1), ("policy", 4, 2)]
@@ -0,0 +1,33 @@
+import random
+from backend.dictionary import Dictionary, DictionaryTranslator, build_dictionary
+
+def test_lookup_finds_every_entry_and_nothing_else(tmp_path):
+    path = str(tmp_path / "en_bn.tsv")
+    build_dictionary([
+        ("Policy", ["নীতি"]), ("policy", ["নীতিমালা", "নীতি"]), ("zebra", ["জেব্রা"]),
+        ("a", ["এক"]), ("empty", []), ("ünïcode", ["ইউনিকোড"]),
+    ], path)
+    dictionary = Dictionary(path)
+
+    assert dictionary.lookup("policy") == ["নীতি", "নীতিমালা"]
+    assert dictionary.lookup("a") == ["এক"] and dictionary.lookup("zebra") == ["জেব্রা"]
+    assert dictionary.lookup("ünïcode") == ["ইউনিকোড"]
+    for missing in ("empty", "", "aa", "polic", "policyx", "zzz"):
+        assert dictionary.lookup(missing) == []
+    assert DictionaryTranslator(dictionary).translate_batch(["Zebra", "unknown"]) == ["জেব্রা", None]
+
+def test_missing_file_reads_as_empty(tmp_path):
+    assert Dictionary(str(tmp_path / "missing.tsv")).lookup("policy") == []
+
+def test_large_dictionary_lookups_find_only_its_words(tmp_path):
+    # Lookup timing on a 200k-entry dictionary lives in the benchmark suite (dictionary/)
+    rng = random.Random(3)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = list({"".join(rng.choice(letters) for _ in range(rng.randint(3, 12))) for _ in range(20_000)})
+    path = str(tmp_path / "large.tsv")
+    build_dictionary(((w, [f"bn-{w}"]) for w in words), path)
+    dictionary = Dictionary(path)
+
+    probes = rng.sample(words, 500) + ["notaword" + str(i) for i in range(500)]
+    found = dictionary.lookup_many(probes)
+    assert len(found) == 500 and found[probes[0]] == [f"bn-{probes[0]}"]
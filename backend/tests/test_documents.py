@@ -1,6 +1,8 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import io
+import zipfile
+from backend.database import storage
 
 def test_list_documents_empty(client):
     # Missing auth header should fail
@@ -8,62 +10,254 @@ def test_list_documents_empty(client):
     assert response.status_code == 401
 
 def test_upload_document_mock(client):
-    # Mocking supabase storage upload
-    with patch("backend.routes.documents.supabase.storage.from_") as mock_storage:
-        mock_bucket = MagicMock()
-        mock_storage.return_value = mock_bucket
-        mock_bucket.upload.return_value = MagicMock(error=None)
-
-        # First signup/login to get token
-        email = "doc_test@example.com"
-        client.post("/auth/signup", json={"email": email, "password": "password"})
-        login_res = client.post("/auth/login", data={"username": email, "password": "password"})
-        token = login_res.json()["access_token"]
-
-        # Upload
-        file_content = b"This is a test document with some words words."
-        response = client.post(
-            "/documents/upload",
-            files={"file": ("test.txt", file_content, "text/plain")},
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        assert response.status_code == 200
-        assert response.json()["filename"] == "test.txt"
+    # First signup/login to get token
+    email = "doc_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    token = login_res.json()["access_token"]
+
+    # Upload
+    file_content = b"This is a test document with some words words."
+    response = client.post(
+        "/documents/upload",
+        files={"file": ("test.txt", file_content, "text/plain")},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["filename"] == "test.txt"
 
 def test_process_document_mock(client):
-    with patch("backend.routes.documents.supabase.storage.from_") as mock_storage:
-        # Mock download
-        mock_bucket = MagicMock()
-        mock_storage.return_value = mock_bucket
-        mock_bucket.download.return_value = b"Hello world hello"
-        mock_bucket.upload.return_value = MagicMock(error=None)
-
-        # Login
-        email = "proc_test@example.com"
+    # Login
+    email = "proc_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    token = login_res.json()["access_token"]
+
+    # 1. Upload
+    up_res = client.post(
+        "/documents/upload",
+        files={"file": ("test.txt", b"Hello world hello", "text/plain")},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    doc_id = up_res.json()["id"]
+
+    # 2. Process
+    proc_res = client.post(
+        f"/documents/{doc_id}/process",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert proc_res.status_code == 202
+    job = proc_res.json()
+    assert job["status"] == "done"
+    assert job["progress"] == 100
+
+    # 3. Poll job status
+    job_res = client.get(
+        f"/documents/{doc_id}/jobs/{job['id']}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert job_res.status_code == 200
+    assert job_res.json()["status"] == "done"
+    assert job_res.json()["word_count"] == 2
+    
+    # 4. Verify frequencies
+    words_res = client.get(
+        f"/documents/{doc_id}/words",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    data = {w["word"]: w["frequency"] for w in words_res.json()["items"]}
+    assert data["hello"] == 2
+    assert data["world"] == 1
+
+def test_upload_with_auto_process(client):
+    email = "auto_proc_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("test.txt", b"Policy policy development", "text/plain")},
+        headers=headers
+    )
+    assert up_res.status_code == 200
+    job = up_res.json()["job"]
+    assert job["status"] == "done"
+
+    words_res = client.get(f"/documents/{up_res.json()['id']}/words", headers=headers)
+    data = {w["word"]: w["frequency"] for w in words_res.json()["items"]}
+    assert data == {"policy": 2, "development": 1}
+
+def test_process_job_failure_is_recorded(client):
+    email = "failed_job_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    up_res = client.post(
+        "/documents/upload",
+        files={"file": ("test.txt", b"dummy", "text/plain")},
+        headers=headers
+    )
+    assert up_res.json()["job"] is None
+
+    with patch.object(storage, "download_sync", side_effect=Exception("bucket offline")):
+        proc_res = client.post(f"/documents/{up_res.json()['id']}/process", headers=headers)
+    assert proc_res.status_code == 202
+    assert proc_res.json()["status"] == "failed"
+    assert "bucket offline" in proc_res.json()["error"]
+
+def test_repeat_upload_is_served_from_result_cache(client):
+    with patch.object(storage, "download_sync", wraps=storage.download_sync) as download:
+        email = "cache_test@example.com"
         client.post("/auth/signup", json={"email": email, "password": "password"})
         login_res = client.post("/auth/login", data={"username": email, "password": "password"})
-        token = login_res.json()["access_token"]
-
-        # 1. Upload
-        up_res = client.post(
-            "/documents/upload",
-            files={"file": ("test.txt", b"dummy", "text/plain")},
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        doc_id = up_res.json()["id"]
-
-        # 2. Process
-        proc_res = client.post(
-            f"/documents/{doc_id}/process",
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        assert proc_res.status_code == 200
-        
-        # 3. Verify frequencies
-        words_res = client.get(
-            f"/documents/{doc_id}/words",
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        data = {w["word"]: w["frequency"] for w in words_res.json()}
-        assert data["hello"] == 2
-        assert data["world"] == 1
+        headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+        doc_ids = []
+        for _ in range(2):
+            up_res = client.post(
+                "/documents/upload?process=true",
+                files={"file": ("same.txt", b"Cached election results election", "text/plain")},
+                headers=headers
+            )
+            assert up_res.json()["job"]["status"] == "done"
+            doc_ids.append(up_res.json()["id"])
+
+        # Re-processing unchanged content hits the cache as well
+        client.post(f"/documents/{doc_ids[0]}/process", headers=headers)
+
+        assert download.call_count == 1
+        for doc_id in doc_ids:
+            words_res = client.get(f"/documents/{doc_id}/words", headers=headers)
+            data = {w["word"]: w["frequency"] for w in words_res.json()["items"]}
+            assert data == {"cached": 1, "election": 2, "results": 1}
+
+def test_words_pagination_filters_and_sorting(client):
+    text = " ".join(
+        ["alpha"] * 5 + ["beta"] * 5 + ["gamma"] * 3 + ["delta"] * 2 + ["epsilon", "zeta", "theta"]
+    ).encode("utf-8")
+    email = "page_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("page.txt", text, "text/plain")},
+        headers=headers
+    )
+    doc_id = up_res.json()["id"]
+
+    # Walk every page of the default ordering
+    words, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get(f"/documents/{doc_id}/words", params=params, headers=headers)
+        assert res.status_code == 200
+        page = res.json()
+        assert len(page["items"]) <= 2
+        words += [w["word"] for w in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert words == ["alpha", "beta", "gamma", "delta", "epsilon", "theta", "zeta"]
+
+    res = client.get(f"/documents/{doc_id}/words", params={"min_frequency": 3}, headers=headers)
+    assert [w["word"] for w in res.json()["items"]] == ["alpha", "beta", "gamma"]
+
+    res = client.get(f"/documents/{doc_id}/words", params={"prefix": "Ze"}, headers=headers)
+    assert [w["word"] for w in res.json()["items"]] == ["zeta"]
+
+    res = client.get(f"/documents/{doc_id}/words", params={"sort": "word_desc", "limit": 3}, headers=headers)
+    assert [w["word"] for w in res.json()["items"]] == ["zeta", "theta", "gamma"]
+    res = client.get(
+        f"/documents/{doc_id}/words",
+        params={"sort": "word_desc", "limit": 3, "cursor": res.json()["next_cursor"]},
+        headers=headers
+    )
+    assert [w["word"] for w in res.json()["items"]] == ["epsilon", "delta", "beta"]
+
+    res = client.get(f"/documents/{doc_id}/words", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert res.status_code == 400
+
+def test_export_formats(client):
+    email = "export_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("export.txt", b"policy policy government election", "text/plain")},
+        headers=headers
+    )
+    doc_id = up_res.json()["id"]
+    client.post("/translations/", json={"word": "government", "translation": "সরকার"}, headers=headers)
+
+    csv_res = client.get(f"/documents/{doc_id}/export/csv", headers=headers)
+    assert csv_res.status_code == 200
+    assert csv_res.text.splitlines() == [
+        "Word,Frequency,Translation",
+        "policy,2,-",
+        "election,1,-",
+        "government,1,সরকার",
+    ]
+
+    excel_res = client.get(f"/documents/{doc_id}/export/excel", headers=headers)
+    assert excel_res.status_code == 200
+    from openpyxl import load_workbook
+    sheet = load_workbook(io.BytesIO(excel_res.content))["Vocabulary"]
+    assert [tuple(r) for r in sheet.iter_rows(values_only=True)] == [
+        ("Word", "Frequency", "Translation"),
+        ("policy", 2, "-"),
+        ("election", 1, "-"),
+        ("government", 1, "সরকার"),
+    ]
+
+    pdf_res = client.get(f"/documents/{doc_id}/export/pdf", headers=headers)
+    assert pdf_res.status_code == 200
+    assert pdf_res.content.startswith(b"%PDF")
+
+    assert client.get(f"/documents/{doc_id}/export/xml", headers=headers).status_code == 400
+
+def test_bulk_upload_files_and_zip(client):
+    email = "bulk_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("papers/c.txt", "election election policy")
+        zf.writestr("papers/notes.md", "ignored")
+    res = client.post(
+        "/documents/bulk",
+        files=[
+            ("files", ("a.txt", b"policy government", "text/plain")),
+            ("files", ("b.txt", b"government", "text/plain")),
+            ("files", ("papers.zip", archive.getvalue(), "application/zip")),
+            ("files", ("image.png", b"\x89PNG", "image/png")),
+        ],
+        headers=headers
+    )
+    assert res.status_code == 202
+    batch = res.json()
+    assert batch["status"] == "done" and batch["progress"] == 100
+    assert [(j["filename"], j["word_count"]) for j in batch["jobs"]] == [("a.txt", 2), ("b.txt", 1), ("c.txt", 2)]
+    assert sorted(r["filename"] for r in batch["rejected"]) == ["image.png", "papers/notes.md"]
+
+    # Progress can be polled; other users cannot see the batch
+    polled = client.get(f"/documents/batches/{batch['id']}", headers=headers).json()
+    assert [j["id"] for j in polled["jobs"]] == [j["id"] for j in batch["jobs"]] and polled["rejected"] == []
+    assert client.get("/stats", headers=headers).json()["document_count"] == 3
+
+    client.post("/auth/signup", json={"email": "bulk_other@example.com", "password": "password"})
+    other = client.post("/auth/login", data={"username": "bulk_other@example.com", "password": "password"})
+    other_headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+    assert client.get(f"/documents/batches/{batch['id']}", headers=other_headers).status_code == 404
+
+    empty = client.post("/documents/bulk", files=[("files", ("x.png", b"", "image/png"))], headers=headers)
+    assert empty.status_code == 400
@@ -0,0 +1,33 @@
+from sqlalchemy import event
+from backend.frequencies import replace_word_frequencies
+from backend.models import Document, User, WordFrequency
+
+def make_document(db):
+    user = User(email="freq_test@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    doc = Document(user_id=user.id, filename="a.txt", file_type="text/plain", storage_path="a.txt")
+    db.add(doc)
+    db.flush()
+    return doc
+
+def test_replace_word_frequencies_uses_constant_statements(db):
+    doc = make_document(db)
+    replace_word_frequencies(db, doc.id, [("old", 1)])
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        replace_word_frequencies(db, doc.id, [(f"word{i}", 1000 - i) for i in range(500)])
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # DELETE rows, DELETE any packed blob, one bulk INSERT
+    assert len(statements) <= 3
+    rows = db.query(WordFrequency).filter(WordFrequency.document_id == doc.id).all()
+    assert len(rows) == 500
+    assert {r.word for r in rows} == {f"word{i}" for i in range(500)}
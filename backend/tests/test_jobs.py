@@ -0,0 +1,152 @@
+import asyncio
+import multiprocessing
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.orm import sessionmaker
+from backend import jobs
+from backend.database import Base, storage
+from backend.jobs import INTERRUPTED_ERROR, enqueue_processing, recover_interrupted_jobs
+from backend.corpus import remove_document_from_corpus
+from backend.frequencies import delete_word_frequencies
+from backend.models import CorpusWord, Document, DocumentStats, ProcessingJob, User, WordFrequency
+from backend.processing import run_document_pipeline
+from backend.stats import record_document_deleted
+
+def _upload(client, email):
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    up_res = client.post(
+        "/documents/upload",
+        files={"file": ("jobs.txt", b"budget budget ministry", "text/plain")},
+        headers=headers
+    )
+    return headers, up_res.json()["id"]
+
+def test_restart_fails_interrupted_jobs(client, db):
+    headers, doc_id = _upload(client, "restart_test@example.com")
+    # The previous process died with one job running and one still queued
+    doc = db.get(Document, doc_id)
+    running = ProcessingJob(document_id=doc_id, user_id=doc.user_id, status="running", progress=40)
+    queued = ProcessingJob(document_id=doc_id, user_id=doc.user_id, status="queued", progress=0)
+    db.add_all([running, queued])
+    db.commit()
+
+    # Until the restart, the orphaned job is what processing returns
+    assert client.post(f"/documents/{doc_id}/process", headers=headers).json()["id"] in (running.id, queued.id)
+
+    assert recover_interrupted_jobs(db) == 2
+    polled = client.get(f"/documents/{doc_id}/jobs/{running.id}", headers=headers).json()
+    assert (polled["status"], polled["error"]) == ("failed", INTERRUPTED_ERROR)
+
+    proc_res = client.post(f"/documents/{doc_id}/process", headers=headers)
+    assert proc_res.json()["id"] not in (running.id, queued.id)
+    assert proc_res.json()["status"] == "done"
+
+def test_stale_active_job_does_not_block_reprocessing(client, db):
+    headers, doc_id = _upload(client, "stale_job_test@example.com")
+    doc = db.get(Document, doc_id)
+    long_ago = datetime.now(timezone.utc) - timedelta(seconds=jobs.JOB_STALE_AFTER_SECONDS + 60)
+    stale = ProcessingJob(document_id=doc_id, user_id=doc.user_id, status="running", progress=10, started_at=long_ago)
+    db.add(stale)
+    db.commit()
+
+    proc_res = client.post(f"/documents/{doc_id}/process", headers=headers)
+    assert proc_res.json()["id"] != stale.id and proc_res.json()["status"] == "done"
+    db.refresh(stale)
+    assert stale.status == "failed"
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="workers see the test database only when forked"
+)
+def test_process_worker_mode_runs_jobs(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    TestSession = sessionmaker(bind=engine)
+
+    async def chunks():
+        yield b"budget budget ministry"
+    asyncio.run(storage.upload("jobs/process.txt", chunks(), "text/plain"))
+    with TestSession() as db:
+        user = User(email="process_mode@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        doc = Document(user_id=user.id, filename="process.txt", file_type="text/plain", storage_path="jobs/process.txt")
+        db.add(doc)
+        db.commit()
+
+        # Leave a connection in the pool for the forked worker to inherit
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        with patch.multiple(jobs, JOB_WORKER_MODE="process", JOB_WORKERS=1, SessionLocal=TestSession, engine=engine):
+            try:
+                job_id = enqueue_processing(db, doc).id
+                deadline = time.monotonic() + 60
+                while True:
+                    # A fresh session per poll, so no read transaction blocks the worker's writes
+                    with TestSession() as poll:
+                        job = poll.get(ProcessingJob, job_id)
+                    if job.status not in jobs.ACTIVE_STATUSES or time.monotonic() > deadline:
+                        break
+                    time.sleep(0.1)
+            finally:
+                jobs.shutdown_executor()
+
+    assert (job.status, job.error, job.word_count) == ("done", None, 2)
+    # The parent's pooled connections still work after the worker ran
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM word_frequency")).scalar() == 2
+
+def test_pipeline_reports_progress_after_each_stage(client, db):
+    _, doc_id = _upload(client, "progress_test@example.com")
+    doc = db.get(Document, doc_id)
+    steps = []
+    run_document_pipeline(db, doc, steps.append)
+    assert steps == [20, 60, 80]
+    # Cached counts skip download and extraction
+    steps.clear()
+    run_document_pipeline(db, doc, steps.append)
+    assert steps == [80]
+
+def _delete_document(db, doc_id, user_id):
+    # What DELETE /documents/{id} does, from another request while the job runs
+    remove_document_from_corpus(db, doc_id, user_id)
+    delete_word_frequencies(db, doc_id)
+    db.execute(delete(ProcessingJob).where(ProcessingJob.document_id == doc_id))
+    record_document_deleted(db, doc_id, user_id)
+    db.execute(delete(Document).where(Document.id == doc_id))
+    db.commit()
+
+def _assert_nothing_stored(db, doc_id, user_id):
+    assert db.query(WordFrequency).filter(WordFrequency.document_id == doc_id).count() == 0
+    assert db.get(DocumentStats, doc_id) is None
+    assert db.query(CorpusWord).filter(CorpusWord.user_id == user_id).count() == 0
+
+def test_document_deleted_during_processing_leaves_no_rows(client, db):
+    _, doc_id = _upload(client, "deleted_mid_job@example.com")
+    doc = db.get(Document, doc_id)
+    user_id = doc.user_id
+    # Deleted between extraction and the final write
+    with patch("backend.processing.observe_stage", side_effect=lambda *args: _delete_document(db, doc_id, user_id)):
+        with pytest.raises(RuntimeError, match="deleted during processing"):
+            run_document_pipeline(db, doc)
+    db.rollback()
+    _assert_nothing_stored(db, doc_id, user_id)
+
+def test_job_for_a_deleted_document_ends_quietly(client, db):
+    _, doc_id = _upload(client, "deleted_job@example.com")
+    doc = db.get(Document, doc_id)
+    user_id = doc.user_id
+    job = ProcessingJob(document_id=doc_id, user_id=user_id, status="queued", progress=0)
+    db.add(job)
+    db.commit()
+    job_id = job.id
+
+    with patch("backend.processing.observe_stage", side_effect=lambda *args: _delete_document(db, doc_id, user_id)):
+        jobs.run_job(job_id, db)
+    assert db.get(ProcessingJob, job_id) is None
+    _assert_nothing_stored(db, doc_id, user_id)
@@ -0,0 +1,104 @@
+import os
+import re
+import threading
+import time
+from unittest.mock import patch
+from backend import metrics
+from backend.metrics import Histogram, instrument_engine
+
+def _login(client, email):
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+def _sample(text, name, **labels):
+    """Value of one series in Prometheus text output, or None."""
+    for line in text.splitlines():
+        match = re.match(rf"{name}\{{(.*)\}} (\S+)$", line)
+        if match and all(f'{k}="{v}"' in match.group(1) for k, v in labels.items()):
+            return float(match.group(2))
+    return None
+
+def test_metrics_cover_routes_stages_and_queries(client, db):
+    instrument_engine(db.get_bind())
+    headers = _login(client, "metrics_test@example.com")
+    before = client.get("/metrics").text
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("metrics.txt", b"policy policy government election", "text/plain")},
+        headers=headers
+    )
+    client.get(f"/documents/{up_res.json()['id']}/export/csv", headers=headers)
+    client.get("/documents/999999/words", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    # Routes are labelled by template, with the status code
+    count = "http_request_duration_seconds_count"
+    assert _sample(text, count, method="POST", route="/documents/upload", status="200") >= 1
+    assert _sample(text, count, method="GET", route="/documents/{doc_id}/words", status="404") >= 1
+    assert _sample(text, "http_request_db_queries_count", method="POST", route="/documents/upload") >= 1
+    assert _sample(text, "http_request_db_queries_sum", method="POST", route="/documents/upload") > 0
+
+    # Every pipeline stage ran once more than before
+    for stage in ("download", "extract", "tokenize", "persist", "export"):
+        previous = _sample(before, "pipeline_stage_duration_seconds_count", stage=stage) or 0
+        assert _sample(text, "pipeline_stage_duration_seconds_count", stage=stage) == previous + 1, stage
+    assert _sample(text, "process_resource", resource="max_rss_bytes") > 0
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "x")
+    text = "\n".join(histogram.render())
+    assert _sample(text, "demo_seconds_bucket", le="0.1") == 1
+    assert _sample(text, "demo_seconds_bucket", le="1") == 2
+    assert _sample(text, "demo_seconds_bucket", le="+Inf") == 3
+    assert _sample(text, "demo_seconds_sum", stage="x") == 5.55
+
+def test_profiler_runs_only_when_enabled_and_requested(client, tmp_path):
+    assert "x-profile-id" not in client.get("/", headers={"X-Profile": "1"}).headers
+
+    with patch.object(metrics, "METRICS_PROFILING_ENABLED", True), patch.object(metrics, "METRICS_PROFILE_DIR", str(tmp_path)):
+        assert "x-profile-id" not in client.get("/").headers
+        response = client.get("/health", headers={"X-Profile": "1"})
+    profile = tmp_path / f"{response.headers['x-profile-id']}.folded"
+    assert os.path.exists(profile)
+
+def test_label_values_are_escaped():
+    histogram = Histogram("demo_seconds", "Demo.", ("path",), buckets=(1,))
+    histogram.observe(0.5, 'a\\b"c\nd')
+    text = "\n".join(histogram.render())
+    assert 'demo_seconds_count{path="a\\\\b\\"c\\nd"} 1' in text
+    assert len([line for line in text.splitlines() if line.startswith("demo_seconds_count")]) == 1
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def _profiled_spin(stop):
+    _spin(stop)
+
+def _unrelated_spin(stop):
+    _spin(stop)
+
+def test_profiler_samples_only_the_requests_threads():
+    stop = threading.Event()
+    profiled = threading.Thread(target=_profiled_spin, args=(stop,))
+    unrelated = threading.Thread(target=_unrelated_spin, args=(stop,))
+    profiled.start()
+    unrelated.start()
+    profiler = metrics.SamplingProfiler({profiled.ident}, interval=0.001)
+    try:
+        profiler.start()
+        time.sleep(0.1)
+    finally:
+        profiler._stop.set()
+        profiler._thread.join()
+        stop.set()
+        profiled.join()
+        unrelated.join()
+    stacks = list(profiler.samples)
+    assert stacks and all("_profiled_spin" in stack for stack in stacks)
@@ -0,0 +1,44 @@
+from sqlalchemy import create_engine, inspect, text
+from backend.database import Base
+from backend.migrations import MIGRATIONS, run_migrations
+
+def test_migrations_upgrade_old_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # documents table as it was before content hashing
+        conn.execute(text(
+            "CREATE TABLE documents (id INTEGER PRIMARY KEY, user_id INTEGER, filename VARCHAR NOT NULL, "
+            "file_type VARCHAR, storage_path VARCHAR NOT NULL, upload_date DATETIME)"
+        ))
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    columns = {c["name"] for c in inspect(engine).get_columns("documents")}
+    assert "content_hash" in columns
+
+    # Running again is a no-op
+    run_migrations(engine)
+    with engine.connect() as conn:
+        applied = [row[0] for row in conn.execute(text("SELECT name FROM schema_migrations"))]
+    assert applied == [name for name, _ in MIGRATIONS]
+
+def test_translation_duplicates_collapse_before_unique_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dupes.db'}")
+    with engine.begin() as conn:
+        # user_translations as it was before the (user_id, word) unique index
+        conn.execute(text(
+            "CREATE TABLE user_translations (id INTEGER PRIMARY KEY, user_id INTEGER, word VARCHAR, "
+            "translation VARCHAR, created_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO user_translations (user_id, word, translation) VALUES "
+            "(1, 'policy', 'old'), (1, 'policy', 'new'), (2, 'policy', 'other')"
+        ))
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT user_id, translation FROM user_translations ORDER BY user_id")).all()
+    assert [tuple(r) for r in rows] == [(1, "new"), (2, "other")]
+    index_names = {i["name"] for i in inspect(engine).get_indexes("user_translations")}
+    assert "uq_user_translations_user_word" in index_names
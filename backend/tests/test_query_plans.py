@@ -0,0 +1,56 @@
+from sqlalchemy import event, select
+from backend.corpus import get_top_words, get_word_documents, search_words
+from backend.frequencies import get_word_page
+from backend.models import Document, UserTranslation
+
+def _plan(db, sql, params=()) -> str:
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+def _captured_plan(db, fn) -> str:
+    """Plan of the last SELECT that `fn` sends to the database."""
+    captured = []
+    listener = lambda conn, cursor, statement, parameters, *args: captured.append((statement, parameters))
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    statement, parameters = [c for c in captured if c[0].lstrip().upper().startswith("SELECT")][-1]
+    return _plan(db, statement, parameters)
+
+def test_hot_read_paths_use_indexes(db):
+    # /words: frequency-ordered page joined to the user's translations
+    plan = _captured_plan(db, lambda: get_word_page(db, 1, 1, limit=100))
+    assert "ix_word_frequency_doc_freq_word" in plan
+    assert "uq_user_translations_user_word" in plan
+    assert "TEMP B-TREE" not in plan # No sort step: rows come out in index order
+
+    # /words?prefix=...&sort=word_asc
+    plan = _captured_plan(db, lambda: get_word_page(db, 1, 1, prefix="gov", sort="word_asc"))
+    assert "ix_word_frequency_doc_word" in plan
+
+    # list_documents
+    plan = _captured_plan(db, lambda: db.execute(select(Document).where(Document.user_id == 1)).all())
+    assert "ix_documents_user_id" in plan
+
+    # batch_translate: the user's already translated words
+    plan = _captured_plan(db, lambda: db.execute(select(UserTranslation.word).where(
+        UserTranslation.user_id == 1, UserTranslation.word.in_(["policy", "election"])
+    )).all())
+    assert "uq_user_translations_user_word" in plan
+
+def test_corpus_reads_use_indexes(db):
+    # /corpus/words: index order, no sort step
+    plan = _captured_plan(db, lambda: get_top_words(db, 1, limit=100))
+    assert "ix_corpus_words_user_total_word" in plan
+    assert "TEMP B-TREE" not in plan
+
+    # /corpus/search prefix mode: range scan on the (user_id, word) key
+    plan = _captured_plan(db, lambda: search_words(db, 1, "gov"))
+    assert "INDEX" in plan and "TEMP B-TREE" not in plan
+
+    # /corpus/words/{word}/documents
+    plan = _captured_plan(db, lambda: get_word_documents(db, 1, "policy"))
+    assert "SCAN word_frequency" not in plan
+    assert "SCAN documents" not in plan
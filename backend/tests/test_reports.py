@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+import pytest
+from backend.reports import VocabularyReport, _ReportFont, render_vocabulary_report
+
+ROWS = [
+    (f"word{i}", 1000 - i, ["সরকার", "উন্নয়ন", "নির্বাচন", None][i % 4])
+    for i in range(100)
+]
+
+def test_reports_render_with_a_warm_shaping_cache():
+    # Timing against a fresh FPDF per report lives in the benchmark suite (report/)
+    first = render_vocabulary_report("report.pdf", ROWS)
+    second = render_vocabulary_report("report.pdf", ROWS)
+    assert first.startswith(b"%PDF") and second.startswith(b"%PDF")
+    assert len(second) == len(first)
+
+def test_reports_share_parsed_font_but_subset_their_own_copy():
+    first, second = VocabularyReport("a"), VocabularyReport("b")
+    if first.font_family_name != "Bengali":
+        pytest.skip("Bengali font not available")
+    font_a, font_b = first.fonts["bengali"], second.fonts["bengali"]
+    assert font_a.cmap is font_b.cmap and font_a.cw is font_b.cw
+    assert font_a.ttfont is not font_b.ttfont and font_a.subset is not font_b.subset
+
+def test_unexpected_fpdf2_font_layout_is_refused():
+    parsed = SimpleNamespace(**{name: None for name in _ReportFont.SHARED + _ReportFont.PER_DOCUMENT})
+    del parsed.cmap
+    with pytest.raises(RuntimeError, match="missing: \\['cmap'\\]"):
+        _ReportFont.check_layout(parsed)
@@ -0,0 +1,124 @@
+from uuid import uuid4
+from backend.response_cache import ResponseCache, response_cache
+
+def _login(client):
+    email = f"etag_{uuid4()}@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+def test_response_cache_evicts_by_size():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    assert cache.get("a") == b"12345" # "a" is now the most recent
+    cache.put("c", b"12345")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    cache.put("huge", b"x" * 11) # Larger than the whole cache: never stored
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 10
+
+def test_conditional_get_and_cache_hits(client):
+    headers = _login(client)
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("etag.txt", b"budget ministry budget", "text/plain")},
+        headers=headers
+    )
+    doc_id = up_res.json()["id"]
+
+    for path in ("/documents/", f"/documents/{doc_id}/words", "/translations/user"):
+        first = client.get(path, headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        hits = response_cache.hits
+        second = client.get(path, headers=headers)
+        assert second.json() == first.json()
+        assert response_cache.hits == hits + 1
+
+        not_modified = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    # Different query parameters are a different resource with a different tag
+    page = client.get(f"/documents/{doc_id}/words", params={"limit": 1}, headers=headers)
+    assert page.headers["etag"] != client.get(f"/documents/{doc_id}/words", headers=headers).headers["etag"]
+    assert len(page.json()["items"]) == 1
+
+def test_writes_change_etags(client):
+    headers = _login(client)
+
+    def etag(path):
+        return client.get(path, headers=headers).headers["etag"]
+
+    docs_tag, translations_tag = etag("/documents/"), etag("/translations/user")
+    up_res = client.post(
+        "/documents/upload",
+        files={"file": ("versions.txt", b"parliament budget", "text/plain")},
+        headers=headers
+    )
+    doc_id = up_res.json()["id"]
+    assert etag("/documents/") != docs_tag
+    assert etag("/translations/user") == translations_tag
+
+    words_tag = etag(f"/documents/{doc_id}/words")
+    client.post(f"/documents/{doc_id}/process", headers=headers)
+    assert etag(f"/documents/{doc_id}/words") != words_tag
+
+    # Saving, overwriting and deleting a translation each invalidate the word pages
+    words_tag = etag(f"/documents/{doc_id}/words")
+    for translation in ("সংসদ", "জাতীয় সংসদ"):
+        client.post("/translations/", json={"word": "parliament", "translation": translation}, headers=headers)
+        words = client.get(f"/documents/{doc_id}/words", headers=headers)
+        assert words.headers["etag"] != words_tag
+        words_tag = words.headers["etag"]
+        by_word = {w["word"]: w["translation"] for w in words.json()["items"]}
+        assert by_word["parliament"] == translation
+        assert client.get("/translations/user", headers=headers).json()[0]["translation"] == translation
+    translation_id = client.get("/translations/user", headers=headers).json()[0]["id"]
+    client.delete(f"/translations/delete/{translation_id}", headers=headers)
+    assert client.get("/translations/user", headers=headers).json() == []
+    assert client.get(f"/documents/{doc_id}/words", headers=headers).headers["etag"] != words_tag
+
+    docs_tag = etag("/documents/")
+    client.delete(f"/documents/{doc_id}", headers=headers)
+    documents = client.get("/documents/", headers=headers)
+    assert documents.headers["etag"] != docs_tag
+    assert documents.json() == []
+
+def test_cached_responses_are_per_user(client):
+    owner, other = _login(client), _login(client)
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("private.txt", b"ministry", "text/plain")},
+        headers=owner
+    )
+    doc_id = up_res.json()["id"]
+    owner_list = client.get("/documents/", headers=owner)
+    assert len(owner_list.json()) == 1
+    assert client.get(f"/documents/{doc_id}/words", headers=owner).status_code == 200
+
+    assert client.get("/documents/", headers=other).json() == []
+    # The owner's tag is not valid for another account
+    not_mine = client.get("/documents/", headers={**other, "If-None-Match": owner_list.headers["etag"]})
+    assert not_mine.status_code == 200
+    assert client.get(f"/documents/{doc_id}/words", headers=other).status_code == 404
+
+def test_revalidation_still_checks_the_document(client):
+    owner, other = _login(client), _login(client)
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("revalidate.txt", b"ministry", "text/plain")},
+        headers=owner
+    )
+    doc_id = up_res.json()["id"]
+    path = f"/documents/{doc_id}/words"
+    assert client.get(path, headers={**owner, "If-None-Match": "*"}).status_code == 304
+
+    # A matching tag must not hide that the document is someone else's, or gone
+    assert client.get(path, headers={**other, "If-None-Match": "*"}).status_code == 404
+    client.delete(f"/documents/{doc_id}", headers=owner)
+    assert client.get(path, headers={**owner, "If-None-Match": "*"}).status_code == 404
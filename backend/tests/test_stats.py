@@ -0,0 +1,84 @@
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from backend import stats
+from backend.database import Base
+from backend.migrations import run_migrations
+from backend.models import Document, User, UserStats
+
+def _login(client, email):
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+def test_stats_follow_documents_and_translations(client):
+    headers = _login(client, "stats_test@example.com")
+    assert client.get("/stats", headers=headers).json() == {
+        "document_count": 0, "total_words": 0, "translation_count": 0, "document": None
+    }
+
+    client.post("/translations/", json={"word": "policy", "translation": "নীতি"}, headers=headers)
+    up_res = client.post(
+        "/documents/upload?process=true",
+        files={"file": ("stats.txt", b"policy policy government election", "text/plain")},
+        headers=headers
+    )
+    doc_id = up_res.json()["id"]
+    stats = client.get("/stats", params={"document_id": doc_id}, headers=headers).json()
+    assert stats == {
+        "document_count": 1, "total_words": 4, "translation_count": 1,
+        "document": {"document_id": doc_id, "unique_words": 3, "total_words": 4, "translated_words": 1},
+    }
+
+    # New translations count once; overwriting one does not
+    client.post("/translations/", json={"word": "government", "translation": "সরকার"}, headers=headers)
+    saved = client.post("/translations/", json={"word": "government", "translation": "প্রশাসন"}, headers=headers)
+    stats = client.get("/stats", params={"document_id": doc_id}, headers=headers).json()
+    assert (stats["translation_count"], stats["document"]["translated_words"]) == (2, 2)
+
+    client.delete(f"/translations/delete/{saved.json()['id']}", headers=headers)
+    stats = client.get("/stats", params={"document_id": doc_id}, headers=headers).json()
+    assert (stats["translation_count"], stats["document"]["translated_words"]) == (1, 1)
+
+    # Another user's document is not visible
+    other = _login(client, "stats_other@example.com")
+    assert client.get("/stats", params={"document_id": doc_id}, headers=other).json()["document"] is None
+
+    client.delete(f"/documents/{doc_id}", headers=headers)
+    assert client.get("/stats", headers=headers).json() == {
+        "document_count": 0, "total_words": 0, "translation_count": 1, "document": None
+    }
+
+def test_counters_without_on_conflict_support(db):
+    user = User(email="stats_fallback@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    doc = Document(user_id=user.id, filename="fallback.txt", storage_path="fallback.txt")
+    db.add(doc)
+    db.flush()
+
+    # Databases other than Postgres and SQLite create the first row through the ORM
+    with patch.object(stats, "insert_on_conflict", return_value=None):
+        stats.record_document_added(db, doc.id, user.id)
+        stats.record_document_processed(db, doc.id, user.id, [("policy", 2), ("budget", 1)])
+    row = db.get(UserStats, user.id)
+    assert (row.document_count, row.total_words, row.translation_count, row.documents_version) == (1, 3, 0, 2)
+
+def test_backfill_migration_computes_existing_counters(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@example.com', 'x')"))
+        conn.execute(text("INSERT INTO documents (id, user_id, filename, storage_path) VALUES (1, 1, 'a.txt', 'a')"))
+        conn.execute(text(
+            "INSERT INTO word_frequency (document_id, word, frequency) VALUES (1, 'policy', 3), (1, 'election', 2)"
+        ))
+        conn.execute(text("INSERT INTO user_translations (user_id, word, translation) VALUES (1, 'policy', 'নীতি')"))
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        assert tuple(conn.execute(text(
+            "SELECT document_count, total_words, translation_count FROM user_stats WHERE user_id = 1"
+        )).one()) == (1, 5, 1)
+        assert tuple(conn.execute(text(
+            "SELECT unique_words, total_words, translated_words FROM document_stats WHERE document_id = 1"
+        )).one()) == (2, 5, 1)
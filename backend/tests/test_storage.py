@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from backend.database import LocalStorage, Storage, StorageError, storage
+from backend.models import Document
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+def test_local_storage_streams_round_trip(tmp_path):
+    local = LocalStorage(root=str(tmp_path))
+    content = b"policy government " + "সরকার".encode("utf-8")
+
+    async def scenario():
+        await local.upload("user_1/doc.txt", _chunks(content[:7], content[7:]))
+        streamed = [chunk async for chunk in local.download_stream("user_1/doc.txt")]
+        assert b"".join(streamed) == content
+        await local.remove(["user_1/doc.txt", "user_1/missing.txt"])
+
+    asyncio.run(scenario())
+    assert not (tmp_path / "documents" / "user_1" / "doc.txt").exists()
+    with pytest.raises(StorageError):
+        local.download_sync("user_1/doc.txt")
+
+def test_local_storage_rejects_paths_outside_bucket(tmp_path):
+    with pytest.raises(StorageError):
+        LocalStorage(root=str(tmp_path)).download_sync("../secrets.txt")
+
+def test_upload_and_delete_go_through_storage(client, db):
+    email = "storage_test@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    content = b"election " * 200_000 # Spans several storage chunks
+    up_res = client.post("/documents/upload", files={"file": ("big.txt", content, "text/plain")}, headers=headers)
+    assert up_res.status_code == 200
+    path = db.get(Document, up_res.json()["id"]).storage_path
+    assert storage.download_sync(path) == content
+
+    assert client.delete(f"/documents/{up_res.json()['id']}", headers=headers).status_code == 204
+    with pytest.raises(StorageError):
+        storage.download_sync(path)
+
+def test_storage_backends_must_implement_every_transfer():
+    class UploadOnly(Storage):
+        async def upload(self, path, chunks, content_type=None):
+            pass
+
+    with pytest.raises(TypeError):
+        UploadOnly()
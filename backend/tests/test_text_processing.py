@@ -0,0 +1,85 @@
+import pytest
+from fpdf import FPDF
+from backend.utils import text_processing
+from backend.utils.text_processing import (
+    count_words,
+    extract_text_from_pdf,
+    iter_pdf_pages,
+    iter_txt_chunks,
+    tokenize_and_count
+)
+
+def make_pdf(pages):
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)
+    for text in pages:
+        pdf.add_page()
+        pdf.multi_cell(0, 10, text)
+    return bytes(pdf.output())
+
+PAGES = [
+    f"Page {i} discusses government policy and development number {i}. Election process support."
+    for i in range(12)
+]
+
+@pytest.fixture
+def parallel_pdf(monkeypatch):
+    monkeypatch.setattr(text_processing, "PDF_WORKERS", 2)
+    monkeypatch.setattr(text_processing, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(text_processing, "PDF_PAGES_PER_TASK", 3)
+    monkeypatch.setattr(text_processing, "PDF_MAX_INFLIGHT_TASKS", 2)
+    yield
+    if text_processing._pdf_executor is not None:
+        text_processing._pdf_executor.shutdown()
+        text_processing._pdf_executor = None
+
+def test_iter_pdf_pages_yields_each_page(monkeypatch):
+    monkeypatch.setattr(text_processing, "PDF_WORKERS", 1)
+    content = make_pdf(PAGES)
+    pages = list(iter_pdf_pages(content))
+    assert len(pages) == len(PAGES)
+    assert "Page 3" in pages[3]
+    assert extract_text_from_pdf(content) == "".join(pages)
+
+def test_parallel_extraction_matches_sequential(monkeypatch, parallel_pdf):
+    content = make_pdf(PAGES)
+    parallel_pages = list(iter_pdf_pages(content))
+    assert text_processing._pdf_executor is not None
+
+    monkeypatch.setattr(text_processing, "PDF_WORKERS", 1)
+    sequential_pages = list(iter_pdf_pages(content))
+
+    assert parallel_pages == sequential_pages
+    assert tokenize_and_count("".join(parallel_pages)) == tokenize_and_count("".join(sequential_pages))
+
+SAMPLE_TEXT = (
+    "The Government announced a new Development policy in January. "
+    "সরকার উন্নয়ন নীতি ঘোষণা করেছে এবং জনগণ সমর্থন দিয়েছে। "
+    "Visit www.example.gov for 2024 election results; policy, policy!"
+)
+
+def test_count_words_matches_tokenize_for_any_chunking():
+    expected = tokenize_and_count(SAMPLE_TEXT)
+    for size in (1, 2, 3, 7, 64):
+        chunks = [SAMPLE_TEXT[i:i + size] for i in range(0, len(SAMPLE_TEXT), size)]
+        assert count_words(chunks) == expected
+
+def test_count_words_joins_words_across_chunks():
+    counts = count_words(["gover", "nment ", "policy"])
+    assert counts == {"government": 1, "policy": 1}
+
+def test_count_words_updates_counter_in_place():
+    counts = tokenize_and_count("policy election")
+    result = count_words(["policy development"], counts)
+    assert result is counts
+    assert counts == {"policy": 2, "election": 1, "development": 1}
+
+def test_txt_chunks_keep_multibyte_characters_intact():
+    content = SAMPLE_TEXT.encode("utf-8")
+    chunks = list(iter_txt_chunks(content, chunk_size=5))
+    assert "".join(chunks) == SAMPLE_TEXT
+    assert count_words(chunks) == tokenize_and_count(SAMPLE_TEXT)
+
+def test_words_with_bengali_digits_are_dropped_whole():
+    counts = tokenize_and_count("নীতি১২৩ abc১def সরকার ab x1y policy")
+    assert counts == {"সরকার": 1, "policy": 1}
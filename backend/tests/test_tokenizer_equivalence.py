@@ -0,0 +1,21 @@
+import random
+from backend.benchmarks.reference import legacy_tokenize_and_count
+from backend.utils.text_processing import NOISE_WORDS, tokenize_and_count
+
+def make_corpus(size_bytes, seed=42):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["".join(rng.choice(letters) for _ in range(rng.randint(2, 10))) for _ in range(5000)]
+    vocab += sorted(NOISE_WORDS)
+    vocab += ["সরকার", "উন্নয়ন", "নির্বাচন", "নীতি১২", "২০২৪", "Policy", "http://gov.bd", "co2", "a1b2"]
+    parts, size = [], 0
+    while size < size_bytes:
+        word = rng.choice(vocab)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)
+
+def test_compiled_filter_matches_legacy_loop():
+    # Timing both lives in the benchmark suite (tokenize/ and tokenize_legacy/)
+    corpus = make_corpus(256 * 1024)
+    assert tokenize_and_count(corpus) == legacy_tokenize_and_count(corpus)
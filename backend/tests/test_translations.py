@@ -1,5 +1,12 @@
+import json
 import pytest
+from unittest.mock import patch
+from sqlalchemy import event
 from uuid import uuid4
+from backend import translator
+from backend.main import app
+from backend.models import MachineTranslation
+from backend.translator import MachineTranslationCache, get_machine_translator
 
 def test_save_translation(client):
     # 1. Signup/Login
@@ -43,3 +50,150 @@ def test_fetch_user_translations(client):
     assert response.status_code == 200
     assert len(response.json()) >= 1
     assert response.json()[0]["word"] == "test"
+
+class StubTranslator:
+    """Local stand-in for GoogleTranslator that records what it was asked."""
+
+    def __init__(self):
+        self.requested = []
+
+    def translate_batch(self, words):
+        self.requested.extend(words)
+        return [f"bn:{w}" for w in words]
+
+    def translate(self, word):
+        return self.translate_batch([word])[0]
+
+def _login(client):
+    email = f"batch_{uuid4()}@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+def test_batch_translate_shares_machine_translations_across_users(client):
+    stub = StubTranslator()
+    app.dependency_overrides[get_machine_translator] = lambda: stub
+    try:
+        # 1. First user: everything is a miss
+        response = client.post("/translations/batch", json={"words": ["Parliament", "budget"]}, headers=_login(client))
+        assert response.status_code == 200
+        assert {t["word"]: t["translation"] for t in response.json()} == {
+            "parliament": "bn:parliament", "budget": "bn:budget"
+        }
+        assert stub.requested == ["parliament", "budget"]
+
+        # 2. Second user: only the new word goes to the remote translator
+        response = client.post("/translations/batch", json={"words": ["budget", "ministry"]}, headers=_login(client))
+        assert [t["translation"] for t in response.json()] == ["bn:budget", "bn:ministry"]
+        assert stub.requested == ["parliament", "budget", "ministry"]
+    finally:
+        del app.dependency_overrides[get_machine_translator]
+
+def test_batch_translate_prefers_local_dictionary(client):
+    stub = StubTranslator()
+    app.dependency_overrides[get_machine_translator] = lambda: stub
+    try:
+        response = client.post("/translations/batch", json={"words": ["Government", "treaty"]}, headers=_login(client))
+    finally:
+        del app.dependency_overrides[get_machine_translator]
+    assert {t["word"]: t["translation"] for t in response.json()} == {"government": "সরকার", "treaty": "bn:treaty"}
+    assert stub.requested == ["treaty"]
+
+def test_translation_cache_expires_and_evicts(db):
+    cache = MachineTranslationCache(ttl=60, max_entries=2, evict_every=1)
+    cache.put_many(db, "en", "bn", {"alpha": "a", "beta": "b"})
+    assert cache.get_many(db, "en", "bn", ["alpha", "gamma"]) == {"alpha": "a"}
+    assert cache.stats()["hit_rate"] == 0.5
+
+    # Over capacity: the least recently used entry (beta) goes
+    cache.put_many(db, "en", "bn", {"gamma": "g"})
+    assert db.get(MachineTranslation, ("en", "bn", "beta")) is None
+    assert cache.get_many(db, "en", "bn", ["alpha", "gamma"]) == {"alpha": "a", "gamma": "g"}
+
+    # Expired entries read as misses
+    cache.ttl = -1
+    assert cache.get_many(db, "en", "bn", ["alpha"]) == {}
+
+def test_translation_cache_evicts_periodically(db):
+    cache = MachineTranslationCache(ttl=60, max_entries=1, evict_every=3)
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        for word in ("alpha", "beta", "gamma", "delta"):
+            cache.put_many(db, "en", "bn", {word: word[0]})
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    # The first write evicts, then every third written row
+    assert len([s for s in statements if "count(*)" in s.lower()]) == 2
+    assert [row.word for row in db.query(MachineTranslation).all()] == ["delta"]
+
+def test_save_translation_upserts_one_row_per_word(client, db):
+    headers = _login(client)
+    first = client.post("/translations/", json={"word": "Policy", "translation": "নীতি"}, headers=headers).json()
+    second = client.post("/translations/", json={"word": "policy", "translation": "নীতিমালা"}, headers=headers).json()
+    assert second["id"] == first["id"]
+    assert second["translation"] == "নীতিমালা"
+
+    saved = client.get("/translations/user", headers=headers).json()
+    assert [(t["word"], t["translation"]) for t in saved] == [("policy", "নীতিমালা")]
+
+class FlakyTranslator(StubTranslator):
+    """Fails the first call for every chunk and always fails chunks containing `broken`."""
+
+    def __init__(self):
+        super().__init__()
+        self.seen = set()
+
+    def translate_batch(self, words):
+        key = tuple(words)
+        if key not in self.seen or "broken" in words:
+            self.seen.add(key)
+            raise RuntimeError("temporary outage")
+        return super().translate_batch(words)
+
+def test_batch_translate_streams_chunk_progress(client):
+    flaky = FlakyTranslator()
+    app.dependency_overrides[get_machine_translator] = lambda: flaky
+    headers = _login(client)
+    try:
+        with patch.object(translator, "MT_CHUNK_SIZE", 2), patch.object(translator, "MT_RETRY_BACKOFF_SECONDS", 0):
+            response = client.post(
+                "/translations/batch?stream=true",
+                json={"words": ["alpha", "beta", "gamma", "broken", "delta"]},
+                headers=headers
+            )
+    finally:
+        del app.dependency_overrides[get_machine_translator]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["progress"] * 5 + ["done"]
+    # Retried chunks succeed; the chunk that keeps failing is reported, not fatal
+    assert events[-1][1] == {"total": 5, "done": 3, "failed": 2}
+    assert sum(1 for _, data in events if data.get("error")) == 1
+
+    # Every successful chunk was committed as it finished
+    saved = client.get("/translations/user", headers=headers).json()
+    assert sorted(t["word"] for t in saved) == ["alpha", "beta", "delta"]
+
+def test_overwriting_a_translation_is_one_upsert(client, db):
+    email = f"upsert_{uuid4()}@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    first = client.post("/translations/", json={"word": "policy", "translation": "নীতি"}, headers=headers).json()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        second = client.post("/translations/", json={"word": "policy", "translation": "নীতিমালা"}, headers=headers).json()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert (second["id"], second["created_at"], second["translation"]) == (first["id"], first["created_at"], "নীতিমালা")
+    assert len([s for s in statements if "user_translations" in s]) == 1
+    assert client.get("/stats", headers=headers).json()["translation_count"] == 1
@@ -0,0 +1,34 @@
+import time
+from backend.translator import FakeTranslator, TokenBucket, iter_translated_chunks
+
+WORDS = [f"word{i}" for i in range(400)]
+
+def run_pipeline(translator, **options):
+    translations = {}
+    for _, fetched, error in iter_translated_chunks(translator, WORDS, limiter=TokenBucket(rate=0), **options):
+        assert error is None
+        translations.update(fetched)
+    return translations
+
+def test_concurrent_chunks_match_serial_calls():
+    # Timing serial against concurrent chunks lives in the benchmark suite (translate/)
+    serial = run_pipeline(FakeTranslator(latency=0), chunk_size=20, concurrency=1)
+    concurrent = run_pipeline(FakeTranslator(latency=0), chunk_size=20, concurrency=8)
+    assert concurrent == serial and len(concurrent) == len(WORDS)
+
+def test_retries_recover_and_rate_limit_holds():
+    flaky = FakeTranslator(latency=0, failure_rate=0.3, seed=7)
+    translations = {}
+    for _, fetched, error in iter_translated_chunks(
+        flaky, WORDS, chunk_size=20, limiter=TokenBucket(rate=0), retries=10, backoff=0
+    ):
+        assert error is None
+        translations.update(fetched)
+    assert len(translations) == len(WORDS) and flaky.calls > 20
+
+    # Burst of 2, then 50 calls per second: 7 calls need at least 0.1 s
+    bucket = TokenBucket(rate=50, burst=2)
+    start = time.perf_counter()
+    for _ in range(7):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 0.09
@@ -0,0 +1,90 @@
+import random
+from unittest.mock import patch
+from backend import frequencies
+from backend.exports import iter_export_rows
+from backend.frequencies import WORD_SORTS, get_word_page, replace_word_frequencies
+from backend.models import Document, DocumentVocabulary, User, UserTranslation, WordFrequency
+from backend.vocabulary import PackedVocabulary, pack_vocabulary
+
+def _items(count=300, seed=1):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice("abcdeসরক") for _ in range(rng.randint(1, 5))))
+    return [(word, rng.randint(1, 6)) for word in sorted(words)]
+
+def _login(client, email):
+    client.post("/auth/signup", json={"email": email, "password": "password"})
+    login_res = client.post("/auth/login", data={"username": email, "password": "password"})
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+def test_packed_vocabulary_round_trip_and_lookup():
+    items = _items()
+    vocabulary = PackedVocabulary(pack_vocabulary(reversed(items)))
+    assert len(vocabulary) == len(items)
+    assert list(vocabulary.items()) == items
+    assert list(vocabulary.most_common(3)) == sorted(items, key=lambda i: (-i[1], i[0]))[:3]
+    assert vocabulary.get(items[5][0]) == items[5][1] and vocabulary.get("missing") is None
+    assert PackedVocabulary(pack_vocabulary([])).page() == ([], False)
+
+def test_packed_pages_match_row_pages(db):
+    user = User(email="packed_pages@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    rows_doc, packed_doc = (Document(user_id=user.id, filename=n, storage_path=n) for n in ("rows.txt", "packed.txt"))
+    db.add_all([rows_doc, packed_doc])
+    db.flush()
+    items = _items()
+    replace_word_frequencies(db, rows_doc.id, items)
+    with patch.object(frequencies, "VOCABULARY_STORAGE", "packed"):
+        replace_word_frequencies(db, packed_doc.id, items)
+    db.add(UserTranslation(user_id=user.id, word=items[0][0], translation="অনুবাদ"))
+    db.flush()
+    assert db.query(WordFrequency).filter(WordFrequency.document_id == packed_doc.id).count() == 0
+
+    def walk(doc_id, **params):
+        pages, cursor = [], None
+        while True:
+            items, cursor = get_word_page(db, doc_id, user.id, cursor=cursor, **params)
+            pages.append(items)
+            if cursor is None:
+                return pages
+
+    for sort in WORD_SORTS:
+        for params in ({"limit": 7}, {"limit": 5, "min_frequency": 3}, {"limit": 4, "prefix": "স"}, {"limit": 100, "prefix": "A"}):
+            assert walk(packed_doc.id, sort=sort, **params) == walk(rows_doc.id, sort=sort, **params), (sort, params)
+    assert list(iter_export_rows(db, packed_doc.id, user.id)) == list(iter_export_rows(db, rows_doc.id, user.id))
+    assert list(iter_export_rows(db, packed_doc.id, user.id, limit=10)) == list(iter_export_rows(db, rows_doc.id, user.id, limit=10))
+
+def test_packed_storage_through_the_api(client, db):
+    headers = _login(client, "packed_api@example.com")
+    with patch.object(frequencies, "VOCABULARY_STORAGE", "packed"):
+        client.post("/translations/", json={"word": "budget", "translation": "বাজেট"}, headers=headers)
+        up_res = client.post(
+            "/documents/upload?process=true",
+            files={"file": ("packed.txt", b"budget budget ministry parliament", "text/plain")},
+            headers=headers
+        )
+        doc_id = up_res.json()["id"]
+        assert db.get(DocumentVocabulary, doc_id).word_count == 3
+
+        words = client.get(f"/documents/{doc_id}/words", headers=headers).json()
+        assert words["items"][0] == {"word": "budget", "frequency": 2, "translation": "বাজেট"}
+        client.post("/translations/", json={"word": "ministry", "translation": "মন্ত্রণালয়"}, headers=headers)
+        stats = client.get("/stats", params={"document_id": doc_id}, headers=headers).json()
+        assert stats["document"]["translated_words"] == 2
+        assert client.get("/corpus/words/ministry/documents", headers=headers).json() == [
+            {"document_id": doc_id, "filename": "packed.txt", "frequency": 1}
+        ]
+
+    # Reprocessing with row storage converts the document and keeps the corpus right
+    client.post(f"/documents/{doc_id}/process", headers=headers)
+    assert db.get(DocumentVocabulary, doc_id) is None
+    corpus = client.get("/corpus/words", headers=headers).json()["items"]
+    assert corpus[0] == {"word": "budget", "total_frequency": 2, "document_count": 1}
+
+    with patch.object(frequencies, "VOCABULARY_STORAGE", "packed"):
+        client.post(f"/documents/{doc_id}/process", headers=headers)
+        client.delete(f"/documents/{doc_id}", headers=headers)
+    assert db.get(DocumentVocabulary, doc_id) is None
+    assert client.get("/corpus/words", headers=headers).json()["items"] == []
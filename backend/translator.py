@@ -0,0 +1,285 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.orm import Session
+from .database import insert_on_conflict
+from .dictionary import DictionaryTranslator
+from .metrics import span
+from .models import MachineTranslation
+
+SOURCE_LANGUAGE = "en"
+TARGET_LANGUAGE = "bn"
+
+# Shared machine translation cache (machine_translations table)
+MT_CACHE_TTL_SECONDS = int(os.getenv("MT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+MT_CACHE_MAX_ENTRIES = int(os.getenv("MT_CACHE_MAX_ENTRIES", "200000"))
+# Expiry and size checks scan the table, so they run once per this many written rows
+MT_CACHE_EVICT_EVERY = int(os.getenv("MT_CACHE_EVICT_EVERY", "1000"))
+
+# Remote translation pipeline
+# - "google": deep-translator's GoogleTranslator (default)
+# - "dictionary": local dictionary only, no network calls
+# - "fake": offline stand-in with simulated latency, for benchmarks and local runs
+MT_PROVIDER = os.getenv("MT_PROVIDER", "google").lower()
+MT_CHUNK_SIZE = int(os.getenv("MT_CHUNK_SIZE", "50")) # Words per translate_batch call
+MT_CONCURRENCY = int(os.getenv("MT_CONCURRENCY", "4")) # Chunks in flight per request
+MT_RATE_PER_SECOND = float(os.getenv("MT_RATE_PER_SECOND", "5")) # Calls per second across requests, 0 = unlimited
+MT_RATE_BURST = int(os.getenv("MT_RATE_BURST", "5"))
+MT_MAX_RETRIES = int(os.getenv("MT_MAX_RETRIES", "3"))
+MT_RETRY_BACKOFF_SECONDS = float(os.getenv("MT_RETRY_BACKOFF_SECONDS", "0.5")) # Doubles on every retry
+
+# Keeps IN (...) lists under SQLite's bound parameter limit
+_LOOKUP_BATCH_SIZE = 500
+
+class FakeTranslator:
+    """Offline translator that sleeps `latency` seconds per call, like a remote API would.
+
+    With `failure_rate`, calls fail at random so retries can be exercised.
+    """
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate_batch(self, words: List[str]) -> List[str]:
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("Simulated translation failure")
+        return [f"bn:{word}" for word in words]
+
+    def translate(self, word: str) -> str:
+        return self.translate_batch([word])[0]
+
+def get_machine_translator():
+    """Remote translator used for words missing from the shared cache.
+
+    Anything with `translate_batch(words)` and `translate(word)` works; tests
+    override this dependency with a local stub.
+    """
+    if MT_PROVIDER == "dictionary":
+        return DictionaryTranslator()
+    if MT_PROVIDER == "fake":
+        return FakeTranslator()
+    # Imported here so processes that never translate do not load deep-translator
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source=SOURCE_LANGUAGE, target=TARGET_LANGUAGE)
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` calls per second on average, `burst` at once."""
+
+    def __init__(self, rate: float = MT_RATE_PER_SECOND, burst: int = MT_RATE_BURST):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call may be made."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# One bucket for the whole process: the remote API limits us, not each request
+_rate_limiter = TokenBucket()
+
+def translate_chunk(
+    translator,
+    words: List[str],
+    limiter: Optional[TokenBucket] = None,
+    retries: Optional[int] = None,
+    backoff: Optional[float] = None
+) -> Dict[str, str]:
+    """Translate one chunk with a single batch call, retrying failures with exponential backoff."""
+    limiter = limiter or _rate_limiter
+    retries = MT_MAX_RETRIES if retries is None else retries
+    backoff = MT_RETRY_BACKOFF_SECONDS if backoff is None else backoff
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            with span("translate"):
+                translations = translator.translate_batch(words)
+            return {word: translated for word, translated in zip(words, translations) if translated}
+        except Exception as e:
+            if attempt == retries:
+                raise
+            print(f"Batch translation error (attempt {attempt + 1}): {e}")
+            time.sleep(backoff * 2 ** attempt)
+
+def iter_translated_chunks(
+    translator,
+    words: List[str],
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    limiter: Optional[TokenBucket] = None,
+    **retry_options
+) -> Iterator[Tuple[List[str], Dict[str, str], Optional[str]]]:
+    """Translate `words` in chunks, `concurrency` at a time.
+
+    Yields (chunk, translations, error) as each chunk finishes, in completion
+    order; a chunk that still fails after its retries has an error and no
+    translations. Stopping early cancels the chunks not yet started.
+    """
+    chunk_size = chunk_size or MT_CHUNK_SIZE
+    chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+    if not chunks:
+        return
+    workers = min(concurrency or MT_CONCURRENCY, len(chunks))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mt-chunk")
+    try:
+        futures = {
+            pool.submit(translate_chunk, translator, chunk, limiter, **retry_options): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], {}, str(e)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _upsert(db: Session, rows: List[dict]):
+    stmt = insert_on_conflict(
+        db.get_bind(), MachineTranslation, ["source", "target", "word"], ["translation", "created_at", "last_used"]
+    )
+    if stmt is not None:
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            db.merge(MachineTranslation(**row))
+
+class MachineTranslationCache:
+    """Cross-user cache of machine translations keyed by (source, target, word).
+
+    Entries older than `ttl` seconds are treated as misses. Every `evict_every`
+    written rows (and on the first write), expired rows are purged and, beyond
+    `max_entries`, the least recently used rows go first; in between the table
+    may grow past `max_entries` by up to `evict_every` rows per worker.
+    """
+
+    def __init__(
+        self,
+        ttl: int = MT_CACHE_TTL_SECONDS,
+        max_entries: int = MT_CACHE_MAX_ENTRIES,
+        evict_every: int = MT_CACHE_EVICT_EVERY
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = evict_every
+        self._lock = threading.Lock()
+
+    def _record(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def get_many(self, db: Session, source: str, target: str, words: Iterable[str]) -> Dict[str, str]:
+        """Return cached translations for `words`; absent words are misses.
+
+        Hit counters are updated in the session's transaction; the caller commits.
+        """
+        words = list(dict.fromkeys(words))
+        now = time.time()
+        found = {}
+        for i in range(0, len(words), _LOOKUP_BATCH_SIZE):
+            batch = words[i:i + _LOOKUP_BATCH_SIZE]
+            rows = db.execute(
+                select(MachineTranslation.word, MachineTranslation.translation).where(
+                    MachineTranslation.source == source,
+                    MachineTranslation.target == target,
+                    MachineTranslation.word.in_(batch),
+                    MachineTranslation.created_at >= now - self.ttl
+                )
+            ).all()
+            found.update((word, translation) for word, translation in rows)
+
+        found_words = list(found)
+        for i in range(0, len(found_words), _LOOKUP_BATCH_SIZE):
+            db.execute(
+                update(MachineTranslation).where(
+                    MachineTranslation.source == source,
+                    MachineTranslation.target == target,
+                    MachineTranslation.word.in_(found_words[i:i + _LOOKUP_BATCH_SIZE])
+                ).values(hits=MachineTranslation.hits + 1, last_used=now)
+            )
+
+        self._record(len(found), len(words) - len(found))
+        return found
+
+    def put_many(self, db: Session, source: str, target: str, translations: Dict[str, str]):
+        if not translations:
+            return
+        now = time.time()
+        rows = [
+            {"source": source, "target": target, "word": word, "translation": translated,
+             "hits": 0, "created_at": now, "last_used": now}
+            for word, translated in translations.items()
+        ]
+        with self._lock:
+            self._writes_since_evict += len(rows)
+            evict = self._writes_since_evict >= self.evict_every
+            if evict:
+                self._writes_since_evict = 0
+        try:
+            _upsert(db, rows)
+            if evict:
+                self._evict(db, now)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Translation cache write failed: {e}")
+
+    def _evict(self, db: Session, now: float):
+        db.execute(delete(MachineTranslation).where(MachineTranslation.created_at < now - self.ttl))
+
+        overflow = db.execute(select(func.count()).select_from(MachineTranslation)).scalar() - self.max_entries
+        if overflow <= 0:
+            return
+        # Least recently used first
+        keys = db.execute(
+            select(MachineTranslation.source, MachineTranslation.target, MachineTranslation.word)
+            .order_by(MachineTranslation.last_used)
+            .limit(overflow)
+        ).all()
+        key_columns = tuple_(MachineTranslation.source, MachineTranslation.target, MachineTranslation.word)
+        for i in range(0, len(keys), _LOOKUP_BATCH_SIZE):
+            db.execute(delete(MachineTranslation).where(key_columns.in_(keys[i:i + _LOOKUP_BATCH_SIZE])))
+
+_translation_cache: Optional[MachineTranslationCache] = None
+
+def get_translation_cache() -> MachineTranslationCache:
+    global _translation_cache
+    if _translation_cache is None:
+        _translation_cache = MachineTranslationCache()
+    return _translation_cache
@@ -1,8 +1,32 @@
 import re
 import io
-import pdfplumber
-from docx import Document
-from collections import Counter
+import os
+import codecs
+import hashlib
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, deque
+from itertools import filterfalse
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+# PDF extraction tuning
+# Large PDFs are split into page ranges and parsed in a process pool.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+# Caps peak memory: at most this many page ranges are parsed or buffered at once,
+# workers are recycled after a few ranges, and each worker's address space is limited.
+PDF_MAX_INFLIGHT_TASKS = int(os.getenv("PDF_MAX_INFLIGHT_TASKS", str(max(PDF_WORKERS, 1) * 2)))
+PDF_WORKER_MAX_TASKS = int(os.getenv("PDF_WORKER_MAX_TASKS", "32"))
+PDF_WORKER_MAX_MEMORY_MB = int(os.getenv("PDF_WORKER_MAX_MEMORY_MB", "0")) # 0 = unlimited
+
+PdfSource = Union[bytes, str, BinaryIO]
+
+# pdfplumber (with pdfminer) and python-docx are imported on first use so that
+# importing the API does not load them until a document is actually parsed.
+
+TXT_CHUNK_SIZE = 64 * 1024
 
 # Comprehensive English Stop Words (Extended)
 ENGLISH_STOP_WORDS = {
@@ -35,46 +59,169 @@ BENGALI_STOP_WORDS = {
     'এবং', 'কিন্তু', 'অথবা', 'যদি', 'তবে', 'হয়', 'হয়ত', 'ছিল', 'করে', 'করা', 'হতে', 'থেকে', 'ও', 'আর'
 }
 
-def extract_text_from_pdf(content: bytes) -> str:
-    with pdfplumber.open(io.BytesIO(content)) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+_pdf_executor: Optional[ProcessPoolExecutor] = None
 
-def extract_text_from_docx(content: bytes) -> str:
+def _limit_worker_memory():
+    if PDF_WORKER_MAX_MEMORY_MB > 0:
+        import resource
+        limit = PDF_WORKER_MAX_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            initializer=_limit_worker_memory,
+            max_tasks_per_child=PDF_WORKER_MAX_TASKS
+        )
+    return _pdf_executor
+
+def _open_pdf(source: PdfSource):
+    import pdfplumber
+    if isinstance(source, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    # Runs in a pool worker: each worker opens its own copy of the file
+    import pdfplumber
+    pages = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[start:stop]:
+            pages.append(page.extract_text() or "")
+            page.close()
+    return pages
+
+def _iter_pages_parallel(path: str, page_count: int) -> Iterator[str]:
+    executor = _get_pdf_executor()
+    ranges = iter(range(0, page_count, PDF_PAGES_PER_TASK))
+    pending = deque()
+
+    def submit_next():
+        start = next(ranges, None)
+        if start is not None:
+            pending.append(executor.submit(_extract_page_range, path, start, min(start + PDF_PAGES_PER_TASK, page_count)))
+
+    for _ in range(PDF_MAX_INFLIGHT_TASKS):
+        submit_next()
+    try:
+        # Yield ranges in page order; keep the pool busy while the caller consumes
+        while pending:
+            pages = pending.popleft().result()
+            submit_next()
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
+
+def iter_pdf_pages(source: PdfSource) -> Iterator[str]:
+    """Yield the text of each page in order.
+
+    Pages are parsed one at a time and their caches released as soon as they
+    are consumed. PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split
+    into ranges of PDF_PAGES_PER_TASK pages and parsed in a process pool.
+    """
+    with _open_pdf(source) as pdf:
+        page_count = len(pdf.pages)
+        if PDF_WORKERS <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+                page.close()
+            return
+
+    # Workers need a path they can open independently
+    if isinstance(source, str):
+        yield from _iter_pages_parallel(source, page_count)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        if isinstance(source, (bytes, bytearray)):
+            tmp.write(source)
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, tmp)
+        tmp.flush()
+        yield from _iter_pages_parallel(tmp.name, page_count)
+
+def extract_text_from_pdf(content: PdfSource) -> str:
+    # Pages are joined without a separator, as the pipeline has always done
+    return "".join(iter_pdf_pages(content))
+
+def iter_docx_paragraphs(content: bytes) -> Iterator[str]:
+    from docx import Document
     doc = Document(io.BytesIO(content))
-    return "\n".join([para.text for para in doc.paragraphs])
+    for i, para in enumerate(doc.paragraphs):
+        if i:
+            yield "\n"
+        yield para.text
+
+def extract_text_from_docx(content: bytes) -> str:
+    return "".join(iter_docx_paragraphs(content))
+
+def iter_txt_chunks(content: bytes, chunk_size: int = TXT_CHUNK_SIZE) -> Iterator[str]:
+    # Incremental decoding keeps multi-byte characters split across blocks intact
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        yield decoder.decode(view[start:start + chunk_size])
+    yield decoder.decode(b"", final=True)
 
 def extract_text_from_txt(content: bytes) -> str:
     return content.decode("utf-8")
 
-def tokenize_and_count(text: str) -> Counter:
-    # Lowercase and remove punctuation (keeps only letters and spaces)
-    text = text.lower()
-    
-    # Regex for words: Support both English and Bengali characters
-    # Note: re.UNICODE helps with Bengali. We only keep alphabetic words.
-    words = re.findall(r'[a-z\u0980-\u09ff]{2,}', text) # Minimum 2 letters to start, will filter more below
-    
-    filtered_words = []
-    for word in words:
-        # 1. Skip if contains any numbers
-        if any(char.isdigit() for char in word):
-            continue
-            
-        # 2. Skip if <= 2 characters (as requested)
-        if len(word) <= 2:
-            continue
-            
-        # 3. Skip English/Bengali stop words
-        if word in ENGLISH_STOP_WORDS or word in BENGALI_STOP_WORDS:
-            continue
-            
-        # 4. Skip Date/Web noise
-        if word in DATE_WORDS or word in WEB_NOISE:
+def iter_document_text(content: bytes, file_type: str) -> Iterator[str]:
+    """Yield a document's text in chunks (pages, paragraphs or blocks)."""
+    if "pdf" in file_type:
+        return iter_pdf_pages(content)
+    elif "word" in file_type:
+        return iter_docx_paragraphs(content)
+    return iter_txt_chunks(content)
+
+# All stop words and noise folded into a single lookup
+NOISE_WORDS = frozenset(ENGLISH_STOP_WORDS | BENGALI_STOP_WORDS | DATE_WORDS | WEB_NOISE)
+
+# A whole run of English/Bengali letters, at least 3 long, with no Bengali digits (U+09E6-U+09EF).
+# The lookarounds reject a run containing a digit as a whole instead of splitting it around the digit.
+WORD_PATTERN = re.compile(r'(?<![a-z\u0980-\u09ff])[a-z\u0980-\u09e5\u09f0-\u09ff]{3,}(?![a-z\u0980-\u09ff])')
+
+# Changes whenever the tokenizer rules change, so cached counts are never reused across rule sets
+FILTER_VERSION = hashlib.sha256(
+    "\n".join([WORD_PATTERN.pattern, *sorted(NOISE_WORDS)]).encode("utf-8")
+).hexdigest()[:12]
+
+def _is_word_char(char: str) -> bool:
+    return 'a' <= char <= 'z' or '\u0980' <= char <= '\u09ff'
+
+def _count_text(text: str, counts: Counter):
+    counts.update(filterfalse(NOISE_WORDS.__contains__, WORD_PATTERN.findall(text)))
+
+def count_words(chunks: Iterable[str], counts: Optional[Counter] = None) -> Counter:
+    """Count words from a stream of text chunks into a single Counter.
+
+    Chunks are treated as one continuous text, so a word split across two
+    chunks is counted once. Only the current chunk and the running counts
+    are held in memory.
+    """
+    if counts is None:
+        counts = Counter()
+
+    carry = ""
+    for chunk in chunks:
+        if not chunk:
             continue
-            
-        filtered_words.append(word)
-    
-    return Counter(filtered_words)
+        text = carry + chunk.lower()
+
+        # Hold back a trailing partial word; it may continue in the next chunk
+        cut = len(text)
+        while cut > 0 and _is_word_char(text[cut - 1]):
+            cut -= 1
+        carry = text[cut:]
+        _count_text(text[:cut], counts)
+
+    _count_text(carry, counts)
+    return counts
+
+def tokenize_and_count(text: str) -> Counter:
+    # Lowercase and keep only English/Bengali letter runs, minus noise words
+    return count_words([text])
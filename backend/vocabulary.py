@@ -0,0 +1,187 @@
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Packed vocabulary: a document's whole frequency table in one blob, stored in
+# document_vocabularies instead of one word_frequency row per word.
+#
+# Layout (little-endian):
+#   header   b"VOC1", word count n, byte length of the word text
+#   offsets  n + 1 uint32; word i is text[offsets[i]:offsets[i + 1]]
+#   counts   n uint32, in word order
+#   ranking  n uint32 word indexes ordered by (count desc, word)
+#   text     the UTF-8 words, sorted and concatenated
+#
+# UTF-8 byte order matches code point order, so words are compared as bytes
+# without decoding. Loading only wraps the blob in memoryviews; a page
+# decodes just the words it returns.
+MAGIC = b"VOC1"
+_HEADER = struct.Struct("<4sII")
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+def pack_vocabulary(items: Iterable[Tuple[str, int]]) -> bytes:
+    """Pack (word, frequency) pairs; words must be unique."""
+    items = sorted(items)
+    words = [word.encode("utf-8") for word, _ in items]
+    offsets = array("I", [0])
+    for word in words:
+        offsets.append(offsets[-1] + len(word))
+    counts = array("I", (freq for _, freq in items))
+    ranking = array("I", sorted(range(len(items)), key=lambda i: (-counts[i], words[i])))
+    return b"".join((
+        _HEADER.pack(MAGIC, len(items), offsets[-1]),
+        _to_bytes(offsets), _to_bytes(counts), _to_bytes(ranking),
+        b"".join(words),
+    ))
+
+class _Keys:
+    """Read-only sequence computing key(i) on access, for bisect."""
+
+    def __init__(self, length: int, key):
+        self._length = length
+        self._key = key
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        return self._key(i)
+
+class PackedVocabulary:
+    """Zero-copy view over a blob made by pack_vocabulary."""
+
+    def __init__(self, data: bytes):
+        view = memoryview(data)
+        magic, self._length, text_size = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Not a packed vocabulary")
+        position = _HEADER.size
+        arrays = []
+        for length in (self._length + 1, self._length, self._length):
+            arrays.append(self._uint32(view[position:position + 4 * length]))
+            position += 4 * length
+        self._offsets, self._counts, self._ranking = arrays
+        self._text = view[position:position + text_size]
+        self._words = _Keys(self._length, self._word_bytes)
+        self._rank_keys = _Keys(self._length, self._rank_key)
+
+    @staticmethod
+    def _uint32(view: memoryview):
+        if sys.byteorder == "little":
+            return view.cast("I")
+        values = array("I", view.tobytes()) # Big-endian hosts pay for one copy
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _word_bytes(self, i: int) -> bytes:
+        return self._text[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def _rank_key(self, position: int) -> Tuple[int, bytes]:
+        i = self._ranking[position]
+        return -self._counts[i], self._word_bytes(i)
+
+    def word(self, i: int) -> str:
+        return str(self._text[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def count(self, i: int) -> int:
+        return self._counts[i]
+
+    def get(self, word: str) -> Optional[int]:
+        """Frequency of `word`, or None if the document does not contain it."""
+        target = word.encode("utf-8")
+        i = bisect_left(self._words, target)
+        if i < self._length and self._word_bytes(i) == target:
+            return self._counts[i]
+        return None
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """(word, frequency) pairs in word order."""
+        for i in range(self._length):
+            yield self.word(i), self._counts[i]
+
+    def most_common(self, limit: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+        """(word, frequency) pairs, most frequent first (ties by word)."""
+        stop = self._length if limit is None else min(limit, self._length)
+        for position in range(stop):
+            i = self._ranking[position]
+            yield self.word(i), self._counts[i]
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        start = prefix.encode("utf-8")
+        # Every word with the prefix sorts below prefix + the highest code point
+        return bisect_left(self._words, start), bisect_left(self._words, start + b"\xf4\x8f\xbf\xbf")
+
+    def _frequency_asc(self, after: Optional[Tuple[int, bytes]], min_frequency: int) -> Iterator[int]:
+        # The ranking is count desc, so walk its equal-count runs from the end,
+        # each run forwards (word ascending)
+        keys = self._rank_keys
+        end = bisect_left(keys, (1 - min_frequency,)) # Past the last word counted min_frequency times
+        start = None
+        if after is not None and after[0] >= min_frequency:
+            end = bisect_left(keys, (1 - after[0],))
+            start = bisect_right(keys, (-after[0], after[1]), 0, end)
+        while end > 0:
+            run_start = bisect_left(keys, (-self._counts[self._ranking[end - 1]],), 0, end)
+            for position in range(max(run_start, start if start is not None else run_start), end):
+                yield self._ranking[position]
+            start = None
+            end = run_start
+
+    def _order(self, sort: str, after: Optional[Tuple[int, bytes]], min_frequency: int, prefix: Optional[str]) -> Iterator[int]:
+        if prefix:
+            lo, hi = self._prefix_range(prefix)
+            if sort in ("frequency_desc", "frequency_asc"):
+                # Prefix ranges are contiguous in word order only: rank just that slice
+                sign = -1 if sort == "frequency_desc" else 1
+                keys = sorted((sign * self._counts[i], self._word_bytes(i), i) for i in range(lo, hi))
+                start = bisect_right(keys, (sign * after[0], after[1], self._length)) if after else 0
+                return (key[2] for key in keys[start:])
+        else:
+            lo, hi = 0, self._length
+
+        if sort == "word_asc":
+            start = max(lo, bisect_right(self._words, after[1], lo, hi)) if after else lo
+            return iter(range(start, hi))
+        if sort == "word_desc":
+            start = min(hi, bisect_left(self._words, after[1], lo, hi)) if after else hi
+            return iter(range(start - 1, lo - 1, -1))
+        if sort == "frequency_desc":
+            start = bisect_right(self._rank_keys, (-after[0], after[1])) if after else 0
+            end = bisect_left(self._rank_keys, (1 - min_frequency,))
+            return (self._ranking[position] for position in range(start, end))
+        if sort == "frequency_asc":
+            return self._frequency_asc(after, min_frequency)
+        raise ValueError(f"Unsupported sort: {sort}")
+
+    def page(
+        self,
+        limit: int = 100,
+        after: Optional[Tuple[int, str]] = None,
+        min_frequency: int = 1,
+        prefix: Optional[str] = None,
+        sort: str = "frequency_desc"
+    ) -> Tuple[List[Tuple[str, int]], bool]:
+        """One page of (word, frequency) pairs after the `after` (frequency, word) cursor.
+
+        Same orderings and filters as the word_frequency listing; returns
+        the page and whether more words follow.
+        """
+        after_key = (after[0], after[1].encode("utf-8")) if after else None
+        page = []
+        for i in self._order(sort, after_key, min_frequency, prefix.lower() if prefix else None):
+            if self._counts[i] < min_frequency:
+                continue
+            if len(page) == limit:
+                return page, True
+            page.append((self.word(i), self._counts[i]))
+        return page, False
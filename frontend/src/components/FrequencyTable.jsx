@@ -1,34 +1,53 @@
-import { ArrowUpDown, Languages, Search, Sparkles } from "lucide-react";
-import { useState } from "react";
+import { ArrowUpDown, Languages, Loader2, Search, Sparkles } from "lucide-react";
+import { useCallback, useEffect, useState } from "react";
+import api from "../lib/api";
 import TranslationModal from "./TranslationModal";
 
-const FrequencyTable = ({ docId, data, onRefresh }) => {
+const PAGE_SIZE = 100;
+
+const FrequencyTable = ({ docId, onRefresh }) => {
     const [searchTerm, setSearchTerm] = useState("");
     const [sortConfig, setSortConfig] = useState({ key: "frequency", direction: "desc" });
     const [selectedWord, setSelectedWord] = useState(null);
+    const [rows, setRows] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loading, setLoading] = useState(false);
+
+    // Fetch one page from the server; search and sorting happen server-side
+    const fetchPage = useCallback(async (cursor = null) => {
+        try {
+            setLoading(true);
+            const params = { limit: PAGE_SIZE, sort: `${sortConfig.key}_${sortConfig.direction}` };
+            if (searchTerm) params.prefix = searchTerm.toLowerCase();
+            if (cursor) params.cursor = cursor;
+            const response = await api.get(`/documents/${docId}/words`, { params });
+            setRows((prev) => (cursor ? [...prev, ...response.data.items] : response.data.items));
+            setNextCursor(response.data.next_cursor);
+        } catch (err) {
+            console.error("Failed to fetch words", err);
+        } finally {
+            setLoading(false);
+        }
+    }, [docId, searchTerm, sortConfig]);
+
+    useEffect(() => {
+        const timer = setTimeout(() => fetchPage(), 250);
+        return () => clearTimeout(timer);
+    }, [fetchPage]);
 
     const handleSaveTranslation = async (word, translation) => {
+        await fetchPage();
         if (onRefresh) await onRefresh();
     };
 
     const handleSort = (key) => {
-        let direction = "desc";
-        if (sortConfig.key === key && sortConfig.direction === "desc") {
-            direction = "asc";
+        let direction = key === "word" ? "asc" : "desc";
+        if (sortConfig.key === key) {
+            direction = sortConfig.direction === "desc" ? "asc" : "desc";
         }
         setSortConfig({ key, direction });
     };
 
-    const sortedWords = [...(data || [])]
-        .filter((w) => w.word.toLowerCase().includes(searchTerm.toLowerCase()))
-        .sort((a, b) => {
-            if (a[sortConfig.key] < b[sortConfig.key]) return sortConfig.direction === "asc" ? -1 : 1;
-            if (a[sortConfig.key] > b[sortConfig.key]) return sortConfig.direction === "asc" ? 1 : -1;
-            return 0;
-        });
-
-    if (!data) return null;
-
     return (
         <>
             <div className="bg-white rounded-3xl border border-gray-100 shadow-sm overflow-hidden">
@@ -46,11 +65,11 @@ const FrequencyTable = ({ docId, data, onRefresh }) => {
                     <div className="flex items-center gap-3">
                         <div className="flex items-center gap-2 text-sm text-blue-700 bg-blue-50 px-5 py-3 rounded-xl font-bold border border-blue-100">
                             <Languages className="w-4 h-4" />
-                            {data.length} Unique Words
+                            {rows.length}{nextCursor ? "+" : ""} Words Loaded
                         </div>
                         <div className="flex items-center gap-2 text-sm text-green-700 bg-green-50 px-5 py-3 rounded-xl font-bold border border-green-100">
                             <Sparkles className="w-4 h-4" />
-                            {data.filter(w => w.translation).length} Translated
+                            {rows.filter(w => w.translation).length} Translated
                         </div>
                     </div>
                 </div>
@@ -80,7 +99,7 @@ const FrequencyTable = ({ docId, data, onRefresh }) => {
                             </tr>
                         </thead>
                         <tbody className="divide-y divide-gray-50">
-                            {sortedWords.map((row, index) => (
+                            {rows.map((row, index) => (
                                 <tr key={index} className="hover:bg-blue-50/20 transition-all group">
                                     <td className="px-8 py-5 text-sm text-gray-400 font-bold tabular-nums">#{index + 1}</td>
                                     <td className="px-8 py-5">
@@ -115,7 +134,20 @@ const FrequencyTable = ({ docId, data, onRefresh }) => {
                     </table>
                 </div>
 
-                {sortedWords.length === 0 && (
+                {nextCursor && (
+                    <div className="p-6 text-center border-t border-gray-50">
+                        <button
+                            onClick={() => fetchPage(nextCursor)}
+                            disabled={loading}
+                            className="px-6 py-3 rounded-2xl font-bold text-blue-600 border-2 border-blue-100 hover:border-blue-600 transition-all inline-flex items-center gap-2"
+                        >
+                            {loading && <Loader2 className="w-4 h-4 animate-spin" />}
+                            Load More
+                        </button>
+                    </div>
+                )}
+
+                {!loading && rows.length === 0 && (
                     <div className="py-24 text-center">
                         <div className="inline-flex p-4 bg-gray-50 rounded-full mb-4">
                             <Search className="w-8 h-8 text-gray-300" />
@@ -30,4 +30,38 @@ api.interceptors.response.use(
     }
 );
 
+// Give up polling after this long; a job orphaned by a server restart never finishes
+const POLL_TIMEOUT_MS = 15 * 60 * 1000;
+
+const pollTimedOut = (deadline, interval) => Date.now() + interval > deadline;
+
+// Poll a document processing job until it finishes
+export const waitForJob = async (docId, jobId, { interval = 1000, timeout = POLL_TIMEOUT_MS, onProgress } = {}) => {
+    const deadline = Date.now() + timeout;
+    for (;;) {
+        const { data: job } = await api.get(`/documents/${docId}/jobs/${jobId}`);
+        if (onProgress) onProgress(job);
+        if (job.status === "done") return job;
+        if (job.status === "failed") throw new Error(job.error || "Processing failed");
+        if (pollTimedOut(deadline, interval)) throw new Error("Processing is taking too long; try again later");
+        await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+};
+
+// Poll a bulk upload batch until all of its jobs finish
+export const waitForBatch = async (batchId, { interval = 1000, timeout = POLL_TIMEOUT_MS, onProgress } = {}) => {
+    const deadline = Date.now() + timeout;
+    for (;;) {
+        const { data: batch } = await api.get(`/documents/batches/${batchId}`);
+        if (onProgress) onProgress(batch);
+        if (batch.status === "done") return batch;
+        if (batch.status === "failed") {
+            const failed = batch.jobs.filter((j) => j.status === "failed");
+            throw new Error(failed.map((j) => `${j.filename}: ${j.error || "Processing failed"}`).join("; "));
+        }
+        if (pollTimedOut(deadline, interval)) throw new Error("Processing is taking too long; try again later");
+        await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+};
+
 export default api;
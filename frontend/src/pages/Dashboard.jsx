@@ -4,7 +4,7 @@ import { Link } from "react-router-dom";
 import DocumentCharts from "../components/DocumentCharts";
 import FrequencyTable from "../components/FrequencyTable";
 import WordCloudComponent from "../components/WordCloud";
-import api from "../lib/api";
+import api, { waitForJob } from "../lib/api";
 
 const Dashboard = () => {
     const [documents, setDocuments] = useState([]);
@@ -13,6 +13,7 @@ const Dashboard = () => {
     const [docData, setDocData] = useState([]);
     const [dataLoading, setDataLoading] = useState(false);
     const [translating, setTranslating] = useState(false);
+    const [stats, setStats] = useState(null);
 
     useEffect(() => {
         fetchDocuments();
@@ -22,13 +23,25 @@ const Dashboard = () => {
         if (selectedDoc) {
             fetchDocData(selectedDoc.id);
         }
+        fetchStats(selectedDoc?.id);
     }, [selectedDoc]);
 
+    // Counters are maintained server-side, so this stays cheap for large vocabularies
+    const fetchStats = async (docId) => {
+        try {
+            const response = await api.get("/stats", { params: docId ? { document_id: docId } : {} });
+            setStats(response.data);
+        } catch (err) {
+            console.error("Failed to fetch stats", err);
+        }
+    };
+
     const fetchDocData = async (id) => {
         try {
             setDataLoading(true);
-            const response = await api.get(`/documents/${id}/words`);
-            setDocData(response.data);
+            // Top words feed the charts, word cloud and batch translation
+            const response = await api.get(`/documents/${id}/words`, { params: { limit: 500 } });
+            setDocData(response.data.items);
         } catch (err) {
             console.error("Failed to fetch doc data", err);
         } finally {
@@ -52,8 +65,10 @@ const Dashboard = () => {
         if (!selectedDoc) return;
         try {
             setDataLoading(true);
-            await api.post(`/documents/${selectedDoc.id}/process`);
+            const { data: job } = await api.post(`/documents/${selectedDoc.id}/process`);
+            await waitForJob(selectedDoc.id, job.id);
             await fetchDocData(selectedDoc.id);
+            await fetchStats(selectedDoc.id);
             alert("Analysis refreshed with new filtering rules!");
         } catch (err) {
             console.error("Re-analysis failed", err);
@@ -63,13 +78,13 @@ const Dashboard = () => {
         }
     };
 
-    const totalWords = docData.reduce((sum, item) => sum + item.frequency, 0);
+    const docStats = selectedDoc ? stats?.document : null;
 
-    const stats = [
-        { label: "Total Documents", value: documents.length.toString(), icon: FileText, color: "text-blue-600", bg: "bg-blue-50" },
-        { label: "Unique Vocabulary", value: selectedDoc ? docData.length.toString() : "...", icon: Languages, color: "text-purple-600", bg: "bg-purple-50" },
-        { label: "Total Word Hits", value: selectedDoc ? totalWords.toLocaleString() : "...", icon: Users, color: "text-green-600", bg: "bg-green-50" },
-        { label: "Translations", value: selectedDoc ? docData.filter(d => d.translation).length : "...", icon: Clock, color: "text-amber-600", bg: "bg-amber-50" },
+    const statCards = [
+        { label: "Total Documents", value: (stats?.document_count ?? documents.length).toString(), icon: FileText, color: "text-blue-600", bg: "bg-blue-50" },
+        { label: "Unique Vocabulary", value: docStats ? docStats.unique_words.toLocaleString() : "...", icon: Languages, color: "text-purple-600", bg: "bg-purple-50" },
+        { label: "Total Word Hits", value: stats ? (docStats?.total_words ?? stats.total_words).toLocaleString() : "...", icon: Users, color: "text-green-600", bg: "bg-green-50" },
+        { label: "Translations", value: stats ? (docStats?.translated_words ?? stats.translation_count).toLocaleString() : "...", icon: Clock, color: "text-amber-600", bg: "bg-amber-50" },
     ];
 
     const handleBatchTranslate = async () => {
@@ -89,6 +104,7 @@ const Dashboard = () => {
 
             await api.post("/translations/batch", { words: wordsToTranslate });
             await fetchDocData(selectedDoc.id); // Refresh data
+            await fetchStats(selectedDoc.id);
         } catch (err) {
             console.error("Batch translation failed", err);
             alert("AI Translation failed. Please try again later.");
@@ -106,6 +122,8 @@ const Dashboard = () => {
             setDocuments(documents.filter(doc => doc.id !== id));
             if (selectedDoc?.id === id) {
                 setSelectedDoc(null);
+            } else {
+                fetchStats(selectedDoc?.id);
             }
         } catch (err) {
             console.error("Deletion failed", err);
@@ -224,7 +242,6 @@ const Dashboard = () => {
                         </div>
                         <FrequencyTable
                             docId={selectedDoc.id}
-                            data={docData}
                             onRefresh={() => fetchDocData(selectedDoc.id)}
                         />
                     </>
@@ -241,7 +258,7 @@ const Dashboard = () => {
             </div>
 
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-10">
-                {stats.map((stat, i) => (
+                {statCards.map((stat, i) => (
                     <div key={i} className="bg-white p-6 rounded-2xl border border-gray-100 shadow-sm hover:shadow-md transition-shadow">
                         <div className={`p-3 rounded-xl inline-block mb-4 ${stat.bg} ${stat.color}`}>
                             <stat.icon className="w-6 h-6" />
@@ -1,19 +1,20 @@
 import { AlertCircle, CheckCircle, File, Loader2, Upload as UploadIcon, X } from "lucide-react";
 import { useState } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../lib/api";
+import api, { waitForBatch } from "../lib/api";
 
 const Upload = () => {
-    const [file, setFile] = useState(null);
+    const [files, setFiles] = useState([]);
     const [step, setStep] = useState(0); // 0: idle, 1: uploading, 2: processing, 3: done
     const [error, setError] = useState("");
     const [uploading, setUploading] = useState(false);
     const [success, setSuccess] = useState(false);
+    const [progress, setProgress] = useState(0);
     const navigate = useNavigate();
 
     const handleFileChange = (e) => {
-        if (e.target.files[0]) {
-            setFile(e.target.files[0]);
+        if (e.target.files.length) {
+            setFiles(Array.from(e.target.files));
             setSuccess(false);
             setError("");
             setStep(0);
@@ -21,32 +22,31 @@ const Upload = () => {
     };
 
     const handleUpload = async () => {
-        if (!file) return;
+        if (!files.length) return;
         setUploading(true);
         setError("");
         setStep(1); // Uploading
+        setProgress(0);
 
         try {
-            // 1. Upload Document
+            // 1. Upload every file (or zip archive) in one request; processing starts right away
             const formData = new FormData();
-            formData.append("file", file);
+            files.forEach((f) => formData.append("files", f));
 
-            const uploadRes = await api.post("/documents/upload", formData, {
+            const uploadRes = await api.post("/documents/bulk", formData, {
                 headers: { "Content-Type": "multipart/form-data" }
             });
 
-            const docId = uploadRes.data.id;
-
             setStep(2); // Analysis
 
-            // 2. Process Document
-            await api.post(`/documents/${docId}/process`);
+            // 2. Wait for the whole batch to finish
+            await waitForBatch(uploadRes.data.id, { onProgress: (b) => setProgress(b.progress) });
 
             setStep(3); // Success
             setSuccess(true);
-            setFile(null);
+            setFiles([]);
         } catch (err) {
-            setError(err.response?.data?.detail || "Upload failed. Please try again.");
+            setError(err.response?.data?.detail || err.message || "Upload failed. Please try again.");
             setStep(0);
         } finally {
             setUploading(false);
@@ -65,14 +65,15 @@ const Upload = () => {
                     <input
                         type="file"
                         onChange={handleFileChange}
-                        accept=".pdf,.docx,.txt"
+                        multiple
+                        accept=".pdf,.docx,.txt,.zip"
                         className="absolute inset-0 opacity-0 cursor-pointer"
                     />
                     <div className="inline-flex p-4 bg-blue-50 rounded-full mb-6 group-hover:scale-110 transition-transform">
                         <UploadIcon className="w-8 h-8 text-blue-600" />
                     </div>
                     <h2 className="text-xl font-bold text-gray-900 mb-2">Click or drag to upload</h2>
-                    <p className="text-gray-500">Your file will be processed automatically after upload.</p>
+                    <p className="text-gray-500">Select several files or a zip archive; they are processed automatically after upload.</p>
                 </div>
 
                 {error && (
@@ -82,7 +83,7 @@ const Upload = () => {
                     </div>
                 )}
 
-                {file && (
+                {files.length > 0 && (
                     <div className="mt-8 bg-white border border-gray-100 rounded-3xl p-8 shadow-2xl shadow-blue-50 animate-in fade-in slide-in-from-bottom-4 duration-500">
                         <div className="flex flex-col md:flex-row md:items-center justify-between gap-6 mb-8">
                             <div className="flex items-center gap-5">
@@ -90,13 +91,13 @@ const Upload = () => {
                                     <File className="w-8 h-8 text-blue-600" />
                                 </div>
                                 <div>
-                                    <p className="text-lg font-black text-gray-900">{file.name}</p>
-                                    <p className="text-sm font-bold text-gray-400 uppercase tracking-tighter">{(file.size / (1024 * 1024)).toFixed(2)} MB</p>
+                                    <p className="text-lg font-black text-gray-900">{files.length === 1 ? files[0].name : `${files.length} files`}</p>
+                                    <p className="text-sm font-bold text-gray-400 uppercase tracking-tighter">{(files.reduce((total, f) => total + f.size, 0) / (1024 * 1024)).toFixed(2)} MB</p>
                                 </div>
                             </div>
                             {!uploading && !success && (
                                 <button
-                                    onClick={() => setFile(null)}
+                                    onClick={() => setFiles([])}
                                     className="p-3 hover:bg-red-50 hover:text-red-500 rounded-2xl text-gray-300 transition-all"
                                 >
                                     <X className="w-6 h-6" />
@@ -111,17 +112,18 @@ const Upload = () => {
                                         {step === 1 ? "Uploading to Cloud..." : "Analyzing Vocabulary..."}
                                     </span>
                                     <span className="text-gray-300">
-                                        {step === 1 ? "45%" : "85%"}
+                                        {step === 1 ? "10%" : `${Math.max(progress, 10)}%`}
                                     </span>
                                 </div>
                                 <div className="h-4 w-full bg-gray-50 rounded-full overflow-hidden p-1">
                                     <div
-                                        className={`h-full bg-blue-600 rounded-full transition-all duration-1000 ${step === 2 ? 'w-[85%]' : 'w-[45%]'}`}
+                                        className="h-full bg-blue-600 rounded-full transition-all duration-1000"
+                                        style={{ width: `${step === 1 ? 10 : Math.max(progress, 10)}%` }}
                                     />
                                 </div>
                                 <div className="flex items-center gap-2 text-gray-400 text-sm font-medium">
                                     <Loader2 className="w-4 h-4 animate-spin" />
-                                    Please wait, extracting {file.name.split('.').pop().toUpperCase()} metadata...
+                                    Please wait, extracting vocabulary from {files.length === 1 ? "1 file" : `${files.length} files`}...
                                 </div>
                             </div>
                         ) : success ? (
@@ -133,7 +135,7 @@ const Upload = () => {
                                 <p className="text-gray-500 font-medium mb-8">Your document is ready for analysis in the dashboard.</p>
                                 <div className="flex items-center gap-3 justify-center">
                                     <button
-                                        onClick={() => setFile(null)}
+                                        onClick={() => setFiles([])}
                                         className="px-8 py-4 bg-gray-100 text-gray-600 font-bold rounded-2xl hover:bg-gray-200 transition-all"
                                     >
                                         Upload Another